@@ -0,0 +1,308 @@
+"""벤치마크용 가짜 GPU 서버 (paramiko SSH 서버)
+
+포트 하나가 서버 한 대를 흉내낸다. probe 스크립트의 각 명령(w -h, nvidia-smi 표/CSV, ps,
+/proc/loadavg, free, df)에 fixtures/ 의 녹화된 출력으로 응답하고,
+지연/지터/장애(연결 거부, 인증 실패, 무응답, exec 실패)를 주입할 수 있다.
+"""
+import os
+import random
+import re
+import selectors
+import socket
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import paramiko
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+USERNAME = "bench"
+PASSWORD = "bench"
+
+FAILURE_KINDS = ("refuse", "auth", "hang", "exec")
+
+_ECHO = re.compile(r"^echo '(.*)'$")
+# GPU 섹션을 셸 변수에 담았다가 출력하는 부분과 그 변수로 PID 를 뽑아 ps 를 실행하는 부분
+_CAPTURE = re.compile(r"(\w+)=\$\(\{ (.*?)\} 2>&1\); printf '%s\\n' \"\$\1\"")
+_PS = re.compile(r"printf '%s\\n' \"\$\w+\" \| awk .*?-p \" u\)\}\}'")
+# 알고 있는 프로세스 목록을 넘기는 변수 대입 (출력 없음)
+_ASSIGN = re.compile(r"^\w+='[^']*'$")
+
+
+def load_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def scale_gpu_table(table: str, gpu_count: int) -> str:
+    """nvidia-smi 표 출력의 GPU/프로세스 행을 반복하여 gpu_count 개짜리 표 생성"""
+    lines = table.rstrip("\n").split("\n")
+    header_end = next(i for i, line in enumerate(lines) if line.startswith("|====")) + 1
+    blank = lines.index("", header_end)
+    proc_end = next(i for i, line in enumerate(lines) if line.startswith("|====") and i > blank) + 1
+    gpu_rows, procs = lines[header_end:blank], lines[proc_end:-1]
+    block = len(gpu_rows) // sum(1 for line in gpu_rows if "NVIDIA" in line)
+
+    def renumber(row: str, index: int) -> str:
+        return re.sub(r"^\|(\s+)\d+ ", lambda m: f"|{index:>{len(m.group(1)) + 1}} ", row)
+
+    body = []
+    for i in range(gpu_count):
+        rows = gpu_rows[(i * block) % len(gpu_rows):][:block]
+        body.extend([renumber(rows[0], i)] + rows[1:])
+    proc_rows = [renumber(procs[i % len(procs)], i) for i in range(gpu_count)] if procs else []
+    return "\n".join(lines[:header_end] + body + lines[blank:proc_end] + proc_rows + lines[-1:]) + "\n"
+
+
+def scale_user_table(w_output: str, count: int) -> str:
+    """w -h 출력을 반복하여 count 줄짜리 출력 생성"""
+    rows = [line for line in w_output.splitlines() if line.strip()]
+    return "\n".join(rows[i % len(rows)] for i in range(count)) + "\n"
+
+
+class HostBehavior:
+    """서버 한 대의 응답 특성"""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, failure: Optional[str] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure = failure
+
+    def delay(self) -> float:
+        return max(0.0, self.latency + random.uniform(-self.jitter, self.jitter))
+
+
+class _Counters:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.handshakes = 0
+        self.execs = 0
+        self.forwards = 0
+
+    def add(self, name: str):
+        with self.lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+
+class _FakeServer(paramiko.ServerInterface):
+    def __init__(self, farm: "FakeHostFarm", behavior: HostBehavior, transport: paramiko.Transport):
+        self.farm = farm
+        self.behavior = behavior
+        self.transport = transport
+        self._forwards: Dict[int, Tuple[str, int]] = {}
+        self._forward_lock = threading.Lock()
+        self._acceptor: Optional[threading.Thread] = None
+        self._sessions: List[paramiko.Channel] = []
+
+    def get_allowed_auths(self, username):
+        return "password"
+
+    def check_auth_password(self, username, password):
+        if self.behavior.failure == "auth" or password != PASSWORD:
+            return paramiko.AUTH_FAILED
+        return paramiko.AUTH_SUCCESSFUL
+
+    def check_channel_request(self, kind, chanid):
+        if kind == "session":
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_direct_tcpip_request(self, chanid, origin, destination):
+        """점프 호스트 역할: 채널을 destination 으로 중계"""
+        self.farm.counters.add("forwards")
+        with self._forward_lock:
+            self._forwards[chanid] = destination
+            if self._acceptor is None:
+                self._acceptor = threading.Thread(target=self._accept_forwards, daemon=True)
+                self._acceptor.start()
+        return paramiko.OPEN_SUCCEEDED
+
+    def _accept_forwards(self):
+        # 서버 쪽 채널은 accept 큐로 들어오므로 direct-tcpip 채널만 골라 중계
+        while self.transport.is_active():
+            channel = self.transport.accept(timeout=1)
+            if channel is None:
+                continue
+            with self._forward_lock:
+                destination = self._forwards.pop(channel.get_id(), None)
+            if destination is not None:
+                threading.Thread(target=_relay, args=(channel, destination), daemon=True).start()
+            else:
+                # Transport 는 채널을 약한 참조로만 들고 있으므로 세션 채널이 GC 로 닫히지 않게 보관
+                self._sessions = [c for c in self._sessions if not c.closed] + [channel]
+
+    def check_channel_pty_request(self, *args):
+        return True
+
+    def check_channel_exec_request(self, channel, command):
+        if self.behavior.failure == "exec":
+            return False
+        self.farm.counters.add("execs")
+        threading.Thread(target=self._reply, args=(channel, command.decode()), daemon=True).start()
+        return True
+
+    def _reply(self, channel: paramiko.Channel, command: str):
+        if self.behavior.failure == "hang":
+            return
+        time.sleep(self.behavior.delay())
+        try:
+            channel.sendall(self.farm.execute(command).encode())
+            channel.send_exit_status(0)
+            channel.close()
+        except Exception:
+            pass
+
+
+def _relay(channel: paramiko.Channel, destination: Tuple[str, int]):
+    try:
+        sock = socket.create_connection(destination)
+    except OSError:
+        channel.close()
+        return
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def pump(read, write, close):
+        try:
+            while True:
+                data = read(32768)
+                if not data:
+                    break
+                write(data)
+        except (OSError, EOFError):
+            pass
+        finally:
+            try:
+                close()
+            except (OSError, EOFError):
+                pass
+
+    threading.Thread(target=pump, args=(sock.recv, channel.sendall, channel.close), daemon=True).start()
+    pump(channel.recv, sock.sendall, sock.close)
+
+
+class FakeHostFarm:
+    """여러 포트에서 가짜 GPU 서버를 띄우는 SSH 서버 묶음
+
+    accept 는 selector 스레드 하나가 모든 포트에 대해 처리하고,
+    연결마다 paramiko Transport 스레드가 하나씩 붙는다.
+    """
+
+    def __init__(self, hosts: int, latency: float = 0.0, jitter: float = 0.0,
+                 failure_rate: float = 0.0, gpu_table: Optional[str] = None, seed: int = 0):
+        rng = random.Random(seed)
+        self.host_key = paramiko.RSAKey.generate(2048)
+        self.counters = _Counters()
+        self.behaviors: List[HostBehavior] = []
+        for _ in range(hosts):
+            failure = rng.choice(FAILURE_KINDS) if rng.random() < failure_rate else None
+            self.behaviors.append(HostBehavior(latency, jitter, failure))
+        self.outputs: Dict[str, str] = {
+            "w -h": load_fixture("w.txt"),
+            "nvidia-smi": gpu_table or load_fixture("nvidia-smi.txt"),
+            "--query-gpu": load_fixture("nvidia-smi-query-gpu.csv"),
+            "--query-compute-apps": load_fixture("nvidia-smi-query-apps.csv"),
+            "cat /proc/loadavg": load_fixture("loadavg.txt"),
+            "free": load_fixture("free.txt"),
+            "df": load_fixture("df.txt"),
+            "ps": load_fixture("ps.txt"),
+        }
+        self.ports: List[int] = []
+        self._sockets: Dict[int, socket.socket] = {}
+        self._transports: List[paramiko.Transport] = []
+        self._selector = selectors.DefaultSelector()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "FakeHostFarm":
+        for behavior in self.behaviors:
+            sock = socket.socket()
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+            self.ports.append(port)
+            if behavior.failure == "refuse":
+                sock.close()  # 아무도 듣지 않는 포트 -> 연결 거부
+                continue
+            sock.listen(128)
+            sock.setblocking(False)
+            self._sockets[port] = sock
+            self._selector.register(sock, selectors.EVENT_READ, behavior)
+        self._thread = threading.Thread(target=self._accept_loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def _accept_loop(self):
+        while not self._stop.is_set():
+            for key, _ in self._selector.select(timeout=0.2):
+                try:
+                    conn, _ = key.fileobj.accept()
+                except OSError:
+                    continue
+                conn.setblocking(True)
+                # paramiko 서버는 데이터/종료코드/close 를 따로 보내므로 Nagle 지연이 측정에 섞이지 않게 한다
+                conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                self._serve(conn, key.data)
+
+    def _serve(self, conn: socket.socket, behavior: HostBehavior):
+        transport = paramiko.Transport(conn)
+        transport.add_server_key(self.host_key)
+        self.counters.add("handshakes")
+        self._transports.append(transport)
+        # event 를 넘기면 협상을 기다리지 않고 바로 반환 -> accept 루프가 막히지 않는다
+        transport.start_server(event=threading.Event(), server=_FakeServer(self, behavior, transport))
+
+    def _command_output(self, command: str) -> str:
+        for needle in ("--query-compute-apps", "--query-gpu"):
+            if needle in command:
+                return self.outputs[needle]
+        for prefix, output in self.outputs.items():
+            if command.startswith(prefix):
+                return output
+        return f"sh: 1: {command.split()[0]}: not found\n"
+
+    def execute(self, script: str) -> str:
+        """probe 스크립트(`; ` 로 이어진 echo / { cmd; } 2>&1 블록)를 fixture 로 실행"""
+        out = []
+        script = _PS.sub("ps", _CAPTURE.sub(r"{ \2} 2>&1", script))
+        for part in script.split("; "):
+            part = part.strip()
+            if part.startswith("{ "):
+                part = part[2:]
+            if not part or part.startswith("}") or _ASSIGN.match(part):
+                continue
+            echo = _ECHO.match(part)
+            if echo:
+                out.append(echo.group(1) + "\n")
+            else:
+                out.append(self._command_output(part.split(" || ")[0].replace(" 2>/dev/null", "")))
+        return "".join(out)
+
+    def servers(self, gpu_spec: str = "NVIDIA RTX A5000", jump: bool = False) -> List[Dict]:
+        """servers.json 형식의 서버 목록 (jump=True 면 첫 서버를 점프 호스트로 사용)"""
+        servers = [
+            {"name": f"Bench{i + 1}", "ip": "127.0.0.1", "port": port,
+             "gpu_count": 8, "gpu_spec": gpu_spec, "description": "benchmark host"}
+            for i, port in enumerate(self.ports)
+        ]
+        if jump:
+            for server in servers[1:]:
+                server["jump_host"] = f"{USERNAME}@127.0.0.1:{self.ports[0]}"
+        return servers
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        for sock in self._sockets.values():
+            self._selector.unregister(sock)
+            sock.close()
+        for transport in self._transports:
+            transport.close()
+        self._selector.close()
+
+    def __enter__(self) -> "FakeHostFarm":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
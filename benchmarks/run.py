@@ -0,0 +1,287 @@
+"""수집/파싱 성능 벤치마크
+
+가짜 GPU 서버(fakehost.py)를 로컬 포트에 띄워 실제 서버 없이 측정한다.
+
+    python benchmarks/run.py                               # 전체 실행, 결과 JSON 을 stdout 으로
+    python benchmarks/run.py --hosts 13 50 --latency 0.05  # 서버 수/지연 지정
+    python benchmarks/run.py -o new.json --compare old.json  # 이전 결과와 비교
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# 가짜 서버의 인증 기록 등이 사용자 데이터 폴더(~/.dashssh)에 남지 않도록 임시 폴더 사용
+os.environ.setdefault("DASHSSH_HOME", tempfile.mkdtemp(prefix="dashssh-bench-"))
+sys.path.insert(0, os.path.join(os.path.dirname(HERE), "src"))
+sys.path.insert(0, HERE)
+
+import paramiko  # noqa: E402
+
+from dashssh.collector import Collector  # noqa: E402
+from dashssh.config import load_config  # noqa: E402
+from dashssh.formatting import format_gpu_info, format_user_info  # noqa: E402
+from dashssh.cache import ServerSnapshot  # noqa: E402
+from dashssh.nvsmi import APPS_SENTINEL, parse_query_output  # noqa: E402
+from dashssh.procinfo import ProcessInfoCache, enrich_processes, parse_ps_output  # noqa: E402
+from dashssh.summary import ClusterSummary  # noqa: E402
+from dashssh.pool import SSHConnectionPool  # noqa: E402
+from fakehost import PASSWORD, USERNAME, FakeHostFarm, load_fixture, scale_gpu_table, scale_user_table  # noqa: E402
+
+DEFAULT_HOSTS = [13, 50, 100, 250, 500]
+
+# 키 인증 실패/장애 주입으로 끊긴 연결의 paramiko 로그가 결과 출력에 섞이지 않도록
+logging.getLogger("paramiko").addHandler(logging.NullHandler())
+logging.getLogger("paramiko").propagate = False
+
+
+def raise_fd_limit(needed: int):
+    """서버 수 만큼 소켓을 열어야 하므로 가능한 범위에서 파일 디스크립터 한도를 올린다"""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(needed, hard), hard))
+
+
+def summarize(samples: List[float]) -> Dict:
+    """초 단위 측정값을 ms 통계로 변환"""
+    ordered = sorted(samples)
+    return {
+        "n": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": ordered[len(ordered) // 2] * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def bench_config(base: Dict, args: argparse.Namespace, hosts: int) -> Dict:
+    config = dict(base)
+    probe = dict(base.get("probe", {}))
+    if args.concurrency:
+        probe["max_concurrency"] = args.concurrency
+    probe["host_timeout"] = args.host_timeout
+    probe["sweep_timeout"] = max(probe.get("sweep_timeout", 30), hosts * args.host_timeout)
+    config["probe"] = probe
+    config["pool"] = dict(base.get("pool", {}), max_size=hosts)
+    return config
+
+
+async def _sweep_once(collector: Collector, servers: List[Dict]) -> Dict:
+    started = time.perf_counter()
+    per_host, failed = [], 0
+    async for result, _ in collector.sweep(servers, USERNAME, PASSWORD):
+        per_host.append(result.elapsed)
+        failed += not result.ok
+    wall = time.perf_counter() - started
+    return {"wall_s": wall, "sum_host_s": sum(per_host), "failed": failed,
+            "speedup": sum(per_host) / wall if wall else 0.0, "host": summarize(per_host)}
+
+
+def bench_sweep(base: Dict, args: argparse.Namespace) -> List[Dict]:
+    """전체 서버 조회: 새 연결(cold) 한 번, 풀에 연결이 남은 상태(warm) 한 번"""
+    results = []
+    for hosts in args.hosts:
+        config = bench_config(base, args, hosts)
+        with FakeHostFarm(hosts, args.latency, args.jitter, args.failure_rate, seed=args.seed) as farm:
+            servers = farm.servers(jump=args.jump)
+            collector = Collector(config)
+            try:
+                row = {"hosts": hosts, "concurrency": collector.engine.max_concurrency}
+                for phase in ("cold", "warm"):
+                    counters = farm.counters
+                    handshakes, execs, forwards = counters.handshakes, counters.execs, counters.forwards
+                    row[phase] = asyncio.run(_sweep_once(collector, servers))
+                    row[phase]["handshakes"] = counters.handshakes - handshakes
+                    row[phase]["execs"] = counters.execs - execs
+                    row[phase]["forwards"] = counters.forwards - forwards
+            finally:
+                collector.close()
+        results.append(row)
+        print(f"sweep {hosts:>4} hosts: cold {row['cold']['wall_s']:.2f}s, "
+              f"warm {row['warm']['wall_s']:.2f}s", file=sys.stderr)
+    return results
+
+
+def bench_connection(args: argparse.Namespace) -> Dict:
+    """새 SSH 연결(핸드셰이크+인증) 비용과 풀에 있는 연결로 명령 하나 실행하는 비용 비교"""
+    command = "cat /proc/loadavg"
+    with FakeHostFarm(1, args.latency, args.jitter) as farm:
+        port = farm.ports[0]
+        pool = SSHConnectionPool(max_size=1)
+        cold, pooled = [], []
+        try:
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                client = pool._connect("127.0.0.1", port, USERNAME, PASSWORD, args.host_timeout)
+                cold.append(time.perf_counter() - started)
+                client.close()
+            handshakes_per_connect = farm.counters.handshakes / args.repeat
+            pool.run("127.0.0.1", USERNAME, PASSWORD, command, port=port)
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                pool.run("127.0.0.1", USERNAME, PASSWORD, command, port=port)
+                pooled.append(time.perf_counter() - started)
+        finally:
+            pool.close_all()
+    return {"connect": summarize(cold), "pooled_run": summarize(pooled),
+            "handshakes_per_connect": handshakes_per_connect,
+            "ratio": statistics.fmean(cold) / statistics.fmean(pooled)}
+
+
+def _throughput(func: Callable[[str], object], text: str, min_time: float) -> Dict:
+    """min_time 초 이상 반복 실행하여 초당 처리 횟수/MB 계산"""
+    func(text)
+    loops, elapsed = 0, 0.0
+    started = time.perf_counter()
+    while elapsed < min_time:
+        func(text)
+        loops += 1
+        elapsed = time.perf_counter() - started
+    size = len(text.encode())
+    return {"input_kb": size / 1024, "ops_per_s": loops / elapsed,
+            "mb_per_s": size * loops / elapsed / 1e6, "us_per_op": elapsed / loops * 1e6}
+
+
+def bench_parse(args: argparse.Namespace) -> Dict:
+    """큰 입력(GPU/사용자 수를 늘린 fixture)에 대한 파싱/포맷 처리량"""
+    gpu_csv = load_fixture("nvidia-smi-query-gpu.csv").splitlines()
+    apps_csv = load_fixture("nvidia-smi-query-apps.csv").splitlines()
+    count = args.parse_rows
+    query_output = "\n".join(
+        [gpu_csv[i % len(gpu_csv)] for i in range(count)] + [APPS_SENTINEL]
+        + [apps_csv[i % len(apps_csv)] for i in range(count)]
+    )
+    cases = {
+        "format_gpu_info": (format_gpu_info, scale_gpu_table(load_fixture("nvidia-smi.txt"), count)),
+        "format_user_info": (format_user_info, scale_user_table(load_fixture("w.txt"), count)),
+        "parse_query_output": (parse_query_output, query_output),
+    }
+    results = {}
+    for name, (func, text) in cases.items():
+        results[name] = dict(_throughput(func, text, args.min_time), rows=count)
+    results["cluster_summary"] = bench_summary(count, args.min_time)
+    return results
+
+
+def bench_summary(hosts: int, min_time: float) -> Dict:
+    """서버 hosts 대 (8 GPU) 중 한 대의 스냅샷이 바뀐 뒤 GPU 종류별 요약을 다시 계산하는 비용"""
+    gpu = parse_query_output(load_fixture("nvidia-smi-query-gpu.csv") + APPS_SENTINEL + "\n"
+                             + load_fixture("nvidia-smi-query-apps.csv"))
+    enrich_processes(gpu.processes, ProcessInfoCache().resolve("bench", parse_ps_output(load_fixture("ps.txt"))))
+    specs = ("NVIDIA RTX A5000", "NVIDIA RTX 3090", "NVIDIA A100")
+    servers = [{"name": f"Bench{i + 1}", "gpu_spec": specs[i % len(specs)]} for i in range(hosts)]
+    summary = ClusterSummary(servers)
+    snapshots = [ServerSnapshot(server["name"], {}, gpu) for server in servers]
+    for snapshot in snapshots:
+        summary.update(snapshot)
+    summary.summarize()
+    loops, elapsed = 0, 0.0
+    started = time.perf_counter()
+    while elapsed < min_time:
+        summary.update(snapshots[loops % hosts])
+        summary.summarize()
+        loops += 1
+        elapsed = time.perf_counter() - started
+    return {"hosts": hosts, "gpus": hosts * len(gpu.gpus), "ops_per_s": loops / elapsed,
+            "us_per_op": elapsed / loops * 1e6}
+
+
+def _flatten(data, prefix: str = "") -> Dict[str, float]:
+    """중첩된 결과를 "sweep.13.cold.wall_s" 같은 키의 숫자 값으로 펼친다"""
+    flat = {}
+    if isinstance(data, dict):
+        for key, value in data.items():
+            flat.update(_flatten(value, f"{prefix}{key}."))
+    elif isinstance(data, list):
+        for item in data:
+            label = item.get("hosts", "") if isinstance(item, dict) else ""
+            flat.update(_flatten(item, f"{prefix}{label}."))
+    elif isinstance(data, (int, float)) and not isinstance(data, bool):
+        flat[prefix[:-1]] = float(data)
+    return flat
+
+
+def compare(previous: Dict, current: Dict) -> List[str]:
+    """두 결과에서 값이 달라진 공통 지표를 변화율과 함께 나열"""
+    before = _flatten({k: previous.get(k) for k in ("sweep", "connection", "parse")})
+    after = _flatten({k: current.get(k) for k in ("sweep", "connection", "parse")})
+    lines = []
+    for key in sorted(before.keys() & after.keys()):
+        old, new = before[key], after[key]
+        if old == new:
+            continue
+        change = (new - old) / old * 100 if old else 0.0
+        lines.append(f"{key:<48} {old:>12.3f} -> {new:>12.3f}  ({change:+.1f}%)")
+    return lines
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="DASH-SSH 수집/파싱 벤치마크")
+    parser.add_argument("--hosts", type=int, nargs="+", default=DEFAULT_HOSTS, help="조회할 가짜 서버 수 목록")
+    parser.add_argument("--latency", type=float, default=0.02, help="명령 응답 지연 (초)")
+    parser.add_argument("--jitter", type=float, default=0.01, help="지연의 무작위 편차 (초)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="장애를 주입할 서버 비율 (0~1)")
+    parser.add_argument("--concurrency", type=int, help="동시 조회 수 (기본: servers.json 의 probe 설정)")
+    parser.add_argument("--host-timeout", type=float, default=5.0, help="서버별 타임아웃 (초)")
+    parser.add_argument("--repeat", type=int, default=20, help="연결 비용 측정 반복 횟수")
+    parser.add_argument("--parse-rows", type=int, default=512, help="파싱 벤치마크의 GPU/사용자 행 수")
+    parser.add_argument("--min-time", type=float, default=1.0, help="파싱 벤치마크별 최소 측정 시간 (초)")
+    parser.add_argument("--only", choices=("sweep", "connection", "parse"), nargs="+", help="일부만 실행")
+    parser.add_argument("--jump", action="store_true", help="첫 서버를 점프 호스트로 두고 나머지를 그 너머로 조회")
+    parser.add_argument("--seed", type=int, default=0, help="장애 주입 난수 시드")
+    parser.add_argument("-o", "--output", help="결과 JSON 파일 경로 (기본: stdout)")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON 파일")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    only = set(args.only or ("sweep", "connection", "parse"))
+    # 서버마다 리스닝 소켓 + 클라이언트/서버 양쪽 연결 소켓이 필요
+    raise_fd_limit(max(args.hosts) * 4 + 256)
+
+    result = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "paramiko": paramiko.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        }
+    }
+    if "parse" in only:
+        result["parse"] = bench_parse(args)
+    if "connection" in only:
+        result["connection"] = bench_connection(args)
+    if "sweep" in only:
+        result["sweep"] = bench_sweep(load_config(), args)
+
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+        print("\n".join(compare(previous, result)), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
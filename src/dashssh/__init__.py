@@ -0,0 +1 @@
+"""DASH-SSH 서버 조회 로직 (Flet UI와 독립적으로 사용 가능)"""
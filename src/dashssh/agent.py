@@ -0,0 +1,256 @@
+"""GPU 서버에 상주 수집 에이전트 (remote_agent.py) 를 설치하고 열어 둔 채널로 조회
+
+에이전트는 서버의 ~/.cache/dashssh/agent-<내용 해시>.py 로 설치되므로 버전이 바뀌면
+파일 이름도 바뀌어 자동으로 다시 설치된다. 서버마다 exec 채널 하나를 열어 두고
+조회할 때마다 {"since": seq} 한 줄을 보내 그 이후의 샘플만 받는다.
+에이전트를 쓸 수 없는 서버 (python3 없음, 설치 실패 등) 는 AgentUnavailable 을 내고
+호출한 쪽에서 nvidia-smi 조회로 대신한다.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import paramiko
+
+from .cache import ServerSnapshot
+from .metrics import LatencyRecorder
+from .nvsmi import GpuRecord, GpuSnapshot, ProcessRecord
+from .pool import SSHConnectionPool
+
+DEFAULT_INTERVAL = 2.0
+DEFAULT_CAPACITY = 600
+DEFAULT_RETRY_INTERVAL = 600.0
+START_TIMEOUT = 15.0  # 상주 프로세스를 처음 띄울 때 (NVML 초기화 포함) 기다리는 시간
+
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "remote_agent.py"), "rb") as _f:
+    AGENT_SOURCE = _f.read()
+AGENT_HASH = hashlib.sha256(AGENT_SOURCE).hexdigest()[:12]
+
+REMOTE_DIR = "$HOME/.cache/dashssh"
+REMOTE_NAME = f"agent-{AGENT_HASH}.py"
+REMOTE_PATH = f"{REMOTE_DIR}/{REMOTE_NAME}"
+
+EXIT_MISSING = 3
+EXIT_NO_PYTHON = 4
+
+# 표준 입력으로 받은 스크립트를 저장하고 이전 버전의 스크립트/로그는 삭제
+INSTALL_COMMAND = (
+    f'mkdir -p "{REMOTE_DIR}" && cat > "{REMOTE_PATH}.tmp" && mv "{REMOTE_PATH}.tmp" "{REMOTE_PATH}" && '
+    f'find "{REMOTE_DIR}" -maxdepth 1 -name "agent-*" ! -name "agent-{AGENT_HASH}.*" -exec rm -f {{}} + ; '
+    f'test -f "{REMOTE_PATH}" && echo installed'
+)
+
+# 스냅샷에 담는 중간 샘플: (시각, GPU 레코드)
+Sample = Tuple[float, List[GpuRecord]]
+
+
+def attach_command(interval: float, capacity: int) -> str:
+    """같은 이름의 파일이 있으면 내용도 같으므로 (이름에 해시 포함) 업로드 없이 바로 실행"""
+    return (f'command -v python3 >/dev/null 2>&1 || exit {EXIT_NO_PYTHON}; '
+            f'test -f "{REMOTE_PATH}" || exit {EXIT_MISSING}; '
+            f'exec python3 "{REMOTE_PATH}" attach {interval:g} {int(capacity)}')
+
+
+class AgentUnavailable(Exception):
+    """에이전트를 설치하거나 실행할 수 없는 서버"""
+
+
+class AgentSession:
+    """서버 한 대에 열어 둔 에이전트 채널과 지금까지 받은 상태"""
+
+    def __init__(self, channel: paramiko.Channel):
+        self.channel = channel
+        self.reader = channel.makefile("rb")
+        self.seq = 0
+        self.gpus: Dict[int, Tuple[str, int, str]] = {}  # index -> (uuid, memory_total, name)
+        self.processes: List[List] = []
+        self.latest: Optional[Sample] = None
+
+    def request(self, timeout: float) -> Dict:
+        self.channel.settimeout(timeout)
+        self.channel.sendall(json.dumps({"since": self.seq}).encode() + b"\n")
+        line = self.reader.readline()
+        if not line:
+            raise EOFError("에이전트 채널이 닫혔습니다")
+        response = json.loads(line)
+        if "error" in response:
+            raise RuntimeError(f"에이전트 오류: {response['error']}")
+        return response
+
+    def _records(self, rows: List[List[int]]) -> List[GpuRecord]:
+        records = []
+        for index, used, util, temp in rows:
+            uuid, total, name = self.gpus.get(index, ("", -1, ""))
+            records.append(GpuRecord(index, uuid, name, used, total, util, temp))
+        return records
+
+    def apply(self, response: Dict, received_at: float) -> List[Sample]:
+        """응답을 누적 상태에 반영하고 새로 받은 샘플을 (로컬 시각 기준으로) 반환"""
+        offset = received_at - response["time"]  # 서버와 로컬의 시계 차이
+        self.gpus = {index: (uuid, total, name) for index, uuid, total, name in response["gpus"]}
+        if "processes" in response:
+            self.processes = response["processes"]
+        samples = [(t + offset, self._records(rows)) for _, t, rows in response["samples"]]
+        if samples:
+            self.latest = samples[-1]
+        self.seq = response["seq"]
+        return samples
+
+    def gpu_snapshot(self) -> GpuSnapshot:
+        gpus = self.latest[1] if self.latest else []
+        uuid_to_index = {uuid: index for index, (uuid, _, _) in self.gpus.items()}
+        processes = []
+        for pid, uuid, used, name, *details in self.processes:
+            processes.append(ProcessRecord(pid, uuid, used, name, uuid_to_index.get(uuid, -1), *details))
+        return GpuSnapshot(gpus, processes)
+
+    def close(self):
+        try:
+            self.channel.close()
+        except Exception:
+            pass
+
+
+class AgentClient:
+    """서버별 에이전트 세션을 관리 (설치, 채널 재연결, 쓸 수 없는 서버 기억)"""
+
+    def __init__(self, pool: SSHConnectionPool, interval: float = DEFAULT_INTERVAL,
+                 capacity: int = DEFAULT_CAPACITY, retry_interval: float = DEFAULT_RETRY_INTERVAL,
+                 metrics: Optional[LatencyRecorder] = None):
+        self.pool = pool
+        self.interval = float(interval)
+        self.capacity = int(capacity)
+        self.retry_interval = float(retry_interval)
+        self.metrics = metrics or pool.metrics
+        self._sessions: Dict[Tuple[str, str], AgentSession] = {}
+        self._unavailable: Dict[str, Tuple[float, str]] = {}  # 서버 이름 -> (다시 시도할 시각, 이유)
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+
+    @classmethod
+    def from_config(cls, config: Dict, pool: SSHConnectionPool) -> "AgentClient":
+        """servers.json 의 "agent" 항목으로 생성"""
+        options = config.get("agent", {})
+        return cls(
+            pool,
+            interval=options.get("interval", DEFAULT_INTERVAL),
+            capacity=options.get("capacity", DEFAULT_CAPACITY),
+            retry_interval=options.get("retry_interval", DEFAULT_RETRY_INTERVAL),
+        )
+
+    def _key_lock(self, key: Tuple[str, str]) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def unavailable_reason(self, server: Dict) -> Optional[str]:
+        """최근에 에이전트를 쓸 수 없었던 서버면 그 이유"""
+        with self._lock:
+            entry = self._unavailable.get(server["name"])
+        if entry is None or time.monotonic() >= entry[0]:
+            return None
+        return entry[1]
+
+    def mark_unavailable(self, server: Dict, reason: str):
+        """retry_interval 동안 이 서버에서는 에이전트를 쓰지 않는다"""
+        with self._lock:
+            self._unavailable[server["name"]] = (time.monotonic() + self.retry_interval, reason)
+
+    def install(self, server: Dict, username: str, password: str, timeout: float):
+        """에이전트 스크립트를 표준 입력으로 업로드 (이전 버전 파일은 삭제)"""
+        with self.metrics.time(server["name"], "agent_install"):
+            output = self.pool.run(server["ip"], username, password, INSTALL_COMMAND, timeout,
+                                   input=AGENT_SOURCE, **self.pool.server_options(server))
+        if "installed" not in output:
+            raise AgentUnavailable(f"에이전트 설치 실패: {output.strip() or '응답 없음'}")
+
+    def _open_channel(self, server: Dict, username: str, password: str, timeout: float) -> paramiko.Channel:
+        options = self.pool.server_options(server)
+        for attempt in range(2):
+            transport = self.pool.get_transport(server["ip"], username, password, timeout, **options)
+            try:
+                return transport.open_session(timeout=timeout)
+            except (paramiko.SSHException, EOFError, OSError):
+                self.pool.discard(server["ip"], username, options["port"])
+                if attempt:
+                    raise
+
+    def _open(self, server: Dict, username: str, password: str, timeout: float) -> AgentSession:
+        """에이전트 채널을 열고, 설치되어 있지 않으면 설치 후 한 번 더 시도"""
+        for attempt in range(2):
+            with self.metrics.time(server["name"], "agent_attach"):
+                channel = self._open_channel(server, username, password, timeout)
+                channel.settimeout(max(timeout, START_TIMEOUT))
+                channel.exec_command(attach_command(self.interval, self.capacity))
+                session = AgentSession(channel)
+                ready = session.reader.readline()
+            try:
+                reply = json.loads(ready) if ready else {}
+            except ValueError:
+                reply = {"error": ready.decode(errors="replace").strip()}
+            if reply.get("ready"):
+                return session
+            # 준비 응답 없이 채널만 열려 있는 경우 종료 코드를 기다리며 멈추지 않도록 제한 시간을 둔다
+            deadline = time.monotonic() + timeout
+            while not channel.exit_status_ready():
+                if time.monotonic() >= deadline:
+                    session.close()
+                    raise AgentUnavailable("에이전트가 준비 응답 없이 종료되지 않았습니다")
+                time.sleep(0.05)
+            status = channel.recv_exit_status()
+            session.close()
+            if reply.get("error"):
+                raise AgentUnavailable(f"에이전트 실행 실패: {reply['error']}")
+            if status == EXIT_MISSING and not attempt:
+                self.install(server, username, password, timeout)
+                continue
+            if status == EXIT_NO_PYTHON:
+                raise AgentUnavailable("서버에 python3 가 없습니다")
+            raise AgentUnavailable(f"에이전트 실행 실패 (종료 코드 {status})")
+        raise AgentUnavailable("설치 후에도 에이전트를 찾을 수 없습니다")
+
+    def fetch(self, server: Dict, username: str, password: str, timeout: float) -> ServerSnapshot:
+        """마지막 조회 이후의 변경분을 받아 스냅샷 생성. 쓸 수 없는 서버면 AgentUnavailable"""
+        name = server["name"]
+        reason = self.unavailable_reason(server)
+        if reason is not None:
+            raise AgentUnavailable(reason)
+        key = (name, username)
+        with self._key_lock(key):
+            session = self._sessions.pop(key, None)
+            for attempt in range(2):
+                reused = session is not None
+                try:
+                    if session is None:
+                        session = self._open(server, username, password, timeout)
+                    with self.metrics.time(name, "agent_poll"):
+                        response = session.request(timeout)
+                    break
+                except AgentUnavailable as e:
+                    self.mark_unavailable(server, str(e))
+                    raise
+                except (paramiko.SSHException, EOFError, OSError, ValueError, RuntimeError):
+                    # 에이전트가 재시작되었거나 풀에서 세션이 정리된 경우 채널을 새로 연다
+                    # (새로 연 채널이 실패했다면 다시 연결해도 같은 제한 시간만 더 기다리게 된다)
+                    if session is not None:
+                        session.close()
+                    session = None
+                    if attempt or not reused:
+                        raise
+            with self.metrics.time(name, "parse"):
+                samples = session.apply(response, time.time())
+                gpu = session.gpu_snapshot()
+            self._sessions[key] = session
+        self.pool.touch(server["ip"], username, server.get("port", 22))
+
+        taken_at = session.latest[0] if session.latest else time.time()
+        return ServerSnapshot(name, response["sections"], gpu, taken_at, samples=samples)
+
+    def close_all(self):
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
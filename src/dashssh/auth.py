@@ -0,0 +1,184 @@
+"""하나의 Transport 위에서 인증 방법을 차례로 시도하고 성공한 방법을 기억
+
+시도 순서: 지난번에 성공한 방법 -> ssh-agent 키 -> 키 파일 -> 비밀번호.
+성공한 방법은 (host, port, user) 별로 데이터 폴더에 저장하여 다음 연결부터 바로 사용한다.
+키가 없거나 거부되어도 같은 연결에서 비밀번호로 넘어가므로 핸드셰이크는 한 번뿐이다.
+"""
+import json
+import os
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import paramiko
+
+from .metrics import LatencyRecorder
+from .paths import data_path
+
+DEFAULT_KEY_FILES = ("~/.ssh/id_ed25519", "~/.ssh/id_ecdsa", "~/.ssh/id_rsa")
+
+# 기억하는 인증 방법: {"method": "agent" | "key" | "password", "key": 지문 또는 키 파일 경로}
+AuthMethod = Dict[str, str]
+
+
+class AuthMethodCache:
+    """(host, port, user) 별로 마지막에 성공한 인증 방법을 JSON 파일에 보관"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or data_path("auth_methods.json")
+        self._lock = threading.Lock()
+        self._methods: Dict[str, AuthMethod] = {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self._methods = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    @staticmethod
+    def _key(host: str, port: int, username: str) -> str:
+        return f"{username}@{host}:{port}"
+
+    def get(self, host: str, port: int, username: str) -> Optional[AuthMethod]:
+        with self._lock:
+            return self._methods.get(self._key(host, port, username))
+
+    def remember(self, host: str, port: int, username: str, method: AuthMethod):
+        key = self._key(host, port, username)
+        with self._lock:
+            if self._methods.get(key) == method:
+                return
+            self._methods[key] = method
+            data = json.dumps(self._methods, ensure_ascii=False, indent=2)
+        self._save(data)
+
+    def forget(self, host: str, port: int, username: str):
+        with self._lock:
+            if self._methods.pop(self._key(host, port, username), None) is None:
+                return
+            data = json.dumps(self._methods, ensure_ascii=False, indent=2)
+        self._save(data)
+
+    def _save(self, data: str):
+        try:
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # 저장하지 못해도 이번 실행 동안은 메모리에서 사용
+
+
+class Authenticator:
+    """에이전트/키 파일/비밀번호 순서로 인증 (키는 한 번 읽어 재사용)"""
+
+    def __init__(self, key_files: Optional[List[str]] = None, use_agent: bool = True,
+                 cache: Optional[AuthMethodCache] = None, metrics: Optional[LatencyRecorder] = None):
+        self.key_files = [os.path.expanduser(path) for path in (key_files or DEFAULT_KEY_FILES)]
+        self.use_agent = use_agent
+        self.cache = cache or AuthMethodCache()
+        self.metrics = metrics or LatencyRecorder()
+        self._lock = threading.Lock()
+        self._file_keys: Optional[List[Tuple[str, paramiko.PKey]]] = None
+        self._agent: Optional[paramiko.Agent] = None
+
+    @classmethod
+    def from_config(cls, config: Dict, metrics: Optional[LatencyRecorder] = None) -> "Authenticator":
+        """servers.json 의 "auth" 항목 ({"key_files": [...], "use_agent": true})"""
+        options = config.get("auth", {})
+        return cls(key_files=options.get("key_files"), use_agent=options.get("use_agent", True),
+                   metrics=metrics)
+
+    def _load_file_keys(self) -> List[Tuple[str, paramiko.PKey]]:
+        """존재하고 암호가 걸려 있지 않은 키 파일만 한 번 읽어 둔다"""
+        with self._lock:
+            if self._file_keys is None:
+                keys = []
+                for path in self.key_files:
+                    if not os.path.exists(path):
+                        continue
+                    try:
+                        keys.append((path, paramiko.PKey.from_path(path)))
+                    except (paramiko.SSHException, OSError, ValueError):
+                        continue  # 암호가 걸린 키나 읽을 수 없는 키는 건너뜀
+                self._file_keys = keys
+            return self._file_keys
+
+    def _agent_keys(self) -> List[paramiko.AgentKey]:
+        if not self.use_agent:
+            return []
+        with self._lock:
+            if self._agent is None:
+                try:
+                    self._agent = paramiko.Agent()
+                except Exception:
+                    self.use_agent = False
+                    return []
+        try:
+            return list(self._agent.get_keys())
+        except Exception:
+            return []
+
+    def _candidates(self, allowed: List[str]) -> Iterator[Tuple[AuthMethod, object]]:
+        if "publickey" in allowed:
+            for key in self._agent_keys():
+                yield {"method": "agent", "key": key.fingerprint}, key
+            for path, key in self._load_file_keys():
+                yield {"method": "key", "key": path}, key
+        if "password" in allowed or "keyboard-interactive" in allowed:
+            yield {"method": "password"}, None
+
+    def _resolve(self, method: AuthMethod) -> Optional[object]:
+        """기억해 둔 방법에 해당하는 키 (없어졌으면 None)"""
+        if method["method"] == "agent":
+            return next((key for key in self._agent_keys() if key.fingerprint == method.get("key")), None)
+        if method["method"] == "key":
+            return next((key for path, key in self._load_file_keys() if path == method.get("key")), None)
+        return None
+
+    def _try(self, transport: paramiko.Transport, username: str, password: str,
+             method: AuthMethod, key, label: str) -> bool:
+        with self.metrics.time(label, f"auth_{method['method']}"):
+            try:
+                if method["method"] == "password":
+                    transport.auth_password(username, password)
+                else:
+                    transport.auth_publickey(username, key)
+            except paramiko.AuthenticationException:  # BadAuthenticationType 포함
+                return False
+        return transport.is_authenticated()
+
+    def _allowed_methods(self, transport: paramiko.Transport, username: str) -> List[str]:
+        """auth none 요청으로 서버가 허용하는 방법을 확인 (핸드셰이크 없이 왕복 한 번)"""
+        try:
+            transport.auth_none(username)
+        except paramiko.BadAuthenticationType as e:
+            return list(e.allowed_types)
+        except paramiko.AuthenticationException:
+            pass
+        return ["publickey", "password"]
+
+    def authenticate(self, transport: paramiko.Transport, host: str, port: int,
+                     username: str, password: str, label: Optional[str] = None) -> AuthMethod:
+        """transport 를 인증하고 성공한 방법을 반환. 모두 실패하면 AuthenticationException"""
+        label = label or host
+        remembered = self.cache.get(host, port, username)
+        if remembered is not None:
+            key = self._resolve(remembered)
+            if (key is not None or remembered["method"] == "password") and \
+                    self._try(transport, username, password, remembered, key, label):
+                return remembered
+            # 키가 바뀌었거나 서버 설정이 달라짐: 다른 방법이 성공하기 전에 실패하더라도
+            # ssh config(IdentitiesOnly 등)에 오래된 방법이 남지 않도록 지금 지운다
+            self.cache.forget(host, port, username)
+
+        allowed = self._allowed_methods(transport, username)
+        if transport.is_authenticated():  # auth none 으로 통과하는 서버
+            return {"method": "none"}
+        for method, key in self._candidates(allowed):
+            if method == remembered:
+                continue
+            if not transport.is_active():
+                break  # 시도 횟수 초과 등으로 서버가 연결을 끊음
+            if self._try(transport, username, password, method, key, label):
+                self.cache.remember(host, port, username, method)
+                return method
+        raise paramiko.AuthenticationException(f"{username}@{host}: 사용 가능한 인증 방법이 모두 실패했습니다")
@@ -0,0 +1,295 @@
+"""서버별 최근 상태 스냅샷 캐시와 백그라운드 갱신"""
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .cancel import Cancelled, CancelToken
+from .nvsmi import GpuRecord, GpuSnapshot
+from .sysinfo import parse_disk, parse_loadavg, parse_memory, parse_users
+
+DEFAULT_TTL = 60.0
+DEFAULT_REFRESH_INTERVAL = 120.0
+DEFAULT_MAX_CONCURRENT_REFRESHES = 3
+FREE_GPU_MEMORY_MIB = 1024  # 이 값 이하로 사용 중이고 프로세스가 없으면 빈 GPU 로 간주
+
+
+@dataclass
+class ServerSnapshot:
+    """서버 한 대의 조회 결과 (probe 섹션 + 파싱된 GPU 레코드)"""
+    server_name: str
+    sections: Dict[str, str]
+    gpu: Optional[GpuSnapshot] = None
+    taken_at: float = field(default_factory=time.time)
+    # 에이전트 조회에서 지난 조회 이후 받은 중간 샘플 (시각, GPU 레코드). 시계열 기록에 사용
+    samples: List[Tuple[float, List[GpuRecord]]] = field(default_factory=list)
+
+    @property
+    def age(self) -> float:
+        return max(0.0, time.time() - self.taken_at)
+
+    def free_gpu_count(self) -> Optional[int]:
+        if self.gpu is None:
+            return None
+        busy = {proc.gpu_index for proc in self.gpu.processes}
+        return sum(1 for gpu in self.gpu.gpus
+                   if gpu.index not in busy and 0 <= gpu.memory_used <= FREE_GPU_MEMORY_MIB)
+
+    def free_memory_mib(self) -> Optional[int]:
+        if self.gpu is None:
+            return None
+        return sum(gpu.memory_free for gpu in self.gpu.gpus if gpu.memory_free > 0)
+
+    def to_dict(self) -> Dict:
+        """JSON 으로 내보낼 수 있는 형태"""
+        data = {
+            "server": self.server_name,
+            "taken_at": self.taken_at,
+            "users": parse_users(self.sections.get("users", "")),
+            "loadavg": parse_loadavg(self.sections.get("loadavg", "")),
+            "memory": parse_memory(self.sections.get("memory", "")),
+            "disk": parse_disk(self.sections.get("disk", "")),
+            "free_gpus": self.free_gpu_count(),
+            "free_memory_mib": self.free_memory_mib(),
+        }
+        if self.gpu is not None:
+            data.update(self.gpu.to_dict())
+        else:
+            data["gpu_output"] = self.sections.get("gpu", "")
+        return data
+
+    def to_state(self) -> Dict:
+        """from_state 로 그대로 복원할 수 있는 형태 (원본 섹션 포함, 중간 샘플 제외)"""
+        return {
+            "server": self.server_name,
+            "taken_at": self.taken_at,
+            "sections": self.sections,
+            "gpu": self.gpu.to_dict() if self.gpu is not None else None,
+        }
+
+    @classmethod
+    def from_state(cls, data: Dict) -> "ServerSnapshot":
+        gpu = GpuSnapshot.from_dict(data["gpu"]) if data.get("gpu") is not None else None
+        return cls(data["server"], data["sections"], gpu, data["taken_at"])
+
+
+def format_age(seconds: float) -> str:
+    """경과 시간을 '12초 전' 형태로 표시"""
+    if seconds < 60:
+        return f"{int(seconds)}초 전"
+    if seconds < 3600:
+        return f"{int(seconds // 60)}분 전"
+    return f"{int(seconds // 3600)}시간 전"
+
+
+class _Entry:
+    __slots__ = ("snapshot", "error", "future", "token", "last_attempt")
+
+    def __init__(self):
+        self.snapshot: Optional[ServerSnapshot] = None
+        self.error: Optional[str] = None
+        self.future: Optional[Future] = None
+        self.token: Optional[CancelToken] = None  # 진행 중인 갱신의 취소 토큰
+        self.last_attempt = 0.0
+
+
+Listener = Callable[[Dict, Optional[ServerSnapshot], Optional[str]], None]
+
+
+class SnapshotCache:
+    """서버별 스냅샷을 TTL 과 함께 보관하고 백그라운드에서 주기적으로 갱신
+
+    조회 중에도 마지막 스냅샷을 바로 돌려주며 (stale-while-revalidate),
+    같은 서버에 대한 갱신은 한 번에 하나만 실행된다. 동시에 실행되는
+    갱신 수는 max_concurrent_refreshes 로 제한한다. fetch(server, cancel) 는
+    cancel 이 취소되면 Cancelled 를 던지며, 취소된 갱신은 결과도 오류도 남기지 않는다.
+    """
+
+    def __init__(self, fetch: Callable[[Dict, CancelToken], ServerSnapshot], ttl: float = DEFAULT_TTL,
+                 refresh_interval: float = DEFAULT_REFRESH_INTERVAL,
+                 max_concurrent_refreshes: int = DEFAULT_MAX_CONCURRENT_REFRESHES):
+        self.fetch = fetch
+        self.ttl = float(ttl)
+        self.refresh_interval = float(refresh_interval)
+        self.max_concurrent_refreshes = max(1, int(max_concurrent_refreshes))
+        self._entries: Dict[str, _Entry] = {}
+        self._listeners: List[Listener] = []
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent_refreshes,
+                                            thread_name_prefix="snapshot-refresh")
+        self._stop = threading.Event()
+        self._scheduler: Optional[threading.Thread] = None
+        self._servers: List[Dict] = []
+        self._watched: Dict[str, float] = {}  # 감시 규칙 대상 서버 -> 갱신 주기
+
+    @classmethod
+    def from_config(cls, config: Dict, fetch: Callable[[Dict, CancelToken], ServerSnapshot]) -> "SnapshotCache":
+        """servers.json 의 "cache" 항목으로 캐시 생성"""
+        options = config.get("cache", {})
+        return cls(
+            fetch,
+            ttl=options.get("ttl", DEFAULT_TTL),
+            refresh_interval=options.get("refresh_interval", DEFAULT_REFRESH_INTERVAL),
+            max_concurrent_refreshes=options.get("max_concurrent_refreshes", DEFAULT_MAX_CONCURRENT_REFRESHES),
+        )
+
+    def _entry(self, name: str) -> _Entry:
+        entry = self._entries.get(name)
+        if entry is None:
+            entry = self._entries[name] = _Entry()
+        return entry
+
+    def get(self, name: str) -> Optional[ServerSnapshot]:
+        with self._lock:
+            entry = self._entries.get(name)
+            return entry.snapshot if entry else None
+
+    def error(self, name: str) -> Optional[str]:
+        """마지막 갱신이 실패했다면 그 오류 메시지"""
+        with self._lock:
+            entry = self._entries.get(name)
+            return entry.error if entry else None
+
+    def put(self, server: Dict, snapshot: Optional[ServerSnapshot], error: Optional[str] = None):
+        """외부에서 얻은 스냅샷 (예: 전체 조회 결과, 수집 데몬) 저장 후 listener 에 알림
+
+        snapshot 이 None 이면 마지막 스냅샷은 그대로 두고 오류만 기록한다.
+        """
+        with self._lock:
+            entry = self._entry(server["name"])
+            if snapshot is not None:
+                entry.snapshot = snapshot
+            entry.error = error
+            current = entry.snapshot
+        self._notify(server, current, error)
+
+    def is_fresh(self, name: str) -> bool:
+        snapshot = self.get(name)
+        return snapshot is not None and snapshot.age < self.ttl
+
+    def is_refreshing(self, name: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(name)
+            return entry is not None and entry.future is not None and not entry.future.done()
+
+    def subscribe(self, listener: Listener):
+        """갱신이 끝날 때마다 listener(server, snapshot, error) 호출 (작업 스레드에서 실행)"""
+        self._listeners.append(listener)
+
+    def refresh(self, server: Dict) -> Future:
+        """갱신 요청. 이미 진행 중인 갱신이 있으면 그 Future 를 돌려준다
+
+        진행 중인 갱신이 취소된 것이면 (결과를 알리지 않고 끝나므로) 새로 시작한다.
+        """
+        with self._lock:
+            entry = self._entry(server["name"])
+            if entry.future is not None and not entry.future.done() and not entry.token.cancelled:
+                return entry.future
+            entry.last_attempt = time.monotonic()
+            entry.token = CancelToken()
+            entry.future = self._executor.submit(self._refresh, server, entry.token)
+            return entry.future
+
+    def cancel(self, name: str) -> bool:
+        """진행 중인 갱신 취소 (대기 중이면 실행하지 않고, 실행 중이면 채널을 닫는다)"""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or entry.future is None or entry.future.done():
+                return False
+            future, token = entry.future, entry.token
+        if not future.cancel():
+            token.cancel()
+        return True
+
+    def _refresh(self, server: Dict, token: CancelToken) -> Optional[ServerSnapshot]:
+        snapshot, error = None, None
+        try:
+            snapshot = self.fetch(server, token)
+        except Cancelled:
+            return None
+        except Exception as e:
+            if token.cancelled:
+                return None  # 취소로 연결이 끊겨 난 오류
+            error = str(e) or type(e).__name__
+        with self._lock:
+            entry = self._entry(server["name"])
+            if snapshot is not None:
+                entry.snapshot = snapshot
+            entry.error = error
+            current = entry.snapshot
+        self._notify(server, current, error)
+        return current
+
+    def _notify(self, server: Dict, snapshot: Optional[ServerSnapshot], error: Optional[str]):
+        for listener in list(self._listeners):
+            try:
+                listener(server, snapshot, error)
+            except Exception:
+                pass
+
+    def interval_for(self, server: Dict) -> float:
+        """서버별 갱신 주기 (servers.json 의 refresh_interval, 0 이면 자동 갱신 안 함)
+
+        감시 규칙이 지켜보는 서버는 set_watched 로 정한 주기가 더 짧으면 그 주기를 쓴다.
+        """
+        interval = float(server.get("refresh_interval", self.refresh_interval))
+        watched = self._watched.get(server["name"])
+        if watched is not None and (interval <= 0 or watched < interval):
+            return watched
+        return interval
+
+    def set_watched(self, names: Iterable[str], interval: float):
+        """names 서버를 interval 초마다 갱신 (감시 규칙 대상이 바뀔 때마다 호출)"""
+        self._watched = {name: float(interval) for name in names} if interval > 0 else {}
+
+    def start(self, servers: List[Dict]):
+        """servers 를 주기적으로 갱신하는 스케줄러 스레드 시작"""
+        self.set_servers(servers)
+        if self._scheduler is not None and self._scheduler.is_alive():
+            return
+        self._stop.clear()
+        self._scheduler = threading.Thread(target=self._schedule, name="snapshot-scheduler", daemon=True)
+        self._scheduler.start()
+
+    def set_servers(self, servers: List[Dict]):
+        """스케줄러가 갱신할 서버 목록 교체
+
+        빠진 서버는 진행 중인 갱신을 취소하고 캐시에서 지운다. 설정(IP 등)이 바뀐 서버는
+        진행 중인 갱신을 취소하고 다음 스케줄 때 바로 다시 조회한다.
+        """
+        names = {server["name"] for server in servers}
+        with self._lock:
+            previous = {server["name"]: server for server in self._servers}
+            self._servers = list(servers)
+            removed = [name for name in self._entries if name not in names]
+            changed = [server["name"] for server in servers
+                       if server["name"] in previous and previous[server["name"]] != server]
+        for name in removed + changed:
+            self.cancel(name)
+        with self._lock:
+            for name in removed:
+                self._entries.pop(name, None)
+            for name in changed:
+                self._entry(name).last_attempt = 0.0
+
+    def _schedule(self):
+        while not self._stop.is_set():
+            now = time.monotonic()
+            with self._lock:
+                servers = self._servers
+            for server in servers:
+                interval = self.interval_for(server)
+                if interval <= 0:
+                    continue
+                with self._lock:
+                    entry = self._entry(server["name"])
+                    busy = entry.future is not None and not entry.future.done()
+                    due = now - entry.last_attempt >= interval
+                if due and not busy and not self._stop.is_set():
+                    self.refresh(server)
+            self._stop.wait(1.0)
+
+    def stop(self):
+        self._stop.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
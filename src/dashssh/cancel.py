@@ -0,0 +1,50 @@
+"""진행 중인 조회를 다른 스레드에서 취소하기 위한 토큰"""
+import threading
+from typing import Callable, List
+
+
+class Cancelled(Exception):
+    """취소된 조회 (결과를 버린다)"""
+
+
+class CancelToken:
+    """cancel() 이 불리면 등록된 콜백 (예: 채널 닫기) 을 실행"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """취소될 때 callback 실행 (이미 취소되었으면 바로). 등록을 해제하는 함수를 반환"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._remove(callback)
+        callback()
+        return lambda: None
+
+    def _remove(self, callback: Callable[[], None]):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def check(self):
+        if self._event.is_set():
+            raise Cancelled("조회가 취소되었습니다")
@@ -0,0 +1,386 @@
+"""헤드리스 명령줄 진입점 (Flet 을 import 하지 않음)
+
+    python -m dashssh status --all --json
+    python -m dashssh status Server1 Server4 --ndjson
+    python -m dashssh find -n 2 --min-free 20 --spec "NVIDIA RTX A5000"
+    python -m dashssh summary --json
+    python -m dashssh status --all --metrics timings.prom
+    python -m dashssh serve --port 8891
+    python -m dashssh watch -n 2 --min-free 20 --spec "NVIDIA RTX A5000" --once --command "python train.py"
+    python -m dashssh watch --pid Server4:12345
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+from .config import load_config
+
+EXIT_OK = 0
+EXIT_PARTIAL = 1        # 일부 서버 연결 실패 (find: 조건에 맞는 GPU 없음)
+EXIT_UNREACHABLE = 2    # 모든 서버 연결 실패
+EXIT_USAGE = 3          # 설정 파일/서버 이름 오류
+
+
+def select_servers(config: Dict, names: List[str], select_all: bool) -> List[Dict]:
+    servers = config["servers"]
+    if select_all or not names:
+        return list(servers)
+    by_name = {server["name"]: server for server in servers}
+    unknown = [name for name in names if name not in by_name]
+    if unknown:
+        raise KeyError(", ".join(unknown))
+    return [by_name[name] for name in names]
+
+
+def result_record(result, snapshot) -> Dict:
+    record = {
+        "server": result.server["name"],
+        "ip": result.server["ip"],
+        "ok": result.ok,
+        "error": result.error,
+        "elapsed": round(result.elapsed, 3),
+    }
+    if snapshot is not None:
+        record.update(snapshot.to_dict())
+    return record
+
+
+def apply_probe_options(args: argparse.Namespace, config: Dict):
+    probe = config.setdefault("probe", {})
+    if args.concurrency:
+        probe["max_concurrency"] = args.concurrency
+    if args.timeout:
+        probe["host_timeout"] = args.timeout
+    if args.sweep_timeout:
+        probe["sweep_timeout"] = args.sweep_timeout
+
+
+async def run_status(args: argparse.Namespace, config: Dict, servers: List[Dict]) -> int:
+    from .collector import Collector
+    from .formatting import format_snapshot
+
+    apply_probe_options(args, config)
+    collector = Collector(config)
+    username, password = collector.credentials(args.user, os.environ.get("DASHSSH_PASSWORD"))
+    records = []
+    ok = 0
+    try:
+        async for result, snapshot in collector.sweep(servers, username, password):
+            ok += result.ok
+            if args.format == "ndjson":
+                # 서버 조회가 끝날 때마다 한 줄씩 출력
+                print(json.dumps(result_record(result, snapshot), ensure_ascii=False), flush=True)
+            elif args.format == "json":
+                records.append(result_record(result, snapshot))
+            else:
+                print(f"=== {result.server['name']} ({result.server['ip']}) ===")
+                print(format_snapshot(snapshot) if snapshot is not None else f"연결 실패: {result.error}")
+                print(flush=True)
+    finally:
+        collector.close()
+        save_metrics(args, collector)
+
+    if args.format == "json":
+        json.dump(records, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+
+    if ok == len(servers):
+        return EXIT_OK
+    return EXIT_PARTIAL if ok else EXIT_UNREACHABLE
+
+
+async def run_find(args: argparse.Namespace, config: Dict, servers: List[Dict]) -> int:
+    from .collector import Collector
+    from .finder import GpuFinder
+
+    apply_probe_options(args, config)
+    collector = Collector(config)
+    username, password = collector.credentials(args.user, os.environ.get("DASHSSH_PASSWORD"))
+    finder = GpuFinder(servers)
+    reachable = 0
+    try:
+        async for result, snapshot in collector.sweep(servers, username, password):
+            if snapshot is not None:
+                reachable += 1
+                finder.update(snapshot)
+    finally:
+        collector.close()
+        save_metrics(args, collector)
+
+    placements = finder.find(args.count, args.min_free, args.spec, limit=args.limit)
+    if args.format == "json":
+        json.dump([placement.to_dict() for placement in placements], sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+    elif not placements:
+        print("조건에 맞는 GPU 가 없습니다.")
+    else:
+        for placement in placements:
+            print(f"{placement.server_name:<10} CUDA_VISIBLE_DEVICES={placement.cuda_visible_devices:<8} "
+                  f"최소 여유 {placement.min_free_mib / 1024:5.1f}GB  사용률 {placement.mean_utilization:3.0f}%  "
+                  f"함께 실행 중 {placement.co_tenants}")
+    if not reachable:
+        return EXIT_UNREACHABLE
+    return EXIT_OK if placements else EXIT_PARTIAL
+
+
+async def run_summary(args: argparse.Namespace, config: Dict, servers: List[Dict]) -> int:
+    from .collector import Collector
+    from .formatting import format_cluster_summary
+    from .summary import ClusterSummary
+
+    apply_probe_options(args, config)
+    collector = Collector(config)
+    username, password = collector.credentials(args.user, os.environ.get("DASHSSH_PASSWORD"))
+    summary = ClusterSummary(servers)
+    reachable = 0
+    try:
+        async for result, snapshot in collector.sweep(servers, username, password):
+            if snapshot is not None:
+                reachable += 1
+                summary.update(snapshot)
+    finally:
+        collector.close()
+        save_metrics(args, collector)
+
+    pools = summary.summarize()
+    if args.format == "json":
+        json.dump([pool.to_dict() for pool in pools], sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+    else:
+        print(format_cluster_summary(pools))
+    if reachable == len(servers):
+        return EXIT_OK
+    return EXIT_PARTIAL if reachable else EXIT_UNREACHABLE
+
+
+def run_serve(args: argparse.Namespace, config: Dict) -> int:
+    from .daemon import CollectorDaemon
+
+    apply_probe_options(args, config)
+    defaults = config["credentials"]
+    username = args.user or defaults["default_username"]
+    password = os.environ.get("DASHSSH_PASSWORD") or defaults["default_password"]
+    try:
+        daemon = CollectorDaemon.from_config(config, username, password, host=args.host, port=args.port,
+                                             refresh_interval=args.interval)
+    except OSError as e:
+        print(f"수집 데몬을 시작할 수 없습니다: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    host, port = daemon.address
+    print(f"수집 데몬 실행 중: http://{host}:{port}/api/snapshots (서버 {len(daemon.servers)}대)", file=sys.stderr)
+    if daemon.exposed and not daemon.token:
+        print("경고: 토큰 없이 다른 PC 에 공개되어 누구나 프로세스 소유자/명령줄을 볼 수 있습니다. "
+              "servers.json 의 daemon.token 또는 DASHSSH_DAEMON_TOKEN 을 설정하세요.", file=sys.stderr)
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        save_metrics(args, daemon.collector)
+    return EXIT_OK
+
+
+def watch_rules(args: argparse.Namespace, config: Dict) -> List:
+    """명령줄 인자로 감시 규칙 생성. 서버 이름이 틀리면 KeyError"""
+    from .watch import GpuFreeRule, ProcessExitRule
+
+    names = {server["name"] for server in config["servers"]}
+    rules = []
+    if args.count or args.min_free or args.spec or args.server:
+        if args.server and args.server not in names:
+            raise KeyError(args.server)
+        rules.append(GpuFreeRule(args.count or 1, args.min_free, args.spec, args.server, command=args.hook))
+    for option, targets in (("pid", args.pid), ("user", args.watch_user)):
+        for target in targets:
+            name, _, value = target.rpartition(":")
+            if name not in names:
+                raise KeyError(name or target)
+            rules.append(ProcessExitRule(name, **{option: value}, command=args.hook))
+    return rules
+
+
+def run_watch(args: argparse.Namespace, config: Dict) -> int:
+    """조건이 만족될 때까지 대상 서버만 주기적으로 조회 (데몬이 있으면 데몬의 변경 알림 사용)"""
+    from .cache import SnapshotCache
+    from .daemonclient import DaemonClient
+    from .watch import WatchManager, notify_desktop
+
+    try:
+        rules = watch_rules(args, config)
+    except KeyError as e:
+        print(f"알 수 없는 서버: {e.args[0]}", file=sys.stderr)
+        return EXIT_USAGE
+    except ValueError as e:
+        print(f"잘못된 값: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    if not rules:
+        print("감시할 조건이 없습니다 (-n/--min-free/--spec/--server, --pid, --watch-user)", file=sys.stderr)
+        return EXIT_USAGE
+
+    manager = WatchManager.from_config(config, persist=False)
+    if args.interval:
+        manager.refresh_interval = args.interval
+    stop = threading.Event()
+
+    def on_event(event):
+        if args.format == "ndjson":
+            print(json.dumps(event.to_dict(), ensure_ascii=False), flush=True)
+        else:
+            print(f"{time.strftime('%H:%M:%S', time.localtime(event.fired_at))} {event.message}", flush=True)
+        if event.hook_error:
+            print(f"명령 실행 실패: {event.hook_error}", file=sys.stderr)
+        if args.desktop:
+            notify_desktop("DASH-SSH", event.message)
+        if args.once or not manager.rules():
+            stop.set()  # --once 이거나 한 번만 알리는 규칙(프로세스 종료)이 모두 끝남
+
+    manager.subscribe(on_event)
+    for rule in rules:
+        manager.add(rule)
+    watched = manager.watched_servers()
+    servers = [server for server in config["servers"] if server["name"] in watched]
+
+    daemon = DaemonClient.from_config(config)
+    collector = None
+    if daemon is not None:
+        by_name = {server["name"]: server for server in servers}
+
+        def on_change(entries):
+            for name, (snapshot, error) in entries.items():
+                if name in by_name:
+                    manager.update(by_name[name], snapshot, error)
+
+        daemon.follow(on_change, stop)
+    else:
+        from .collector import Collector
+
+        apply_probe_options(args, config)
+        collector = Collector(config)
+        username, password = collector.credentials(args.user, os.environ.get("DASHSSH_PASSWORD"))
+        cache = SnapshotCache(
+            lambda server, cancel: collector.fetch_snapshot(server, username, password, cancel=cancel),
+            ttl=manager.refresh_interval, refresh_interval=manager.refresh_interval,
+            max_concurrent_refreshes=collector.engine.max_concurrency)
+        cache.subscribe(manager.update)
+        cache.start(servers)
+    print(f"감시 중: 서버 {len(servers)}대 - " + "; ".join(rule.describe() for rule in rules), file=sys.stderr)
+    try:
+        while not stop.wait(1.0):
+            pass
+    except KeyboardInterrupt:
+        stop.set()
+    finally:
+        if collector is not None:
+            cache.stop()
+            collector.close()
+            save_metrics(args, collector)
+    return EXIT_OK
+
+
+def save_metrics(args: argparse.Namespace, collector):
+    if not args.metrics:
+        return
+    try:
+        collector.metrics.export(args.metrics)
+    except OSError as e:
+        print(f"측정값 저장 실패: {e}", file=sys.stderr)
+
+
+def add_probe_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--user", help="SSH 사용자 (비밀번호는 DASHSSH_PASSWORD 환경변수)")
+    parser.add_argument("--concurrency", type=int, help="동시 조회 서버 수")
+    parser.add_argument("--timeout", type=float, help="서버별 제한 시간 (초)")
+    parser.add_argument("--sweep-timeout", type=float, help="전체 제한 시간 (초)")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="단계별 지연 시간을 저장할 파일 (.prom 이면 Prometheus 형식, 그 외 JSON)")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="dashssh", description="DASH-SSH 서버 GPU 상태 조회")
+    parser.add_argument("--config", help="servers.json 경로 (기본: ./servers.json, ./config/servers.json)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    status = commands.add_parser("status", help="서버 상태 조회")
+    status.add_argument("servers", nargs="*", help="조회할 서버 이름 (생략 시 전체)")
+    status.add_argument("--all", action="store_true", help="모든 서버 조회")
+    output = status.add_mutually_exclusive_group()
+    output.add_argument("--json", dest="format", action="store_const", const="json",
+                        help="모든 결과를 JSON 배열로 출력")
+    output.add_argument("--ndjson", dest="format", action="store_const", const="ndjson",
+                        help="서버마다 완료 즉시 JSON 한 줄 출력")
+    add_probe_arguments(status)
+    status.set_defaults(format="text")
+
+    find = commands.add_parser("find", help="빈 GPU 배치 찾기")
+    find.add_argument("-n", "--count", type=int, default=1, help="필요한 GPU 수")
+    find.add_argument("--min-free", type=float, default=0.0, help="GPU 당 최소 여유 메모리 (GB)")
+    find.add_argument("--spec", help="GPU 종류 (servers.json 의 gpu_spec)")
+    find.add_argument("--limit", type=int, default=5, help="출력할 후보 수")
+    find.add_argument("--json", dest="format", action="store_const", const="json", help="JSON 으로 출력")
+    add_probe_arguments(find)
+    find.set_defaults(format="text")
+
+    summary = commands.add_parser("summary", help="GPU 종류별 전체 요약 (빈 GPU, 여유 메모리, 사용률, 주요 사용자)")
+    summary.add_argument("--json", dest="format", action="store_const", const="json", help="JSON 으로 출력")
+    add_probe_arguments(summary)
+    summary.set_defaults(format="text")
+
+    serve = commands.add_parser("serve", help="모든 서버를 주기적으로 조회하여 HTTP 로 제공하는 수집 데몬")
+    serve.add_argument("--host", help="수신 주소 (기본: servers.json 의 daemon.host 또는 127.0.0.1, "
+                                       "다른 PC 에 공개하려면 0.0.0.0)")
+    serve.add_argument("--port", type=int, help="수신 포트 (기본: daemon.port 또는 8891)")
+    serve.add_argument("--interval", type=float, help="서버별 조회 주기 (초, 기본: daemon.refresh_interval 또는 30)")
+    add_probe_arguments(serve)
+
+    watch = commands.add_parser("watch", help="빈 GPU 가 생기거나 프로세스가 끝날 때까지 감시")
+    watch.add_argument("-n", "--count", type=int, default=0, help="필요한 GPU 수")
+    watch.add_argument("--min-free", type=float, default=0.0, help="GPU 당 최소 여유 메모리 (GB)")
+    watch.add_argument("--spec", help="GPU 종류 (servers.json 의 gpu_spec)")
+    watch.add_argument("--server", help="빈 GPU 를 기다릴 서버 (생략 시 전체)")
+    watch.add_argument("--pid", action="append", default=[], metavar="SERVER:PID",
+                       help="종료를 기다릴 프로세스 (여러 번 지정 가능)")
+    watch.add_argument("--watch-user", action="append", default=[], metavar="SERVER:USER",
+                       help="해당 사용자의 GPU 프로세스가 모두 끝날 때까지")
+    watch.add_argument("--command", dest="hook", help="알림마다 실행할 명령 (CUDA_VISIBLE_DEVICES 등 환경변수 설정)")
+    watch.add_argument("--once", action="store_true", help="첫 알림 후 종료")
+    watch.add_argument("--interval", type=float, help="조회 주기 (초, 기본: watch.refresh_interval 또는 60)")
+    watch.add_argument("--desktop", action="store_true", help="운영체제 알림도 표시")
+    watch.add_argument("--ndjson", dest="format", action="store_const", const="ndjson",
+                       help="알림마다 JSON 한 줄 출력")
+    add_probe_arguments(watch)
+    watch.set_defaults(format="text")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    # 연결 실패 시 paramiko 가 stderr 로 남기는 traceback 억제 (실패 내용은 결과에 포함됨)
+    logging.getLogger("paramiko").addHandler(logging.NullHandler())
+    try:
+        config = load_config(args.config)
+    except (OSError, ValueError) as e:
+        print(f"설정 파일 오류: {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    if args.command == "status":
+        try:
+            servers = select_servers(config, args.servers, args.all)
+        except KeyError as e:
+            print(f"알 수 없는 서버: {e.args[0]}", file=sys.stderr)
+            return EXIT_USAGE
+        return asyncio.run(run_status(args, config, servers))
+    if args.command == "find":
+        return asyncio.run(run_find(args, config, config["servers"]))
+    if args.command == "summary":
+        return asyncio.run(run_summary(args, config, config["servers"]))
+    if args.command == "serve":
+        return run_serve(args, config)
+    if args.command == "watch":
+        return run_watch(args, config)
+    return EXIT_USAGE
@@ -0,0 +1,109 @@
+"""SSH 로 서버 상태를 수집하는 로직 (GUI 와 헤드리스 CLI 가 함께 사용)"""
+import socket
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from .agent import AgentClient, AgentUnavailable
+from .cache import ServerSnapshot
+from .cancel import Cancelled, CancelToken
+from .metrics import LatencyRecorder
+from .nvsmi import QUERY_COMMAND, parse_query_output
+from .pool import SSHConnectionPool
+from .procinfo import ProcessInfoCache, enrich_processes, parse_ps_output, parse_start_times
+from .probe import ProbeEngine, ProbeResult, SectionClock, build_probe_script, parse_probe_output
+
+
+class Collector:
+    """연결 풀과 병렬 조회 엔진을 묶어 서버 스냅샷을 만든다"""
+
+    def __init__(self, config: Dict, metrics: Optional[LatencyRecorder] = None):
+        self.config = config
+        # 연결/실행/파싱 단계별 지연 시간 (GUI 진단 패널, CLI --metrics 에서 사용)
+        self.metrics = metrics or LatencyRecorder()
+        self.pool = SSHConnectionPool.from_config(config, self.metrics)
+        self.engine = ProbeEngine.from_config(config)
+        self.agents = AgentClient.from_config(config, self.pool)
+        self.process_info = ProcessInfoCache()
+
+    def credentials(self, username: Optional[str] = None, password: Optional[str] = None) -> Tuple[str, str]:
+        """입력값이 없으면 servers.json 의 기본 계정 사용"""
+        defaults = self.config["credentials"]
+        return username or defaults["default_username"], password or defaults["default_password"]
+
+    def collection_mode(self, server: Dict) -> str:
+        """GPU 정보 수집 방식: "query" (CSV 쿼리), "table" (nvidia-smi 표 출력),
+        "agent" (서버에 상주 에이전트 설치, 쓸 수 없으면 query)"""
+        return server.get("collection") or self.config.get("probe", {}).get("collection", "query")
+
+    def gpu_command(self, server: Dict) -> str:
+        return 'nvidia-smi' if self.collection_mode(server) == "table" else QUERY_COMMAND
+
+    def probe(self, server: Dict, username: str, password: str, timeout: Optional[float] = None,
+              cancel: Optional[CancelToken] = None) -> str:
+        """사용자/GPU/부하/메모리/디스크 정보를 한 번의 exec 로 조회 (blocking)"""
+        known = self.process_info.known(server["name"]) if self.collection_mode(server) != "table" else ""
+        script = build_probe_script(self.gpu_command(server), known)
+        clock = SectionClock()
+        output = self.pool.run(server["ip"], username, password, script, timeout,
+                               on_line=clock.feed, cancel=cancel, **self.pool.server_options(server))
+        gpu_time = clock.durations().get("gpu")
+        if gpu_time is not None:
+            self.metrics.observe(server["name"], "nvidia_smi", gpu_time)
+        return output
+
+    def snapshot_from_output(self, server: Dict, output: str) -> ServerSnapshot:
+        """probe 출력으로 스냅샷 생성"""
+        with self.metrics.time(server["name"], "parse"):
+            sections = parse_probe_output(output)
+            gpu = None
+            if self.collection_mode(server) != "table":
+                gpu = parse_query_output(sections.get("gpu", ""))
+                procs = sections.get("procs", "")
+                infos = self.process_info.resolve(server["name"], parse_ps_output(procs), parse_start_times(procs))
+                enrich_processes(gpu.processes, infos)
+        return ServerSnapshot(server["name"], sections, gpu)
+
+    def fetch_snapshot(self, server: Dict, username: str, password: str,
+                       timeout: Optional[float] = None, cancel: Optional[CancelToken] = None) -> ServerSnapshot:
+        """cancel 이 취소되면 Cancelled (에이전트 조회는 응답이 짧으므로 앞뒤로만 확인)"""
+        with self.metrics.time(server["name"], "total"):
+            if self.collection_mode(server) == "agent":
+                if cancel is not None:
+                    cancel.check()
+                try:
+                    snapshot = self.agents.fetch(server, username, password, timeout or self.pool.connect_timeout)
+                except AgentUnavailable:
+                    pass  # 에이전트를 쓸 수 없는 서버는 nvidia-smi 로 조회
+                except (EOFError, RuntimeError, ValueError, socket.timeout) as e:
+                    # 다시 연결해도 채널이 끊기거나 에이전트가 응답하지 않음: 한동안 nvidia-smi 로 조회
+                    self.agents.mark_unavailable(server, f"에이전트 조회 실패: {e or type(e).__name__}")
+                else:
+                    if cancel is not None:
+                        cancel.check()
+                    return snapshot
+            output = self.probe(server, username, password, timeout, cancel)
+            return self.snapshot_from_output(server, output)
+
+    async def sweep(self, servers: List[Dict], username: str, password: str
+                    ) -> AsyncIterator[Tuple[ProbeResult, Optional[ServerSnapshot]]]:
+        """모든 서버를 병렬 조회하며 완료된 순서대로 (결과, 스냅샷) 전달"""
+        def probe(server: Dict, timeout: float, cancel: CancelToken) -> ServerSnapshot:
+            try:
+                return self.fetch_snapshot(server, username, password, timeout, cancel)
+            except Cancelled:
+                # 엔진이 기다리다 포기한 서버: 채널은 닫혔으므로 응답 없는 서버로 기록해 둔다
+                self.pool.health.record_failure(server["name"], socket.timeout("응답 시간 초과"))
+                raise
+
+        def wait_for(server: Dict, default: float) -> float:
+            # 응답이 느린 서버는 관측한 소요 시간만큼 기다리고, 차단된 서버는 연결 없이 바로 실패한다
+            # (실행 제한 시간 조정은 pool.run 이 하고, 엔진은 그만큼 기다리기만 한다).
+            # 풀에 세션이 없으면 pool.run 이 같은 제한 시간(default)으로 연결/인증부터 하므로 그만큼 더 기다린다
+            pooled = self.pool.has_transport(server["ip"], username, server.get("port", 22))
+            return self.pool.health.wait_for(server["name"], default, 0.0 if pooled else default)
+        async for result in self.engine.sweep(servers, probe, wait_for):
+            yield result, result.output if result.ok else None
+
+    def close(self):
+        self.engine.shutdown()
+        self.agents.close_all()
+        self.pool.close_all()
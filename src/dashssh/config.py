@@ -0,0 +1,90 @@
+"""servers.json 로드"""
+import json
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+CONFIG_NAME = "servers.json"
+# 저장소의 config/servers.json (src/dashssh 기준 두 단계 위)
+_REPO_CONFIG = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                            "config", CONFIG_NAME)
+
+
+def config_candidates(path: Optional[str] = None) -> List[str]:
+    """설정 파일을 찾을 경로 (앞에서부터 우선)"""
+    if path:
+        return [path]
+    candidates = []
+    if os.environ.get("DASHSSH_CONFIG"):
+        candidates.append(os.environ["DASHSSH_CONFIG"])
+    candidates += [CONFIG_NAME, os.path.join("config", CONFIG_NAME), _REPO_CONFIG]
+    return candidates
+
+
+def find_config(path: Optional[str] = None) -> str:
+    for candidate in config_candidates(path):
+        if os.path.isfile(candidate):
+            return candidate
+    raise FileNotFoundError(f"{CONFIG_NAME} 파일을 찾을 수 없습니다.")
+
+
+def load_config(path: Optional[str] = None) -> Dict:
+    """servers.json 을 읽어 dict 로 반환 (없으면 FileNotFoundError)"""
+    with open(find_config(path), 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    config.setdefault("credentials", {"default_username": "", "default_password": ""})
+    config.setdefault("servers", [])
+    return config
+
+
+class ConfigWatcher:
+    """servers.json 의 수정 시각/크기를 주기적으로 확인하여 바뀌면 다시 읽는다
+
+    편집 도중 저장된 잘못된 JSON 은 무시하고 (다음 저장 때 다시 시도) 이전 설정을 유지한다.
+    """
+
+    def __init__(self, path: Optional[str] = None, interval: float = 2.0):
+        self.path = find_config(path)
+        self.interval = float(interval)
+        self._stamp = self._read_stamp()
+
+    def _read_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def check(self) -> Optional[Dict]:
+        """마지막 확인 이후 바뀌었으면 새 설정, 아니면 None"""
+        stamp = self._read_stamp()
+        if stamp is None or stamp == self._stamp:
+            return None
+        try:
+            config = load_config(self.path)
+        except (OSError, ValueError):
+            return None
+        self._stamp = stamp
+        return config
+
+    def start(self, on_change: Callable[[Dict], None], stop: threading.Event) -> threading.Thread:
+        """바뀔 때마다 on_change(새 설정) 호출 (백그라운드 스레드)"""
+        def loop():
+            while not stop.wait(self.interval):
+                config = self.check()
+                if config is not None:
+                    on_change(config)
+
+        thread = threading.Thread(target=loop, name="config-watch", daemon=True)
+        thread.start()
+        return thread
+
+
+def parse_jump_host(spec: str) -> Tuple[Optional[str], str, int]:
+    """ProxyJump 형식 "[user@]host[:port]" 를 (user, host, port) 로 분리"""
+    user, _, hostport = spec.strip().rpartition("@")
+    host, port = hostport, 22
+    if hostport.count(":") == 1:  # IPv6 주소가 아닌 경우에만 포트로 해석
+        host, _, port_text = hostport.partition(":")
+        port = int(port_text)
+    return user or None, host, port
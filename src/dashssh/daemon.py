@@ -0,0 +1,281 @@
+"""연구실 공용 수집 데몬: 한 곳에서 주기적으로 모든 서버를 조회하고 최신 스냅샷을 HTTP 로 제공
+
+    python -m dashssh serve --port 8891
+
+    GET /api/snapshots            모든 서버의 최신 스냅샷 (ETag / If-None-Match, gzip)
+    GET /api/snapshots/<서버>     서버 한 대의 최신 스냅샷
+    GET /api/changes?since=N      N 이후 바뀐 서버만 (없으면 timeout 초까지 기다리는 long-poll)
+    GET /api/events               Server-Sent Events 로 바뀐 서버를 계속 전달 (Last-Event-ID 지원)
+    GET /api/status               CLI status --json 과 같은 형식 (사람/스크립트용)
+    GET /api/summary              GPU 종류별 요약 (CLI summary --json 과 같은 형식)
+    GET /metrics                  데몬의 단계별 지연 시간 (Prometheus)
+
+클라이언트는 servers.json 의 "daemon": {"url": ...} 이 있으면 SSH 대신 이 데몬을 사용한다.
+프로세스 소유자/명령줄을 제공하므로 기본으로는 127.0.0.1 에서만 받고, daemon.token (또는
+DASHSSH_DAEMON_TOKEN) 이 있으면 모든 요청에 "Authorization: Bearer <token>" 을 요구한다.
+"""
+import gzip
+import hmac
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from .cache import ServerSnapshot, SnapshotCache
+from .collector import Collector
+from .summary import ClusterSummary
+
+DEFAULT_HOST = "127.0.0.1"
+LOOPBACK_HOSTS = ("127.0.0.1", "::1", "localhost")
+TOKEN_ENV = "DASHSSH_DAEMON_TOKEN"
+DEFAULT_PORT = 8891
+DEFAULT_REFRESH_INTERVAL = 30.0
+DEFAULT_LONG_POLL_TIMEOUT = 25.0
+MAX_LONG_POLL_TIMEOUT = 120.0
+SSE_KEEPALIVE = 15.0
+GZIP_MIN_SIZE = 1024  # 이보다 작은 응답은 압축하지 않음
+
+
+def entry_state(snapshot: Optional[ServerSnapshot], error: Optional[str], version: int) -> Dict:
+    """서버 한 대의 공개 상태 (마지막 스냅샷 + 마지막 갱신 오류)"""
+    return {
+        "version": version,
+        "snapshot": snapshot.to_state() if snapshot is not None else None,
+        "error": error,
+    }
+
+
+class SnapshotBoard:
+    """서버별 최신 상태와 변경 번호. 갱신될 때마다 번호가 1 씩 증가한다
+
+    전체 상태 응답은 번호별로 한 번만 직렬화/압축하여 모든 클라이언트가 재사용한다.
+    """
+
+    def __init__(self):
+        self.boot_id = f"{int(time.time()):x}"  # 데몬 재시작 후 같은 번호의 ETag 가 겹치지 않도록
+        self.version = 0
+        self._entries: Dict[str, Dict] = {}
+        self._snapshots: Dict[str, ServerSnapshot] = {}
+        self._changed = threading.Condition()
+        self._encoded: Optional[Tuple[int, bytes, Optional[bytes]]] = None
+
+    def update(self, server: Dict, snapshot: Optional[ServerSnapshot], error: Optional[str]):
+        """SnapshotCache listener"""
+        with self._changed:
+            self.version += 1
+            if snapshot is not None:
+                self._snapshots[server["name"]] = snapshot
+            self._entries[server["name"]] = entry_state(snapshot, error, self.version)
+            self._changed.notify_all()
+
+    def etag(self, version: int) -> str:
+        return f'"{self.boot_id}-{version}"'
+
+    def changes(self, since: int) -> Tuple[int, Dict[str, Dict]]:
+        """since 이후 바뀐 서버 (데몬이 재시작되어 since 가 더 크면 전체)"""
+        with self._changed:
+            if since > self.version:
+                since = 0
+            return self.version, {name: entry for name, entry in self._entries.items() if entry["version"] > since}
+
+    def wait(self, since: int, timeout: float) -> int:
+        """version 이 since 보다 커질 때까지 (최대 timeout 초) 기다린 뒤 현재 version"""
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != since, timeout)
+            return self.version
+
+    def snapshots(self) -> Dict[str, ServerSnapshot]:
+        with self._changed:
+            return dict(self._snapshots)
+
+    def encoded(self) -> Tuple[int, bytes, Optional[bytes]]:
+        """전체 상태의 (version, JSON, gzip JSON). 같은 version 이면 이전에 만든 결과를 재사용"""
+        with self._changed:
+            if self._encoded is not None and self._encoded[0] == self.version:
+                return self._encoded
+            version = self.version
+            data = {"version": version, "servers": dict(self._entries)}
+        body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+        packed = gzip.compress(body, 6) if len(body) >= GZIP_MIN_SIZE else None
+        self._encoded = (version, body, packed)
+        return self._encoded
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "DASH-SSH"
+    protocol_version = "HTTP/1.1"
+    daemon: "CollectorDaemon"
+
+    def log_message(self, format, *args):
+        pass  # 요청마다 stderr 에 남기지 않음
+
+    def _send(self, status: int, body: bytes, packed: Optional[bytes] = None, etag: Optional[str] = None,
+              content_type: str = "application/json; charset=utf-8"):
+        if packed is None and len(body) >= GZIP_MIN_SIZE and self._accepts_gzip():
+            packed = gzip.compress(body, 6)
+        use_gzip = packed is not None and self._accepts_gzip()
+        payload = packed if use_gzip else body
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        if etag:
+            self.send_header("ETag", etag)
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_json(self, status: int, data, etag: Optional[str] = None):
+        self._send(status, json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode(), etag=etag)
+
+    def _accepts_gzip(self) -> bool:
+        return "gzip" in self.headers.get("Accept-Encoding", "")
+
+    def _not_modified(self, etag: str) -> bool:
+        if etag not in [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]:
+            return False
+        self.send_response(304)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+        return True
+
+    def _authorized(self) -> bool:
+        token = self.daemon.token
+        if not token:
+            return True
+        return hmac.compare_digest(self.headers.get("Authorization", "").encode(), f"Bearer {token}".encode())
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        board = self.daemon.board
+        try:
+            if not self._authorized():
+                self._send_json(401, {"error": "수집 데몬 토큰이 맞지 않습니다"})
+            elif url.path == "/api/snapshots":
+                self._snapshots(board)
+            elif url.path.startswith("/api/snapshots/"):
+                self._snapshot(board, unquote(url.path[len("/api/snapshots/"):]))
+            elif url.path == "/api/changes":
+                self._changes(board, int(query.get("since", 0)),
+                              min(float(query.get("timeout", DEFAULT_LONG_POLL_TIMEOUT)), MAX_LONG_POLL_TIMEOUT))
+            elif url.path == "/api/events":
+                self._events(board, int(self.headers.get("Last-Event-ID") or query.get("since", 0)))
+            elif url.path == "/api/summary":
+                self._send_json(200, [pool.to_dict() for pool in self.daemon.summary.summarize()])
+            elif url.path == "/api/status":
+                self._send_json(200, [snapshot.to_dict() for snapshot in board.snapshots().values()])
+            elif url.path == "/metrics":
+                self._send(200, self.daemon.collector.metrics.to_prometheus().encode(),
+                           content_type="text/plain; version=0.0.4")
+            else:
+                self._send_json(404, {"error": "not found"})
+        except ValueError:
+            self._send_json(400, {"error": "bad request"})
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _snapshots(self, board: SnapshotBoard):
+        version, body, packed = board.encoded()
+        etag = board.etag(version)
+        if not self._not_modified(etag):
+            self._send(200, body, packed, etag)
+
+    def _snapshot(self, board: SnapshotBoard, name: str):
+        if name not in self.daemon.server_names:
+            self._send_json(404, {"error": f"알 수 없는 서버: {name}"})
+            return
+        entry = board.changes(0)[1].get(name) or entry_state(None, None, 0)  # 아직 첫 조회 전
+        etag = board.etag(entry["version"])
+        if not self._not_modified(etag):
+            self._send_json(200, entry, etag)
+
+    def _changes(self, board: SnapshotBoard, since: int, timeout: float):
+        board.wait(since, timeout)
+        version, servers = board.changes(since)
+        self._send_json(200, {"version": version, "servers": servers})
+
+    def _events(self, board: SnapshotBoard, since: int):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        while not self.daemon.stopped.is_set():
+            version = board.wait(since, SSE_KEEPALIVE)
+            if version == since:
+                self.wfile.write(b": keepalive\n\n")
+            else:
+                version, servers = board.changes(since)
+                data = json.dumps({"version": version, "servers": servers}, ensure_ascii=False,
+                                  separators=(",", ":"))
+                self.wfile.write(f"id: {version}\nevent: snapshots\ndata: {data}\n\n".encode())
+                since = version
+            self.wfile.flush()
+
+
+class CollectorDaemon:
+    """Collector 로 모든 서버를 주기적으로 조회하고 HTTP 로 제공"""
+
+    def __init__(self, config: Dict, username: str, password: str,
+                 host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 refresh_interval: float = DEFAULT_REFRESH_INTERVAL, token: Optional[str] = None):
+        self.config = config
+        self.token = token or None
+        self.servers: List[Dict] = config["servers"]
+        self.server_names = {server["name"] for server in self.servers}
+        self.collector = Collector(config)
+        self.board = SnapshotBoard()
+        self.summary = ClusterSummary(self.servers)
+        self.stopped = threading.Event()
+        fetch = lambda server, cancel: self.collector.fetch_snapshot(server, username, password, cancel=cancel)
+        self.cache = SnapshotCache(fetch, ttl=refresh_interval, refresh_interval=refresh_interval,
+                                   max_concurrent_refreshes=self.collector.engine.max_concurrency)
+        self.cache.subscribe(self.board.update)
+        self.cache.subscribe(self._update_summary)
+        handler = type("Handler", (_Handler,), {"daemon": self})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+
+    @classmethod
+    def from_config(cls, config: Dict, username: str, password: str, **overrides) -> "CollectorDaemon":
+        """servers.json 의 "daemon" 항목 ({"host", "port", "refresh_interval", "token"})"""
+        options = {**config.get("daemon", {}), **{k: v for k, v in overrides.items() if v is not None}}
+        return cls(config, username, password,
+                   host=options.get("host") or DEFAULT_HOST,
+                   port=int(options.get("port", DEFAULT_PORT)),
+                   refresh_interval=float(options.get("refresh_interval", DEFAULT_REFRESH_INTERVAL)),
+                   token=options.get("token") or os.environ.get(TOKEN_ENV))
+
+    def _update_summary(self, server: Dict, snapshot: Optional[ServerSnapshot], error: Optional[str]):
+        if snapshot is not None:
+            self.summary.update(snapshot)
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self.httpd.server_address[:2]
+
+    @property
+    def exposed(self) -> bool:
+        """다른 PC 에서도 접속할 수 있는 주소에서 받는지"""
+        return self.address[0] not in LOOPBACK_HOSTS
+
+    def serve_forever(self):
+        self.cache.start(self.servers)
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.close()
+
+    def close(self):
+        self.stopped.set()
+        self.cache.stop()
+        self.httpd.server_close()
+        self.collector.close()
@@ -0,0 +1,135 @@
+"""공용 수집 데몬 (daemon.py) 의 HTTP 클라이언트 (표준 라이브러리만 사용)
+
+servers.json 에 "daemon": {"url": "http://10.201.135.113:8891"} 이 있으면 GUI 는 서버마다 SSH 로
+조회하는 대신 이 클라이언트로 데몬이 모아 둔 스냅샷을 받는다.
+"""
+import asyncio
+import gzip
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from .cache import ServerSnapshot
+from .probe import ProbeResult
+
+DEFAULT_TIMEOUT = 10.0
+LONG_POLL_TIMEOUT = 25.0
+RETRY_DELAY = 5.0
+
+# 서버 한 대의 데몬 상태: (마지막 스냅샷, 마지막 갱신 오류)
+DaemonEntry = Tuple[Optional[ServerSnapshot], Optional[str]]
+ChangeListener = Callable[[Dict[str, DaemonEntry]], None]
+
+
+def parse_entry(entry: Dict) -> DaemonEntry:
+    state = entry.get("snapshot")
+    return (ServerSnapshot.from_state(state) if state else None), entry.get("error")
+
+
+class DaemonClient:
+    """ETag 로 바뀌지 않은 응답은 다시 받지 않고, 변경 알림은 long-poll 로 받는다"""
+
+    def __init__(self, url: str, timeout: float = DEFAULT_TIMEOUT, token: Optional[str] = None):
+        self.url = url.rstrip("/")
+        self.timeout = float(timeout)
+        self.token = token or None
+        self._etag: Optional[str] = None
+        self._entries: Dict[str, DaemonEntry] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict) -> Optional["DaemonClient"]:
+        """servers.json 의 "daemon" 항목에 url 이 있을 때만 생성"""
+        options = config.get("daemon", {})
+        if not options.get("url"):
+            return None
+        return cls(options["url"], timeout=options.get("timeout", DEFAULT_TIMEOUT),
+                   token=options.get("token") or os.environ.get("DASHSSH_DAEMON_TOKEN"))
+
+    def _get(self, path: str, etag: Optional[str] = None,
+             timeout: Optional[float] = None) -> Tuple[int, Optional[str], Optional[Dict]]:
+        """(status, ETag, JSON). 304 이면 JSON 은 None"""
+        request = urllib.request.Request(self.url + path, headers={"Accept-Encoding": "gzip"})
+        if etag:
+            request.add_header("If-None-Match", etag)
+        if self.token:
+            request.add_header("Authorization", f"Bearer {self.token}")
+        try:
+            with urllib.request.urlopen(request, timeout=timeout or self.timeout) as response:
+                body = response.read()
+                if response.headers.get("Content-Encoding") == "gzip":
+                    body = gzip.decompress(body)
+                return response.status, response.headers.get("ETag"), json.loads(body)
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                return 304, etag, None
+            try:
+                message = json.loads(e.read()).get("error")
+            except ValueError:
+                message = None
+            raise RuntimeError(message or f"수집 데몬 오류 (HTTP {e.code})") from None
+
+    def fetch_all(self) -> Dict[str, DaemonEntry]:
+        """모든 서버의 최신 상태 (바뀌지 않았으면 304 로 이전 결과 재사용)"""
+        with self._lock:
+            etag = self._etag
+        status, etag, data = self._get("/api/snapshots", etag)
+        with self._lock:
+            if status != 304:
+                self._entries = {name: parse_entry(entry) for name, entry in data["servers"].items()}
+                self._etag = etag
+            return dict(self._entries)
+
+    def fetch_snapshot(self, server: Dict) -> ServerSnapshot:
+        """서버 한 대의 최신 스냅샷. 데몬이 아직 조회하지 못했으면 RuntimeError"""
+        _, _, data = self._get(f"/api/snapshots/{quote(server['name'])}")
+        snapshot, error = parse_entry(data)
+        if snapshot is None:
+            raise RuntimeError(error or "수집 데몬이 아직 이 서버를 조회하지 않았습니다")
+        return snapshot
+
+    async def sweep(self, servers: List[Dict], username: str = "", password: str = ""
+                    ) -> AsyncIterator[Tuple[ProbeResult, Optional[ServerSnapshot]]]:
+        """Collector.sweep 과 같은 형태로 데몬의 결과를 전달 (계정은 데몬 쪽 설정을 사용)
+
+        스냅샷이 있으면 성공으로 전달한다 (데몬의 마지막 조회가 실패했어도 마지막 스냅샷을 쓰며,
+        오래된 정도는 snapshot.age 로 표시). 스냅샷이 없을 때만 오류로 전달한다.
+        """
+        start = time.perf_counter()
+        try:
+            entries = await asyncio.get_running_loop().run_in_executor(None, self.fetch_all)
+        except (OSError, RuntimeError, ValueError) as e:
+            entries, failure = {}, f"수집 데몬 연결 실패: {e}"
+        else:
+            failure = "수집 데몬이 아직 이 서버를 조회하지 않았습니다"
+        elapsed = time.perf_counter() - start
+        for server in servers:
+            snapshot, error = entries.get(server["name"], (None, failure))
+            if snapshot is None:
+                yield ProbeResult(server, error=error or failure, elapsed=elapsed), None
+            else:
+                yield ProbeResult(server, output=snapshot, elapsed=elapsed), snapshot
+
+    def follow(self, on_change: ChangeListener, stop: threading.Event) -> threading.Thread:
+        """데몬의 변경을 long-poll 로 받아 on_change({서버: (스냅샷, 오류)}) 호출 (백그라운드 스레드)"""
+        def loop():
+            since = 0
+            while not stop.is_set():
+                try:
+                    _, _, data = self._get(f"/api/changes?since={since}&timeout={LONG_POLL_TIMEOUT:g}",
+                                           timeout=LONG_POLL_TIMEOUT + self.timeout)
+                except (OSError, RuntimeError, ValueError):
+                    stop.wait(RETRY_DELAY)
+                    continue
+                since = data["version"]
+                if data["servers"]:
+                    on_change({name: parse_entry(entry) for name, entry in data["servers"].items()})
+
+        thread = threading.Thread(target=loop, name="daemon-follow", daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,117 @@
+"""최신 스냅샷으로 빈 GPU 배치 후보를 찾는 색인"""
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from .cache import ServerSnapshot
+
+
+@dataclass
+class Placement:
+    """서버 한 대에서 고른 GPU 묶음"""
+    server_name: str
+    gpu_indexes: List[int]
+    min_free_mib: int
+    total_free_mib: int
+    mean_utilization: float
+    co_tenants: int          # 고른 GPU 에서 이미 실행 중인 프로세스 수
+    taken_at: float
+
+    @property
+    def cuda_visible_devices(self) -> str:
+        return ",".join(str(index) for index in self.gpu_indexes)
+
+    @property
+    def age(self) -> float:
+        return max(0.0, time.time() - self.taken_at)
+
+    def sort_key(self) -> Tuple:
+        # 함께 쓰는 프로세스가 적고, 한가하고, 여유 메모리가 큰 순서
+        return (self.co_tenants, self.mean_utilization, -self.min_free_mib, self.server_name)
+
+    def to_dict(self) -> Dict:
+        return {
+            "server": self.server_name,
+            "gpus": self.gpu_indexes,
+            "cuda_visible_devices": self.cuda_visible_devices,
+            "min_free_mib": self.min_free_mib,
+            "total_free_mib": self.total_free_mib,
+            "mean_utilization": round(self.mean_utilization, 1),
+            "co_tenants": self.co_tenants,
+            "taken_at": self.taken_at,
+        }
+
+
+class _ServerEntry:
+    __slots__ = ("spec", "taken_at", "candidates")
+
+    def __init__(self, spec: str, taken_at: float, candidates: List[Tuple[int, int, int, int]]):
+        self.spec = spec
+        self.taken_at = taken_at
+        # (동시 사용 프로세스 수, 사용률, -여유 메모리, GPU 인덱스) 순으로 정렬된 GPU 목록
+        self.candidates = candidates
+
+
+class GpuFinder:
+    """서버별 GPU 후보를 미리 정렬해 두고 요청 시 SSH 없이 바로 순위를 계산"""
+
+    def __init__(self, servers: Optional[List[Dict]] = None):
+        self._specs = {server["name"]: server.get("gpu_spec", "") for server in servers or []}
+        self._entries: Dict[str, _ServerEntry] = {}
+        self._lock = threading.Lock()
+
+    def set_servers(self, servers: List[Dict]):
+        with self._lock:
+            self._specs = {server["name"]: server.get("gpu_spec", "") for server in servers}
+            for name in [name for name in self._entries if name not in self._specs]:
+                del self._entries[name]
+
+    def update(self, snapshot: ServerSnapshot):
+        """서버 스냅샷이 바뀔 때 해당 서버의 후보만 다시 계산"""
+        if snapshot.gpu is None:
+            return
+        tenants: Dict[int, int] = {}
+        for proc in snapshot.gpu.processes:
+            tenants[proc.gpu_index] = tenants.get(proc.gpu_index, 0) + 1
+        candidates = sorted(
+            (tenants.get(gpu.index, 0), max(gpu.utilization, 0), -gpu.memory_free, gpu.index)
+            for gpu in snapshot.gpu.gpus if gpu.memory_free >= 0
+        )
+        with self._lock:
+            self._entries[snapshot.server_name] = _ServerEntry(
+                self._specs.get(snapshot.server_name, ""), snapshot.taken_at, candidates)
+
+    def remove(self, server_name: str):
+        with self._lock:
+            self._entries.pop(server_name, None)
+
+    def specs(self) -> List[str]:
+        with self._lock:
+            return sorted({spec for spec in self._specs.values() if spec})
+
+    def find(self, count: int, min_free_gb: float = 0.0, spec: Optional[str] = None,
+             limit: int = 10) -> List[Placement]:
+        """count 개의 GPU 가 각각 min_free_gb 이상 비어 있는 배치를 좋은 순서로 반환"""
+        min_free_mib = int(min_free_gb * 1024)
+        placements = []
+        with self._lock:
+            entries = list(self._entries.items())
+        for name, entry in entries:
+            if spec and entry.spec != spec:
+                continue
+            chosen = [c for c in entry.candidates if -c[2] >= min_free_mib][:count]
+            if len(chosen) < count or count <= 0:
+                continue
+            free = [-c[2] for c in chosen]
+            placements.append(Placement(
+                server_name=name,
+                gpu_indexes=sorted(c[3] for c in chosen),
+                min_free_mib=min(free),
+                total_free_mib=sum(free),
+                mean_utilization=sum(c[1] for c in chosen) / count,
+                co_tenants=sum(c[0] for c in chosen),
+                taken_at=entry.taken_at,
+            ))
+        placements.sort(key=Placement.sort_key)
+        return placements[:limit]
@@ -0,0 +1,317 @@
+"""상태 정보를 표 형식 문자열로 변환하는 함수들"""
+import time
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+from .cache import ServerSnapshot
+from .nvsmi import GpuSnapshot
+from .procinfo import format_elapsed, parse_ps_output, short_command
+from .sysinfo import parse_disk, parse_loadavg, parse_memory
+
+if TYPE_CHECKING:  # summary 는 numpy 를 불러오므로 status 명령에서는 읽지 않는다
+    from .summary import PoolSummary
+
+
+def format_user_info(output: str) -> str:
+    """사용자 정보를 포맷팅"""
+    if not output.strip():
+        return "현재 접속 중인 사용자가 없습니다."
+
+    lines = output.strip().split('\n')
+
+    # 테이블 설정
+    table_width = 75
+    user_width = 15
+    tty_width = 10
+    from_width = 20
+    login_width = 15
+    what_width = table_width - user_width - tty_width - from_width - login_width - 9  # 구분자 여백
+
+    # 테이블 생성
+    border = "+" + "-" * table_width + "+"
+    header = f"| {'사용자':^{user_width}} | {'TTY':^{tty_width}} | {'접속위치':^{from_width}} | {'로그인시간':^{login_width}} | {'작업':^{what_width}} |"
+
+    formatted_output = [
+        border,
+        header,
+        border
+    ]
+
+    # 사용자 정보 추가
+    for line in lines:
+        if not line.strip():
+            continue
+
+        parts = line.split()
+        if len(parts) >= 5:
+            user = parts[0][:user_width]
+            tty = parts[1][:tty_width]
+            from_loc = parts[2][:from_width]
+            login_time = ' '.join(parts[3:5])[:login_width]
+            what = ' '.join(parts[5:])[:what_width] if len(parts) > 5 else ''
+
+            formatted_line = f"| {user:<{user_width}} | {tty:<{tty_width}} | {from_loc:<{from_width}} | {login_time:<{login_width}} | {what:<{what_width}} |"
+            formatted_output.append(formatted_line)
+
+    formatted_output.append(border)
+    return '\n'.join(formatted_output)
+
+
+def format_process_rows(rows: List[Tuple[str, str, str, str, str, str]], table_width: int = 75) -> List[str]:
+    """소유자/실행 시간이 있는 프로세스 표 (GPU, PID, 사용자, 명령, 메모리, 실행 시간)"""
+    gpu_width = 4
+    pid_width = 8
+    user_width = 10
+    memory_width = 10
+    time_width = 7
+    command_width = table_width - gpu_width - pid_width - user_width - memory_width - time_width - 17
+
+    border = "+" + "-" * table_width + "+"
+    lines = [
+        f"| {'GPU':^{gpu_width}} | {'PID':^{pid_width}} | {'User':^{user_width}} "
+        f"| {'Command':^{command_width}} | {'Memory':^{memory_width}} | {'Time':^{time_width}} |",
+        border,
+    ]
+    for gpu, pid, user, command, memory, elapsed in rows:
+        if len(command) > command_width:
+            command = command[:command_width - 3] + "..."  # 명령줄은 앞부분 (실행 파일과 첫 인자) 이 중요
+        lines.append(
+            f"| {gpu:^{gpu_width}} "
+            f"| {pid:^{pid_width}} "
+            f"| {user[:user_width]:<{user_width}} "
+            f"| {command:<{command_width}} "
+            f"| {memory:>{memory_width}} "
+            f"| {elapsed:>{time_width}} |"
+        )
+    return lines
+
+
+def format_gpu_info(output: str, ps_output: str = "") -> str:
+    """nvidia-smi 출력을 파싱하여 정돈된 형식으로 변환 (ps_output 이 있으면 소유자/실행 시간 포함)"""
+    lines = output.split('\n')
+
+    # GPU 개수 카운트
+    gpu_count = sum(1 for line in lines if 'NVIDIA' in line and 'On' in line)
+
+    # 프로세스 정보 파싱
+    processes = []
+    is_process_section = False
+
+    for line in lines:
+        if 'Processes' in line:
+            is_process_section = True
+            continue
+
+        if is_process_section and line.strip():
+            if 'GPU   GI   CI' in line or '=' in line or not line.strip('| '):
+                continue
+
+            content = line.strip('| \n')
+            if content:
+                parts = ' '.join(content.split()).split()
+
+                if len(parts) >= 7:
+                    process = {
+                        'gpu': parts[0],
+                        'pid': parts[3],
+                        'type': parts[4],
+                        'name': parts[5],
+                        'memory': parts[-1]
+                    }
+                    processes.append(process)
+
+    # 테이블 너비 설정
+    table_width = 75
+    gpu_width = 4
+    pid_width = 8
+    type_width = 6
+    memory_width = 12
+    name_width = table_width - gpu_width - pid_width - type_width - memory_width - 9  # 구분자 여백 고려
+
+    # 포맷된 출력 생성
+    border = "+" + "-" * table_width + "+"
+    formatted_output = [
+        border,
+        f"| 총 GPU 수: {gpu_count}{' ' * (table_width - len(str(gpu_count)) - 10)}|",
+        border,
+        "| GPU 프로세스 정보:",
+        "+" + "=" * table_width + "+",
+    ]
+
+    # ps 로 보강한 정보가 있으면 Type 대신 사용자/명령줄/실행 시간을 표시
+    details = {str(pid): (user, etimes, command) for pid, user, etimes, _, command in parse_ps_output(ps_output)}
+    if details:
+        rows = []
+        for proc in processes:
+            user, etimes, command = details.get(proc['pid'], ("", -1, ""))
+            rows.append((proc['gpu'], proc['pid'], user, short_command(command, proc['name']), proc['memory'],
+                         format_elapsed(etimes) if etimes >= 0 else ""))
+        formatted_output.extend(format_process_rows(rows, table_width))
+    else:
+        formatted_output.extend([
+            f"| {'GPU':^{gpu_width}} | {'PID':^{pid_width}} | {'Type':^{type_width}} | {'Process Name':^{name_width}} | {'Memory':^{memory_width}} |",
+            border
+        ])
+
+        # 프로세스 정보 추가
+        for proc in processes:
+            name = proc['name']
+            if len(name) > name_width:
+                name = "..." + name[-(name_width-3):]  # 긴 이름은 뒷부분만 표시
+
+            line = (f"| {proc['gpu']:^{gpu_width}} "
+                    f"| {proc['pid']:^{pid_width}} "
+                    f"| {proc['type']:^{type_width}} "
+                    f"| {name:<{name_width}} "
+                    f"| {proc['memory']:>{memory_width}} |")
+            formatted_output.append(line)
+
+    if not processes:
+        empty_msg = "실행 중인 프로세스 없음"
+        formatted_output.append(f"| {empty_msg:^{table_width}} |")
+
+    formatted_output.append(border)
+    return '\n'.join(formatted_output)
+
+
+def format_gpu_records(snapshot: GpuSnapshot) -> str:
+    """GPU/프로세스 레코드를 표 형식으로 변환"""
+    table_width = 75
+    gpu_width = 4
+    mem_width = 17
+    util_width = 6
+    temp_width = 6
+    gpu_name_width = table_width - gpu_width - mem_width - util_width - temp_width - 14
+    pid_width = 8
+    memory_width = 12
+    name_width = table_width - gpu_width - pid_width - memory_width - 11
+
+    def fit(name: str, width: int) -> str:
+        return name if len(name) <= width else "..." + name[-(width - 3):]
+
+    def value(number: int, suffix: str) -> str:
+        return "N/A" if number < 0 else f"{number}{suffix}"
+
+    border = "+" + "-" * table_width + "+"
+    gpu_count = len(snapshot.gpus)
+    formatted_output = [
+        border,
+        f"| 총 GPU 수: {gpu_count}{' ' * (table_width - len(str(gpu_count)) - 10)}|",
+        border,
+        f"| {'GPU':^{gpu_width}} | {'Name':^{gpu_name_width}} | {'Memory (MiB)':^{mem_width}} "
+        f"| {'Util':^{util_width}} | {'Temp':^{temp_width}} |",
+        border,
+    ]
+    for gpu in snapshot.gpus:
+        memory = f"{value(gpu.memory_used, '')} / {value(gpu.memory_total, '')}"
+        formatted_output.append(
+            f"| {gpu.index:^{gpu_width}} "
+            f"| {fit(gpu.name, gpu_name_width):<{gpu_name_width}} "
+            f"| {memory:>{mem_width}} "
+            f"| {value(gpu.utilization, '%'):>{util_width}} "
+            f"| {value(gpu.temperature, 'C'):>{temp_width}} |"
+        )
+    formatted_output.extend([
+        border,
+        "| GPU 프로세스 정보:",
+        "+" + "=" * table_width + "+",
+    ])
+    if any(proc.user for proc in snapshot.processes):
+        now = time.time()
+        formatted_output.extend(format_process_rows([
+            (str(proc.gpu_index) if proc.gpu_index >= 0 else "?", str(proc.pid), proc.user,
+             short_command(proc.command, proc.name), value(proc.used_memory, 'MiB'),
+             format_elapsed(now - proc.started_at) if proc.started_at else "")
+            for proc in snapshot.processes
+        ], table_width))
+    else:
+        formatted_output.extend([
+            f"| {'GPU':^{gpu_width}} | {'PID':^{pid_width}} | {'Process Name':^{name_width}} | {'Memory':^{memory_width}} |",
+            border,
+        ])
+        for proc in snapshot.processes:
+            gpu = proc.gpu_index if proc.gpu_index >= 0 else "?"
+            formatted_output.append(
+                f"| {gpu:^{gpu_width}} "
+                f"| {proc.pid:^{pid_width}} "
+                f"| {fit(proc.name, name_width):<{name_width}} "
+                f"| {value(proc.used_memory, 'MiB'):>{memory_width}} |"
+            )
+    if not snapshot.processes:
+        empty_msg = "실행 중인 프로세스 없음"
+        formatted_output.append(f"| {empty_msg:^{table_width}} |")
+
+    formatted_output.append(border)
+    return '\n'.join(formatted_output)
+
+
+def format_system_info(sections: Dict[str, str]) -> str:
+    """부하/메모리/디스크 섹션을 요약"""
+    lines = []
+
+    loadavg = parse_loadavg(sections.get("loadavg", ""))
+    if loadavg:
+        lines.append(f"부하 (1/5/15분): {' '.join(f'{value:.2f}' for value in loadavg)}")
+
+    memory = parse_memory(sections.get("memory", ""))
+    if memory:
+        lines.append(f"메모리: {memory['used']} / {memory['total']} MiB 사용 (가용 {memory['available']} MiB)")
+
+    disk = parse_disk(sections.get("disk", ""))
+    if disk:
+        lines.append(f"디스크 ({disk['mount']}): {disk['used']} / {disk['size']} 사용 ({disk['use_percent']})")
+
+    return '\n'.join(lines) if lines else "시스템 정보 없음"
+
+
+def format_snapshot(snapshot: ServerSnapshot) -> str:
+    """시스템 요약과 GPU 표를 합친 서버 한 대의 상태"""
+    if snapshot.gpu is not None:
+        gpu = format_gpu_records(snapshot.gpu)
+    else:
+        gpu = format_gpu_info(snapshot.sections.get("gpu", ""), snapshot.sections.get("procs", ""))
+    return format_system_info(snapshot.sections) + "\n" + gpu
+
+
+def format_percent(value: float) -> str:
+    return "N/A" if value != value else f"{value:.0f}%"  # NaN: 사용률을 알 수 없음
+
+
+def format_top_users(pool: "PoolSummary") -> str:
+    return ", ".join(f"{user}({gpus})" for user, gpus, _ in pool.top_users) or "-"
+
+
+def format_cluster_summary(pools: List["PoolSummary"]) -> str:
+    """GPU 종류별 요약 표"""
+    table_width = 75
+    spec_width = 20
+    server_width = 7
+    gpu_width = 9
+    memory_width = 9
+    util_width = table_width - spec_width - server_width - gpu_width - memory_width - 14
+
+    border = "+" + "-" * table_width + "+"
+    formatted_output = [
+        border,
+        # 한글은 두 칸을 차지하므로 글자 수만큼 너비를 줄여 맞춘다
+        f"| {'GPU 종류':^{spec_width - 2}} | {'서버':^{server_width - 2}} | {'빈/전체':^{gpu_width - 3}} "
+        f"| {'여유 GB':^{memory_width - 2}} | {'사용률 p50/p90':^{util_width - 3}} |",
+        border,
+    ]
+    for pool in pools:
+        spec = pool.spec if len(pool.spec) <= spec_width else pool.spec[:spec_width - 3] + "..."
+        util = "/".join(format_percent(value) for value in (pool.util_p50, pool.util_p90))
+        formatted_output.append(
+            f"| {spec:<{spec_width}} "
+            f"| {f'{pool.servers}/{pool.servers_total}':>{server_width}} "
+            f"| {f'{pool.free_gpus}/{pool.gpus}':>{gpu_width}} "
+            f"| {pool.free_memory_mib / 1024:>{memory_width}.0f} "
+            f"| {util:>{util_width}} |"
+        )
+        users = f"  평균 사용률 {format_percent(pool.util_mean)}, 주요 사용자: {format_top_users(pool)}"
+        formatted_output.append(f"|{users[:table_width - 8]:<{table_width - 8}}|")
+    if not pools:
+        empty_msg = "요약할 서버 정보 없음"
+        formatted_output.append(f"| {empty_msg:^{table_width - 10}} |")
+
+    formatted_output.append(border)
+    return '\n'.join(formatted_output)
@@ -0,0 +1 @@
+"""Flet UI 구성 요소 (Flet 이 필요한 코드는 이 패키지에만 둔다)"""
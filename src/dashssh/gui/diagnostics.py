@@ -0,0 +1,75 @@
+"""단계별 지연 시간 진단 패널"""
+from typing import Callable, Dict, List, Optional
+
+import flet as ft
+
+from ..health import STATE_LABELS
+from ..metrics import LatencyRecorder, format_duration
+from .panel import KeyedTable, _set
+
+
+class DiagnosticsPanel:
+    """서버/단계별 p50/p95/max 표. 열 때마다 refresh() 로 바뀐 셀만 갱신"""
+
+    def __init__(self, metrics: LatencyRecorder, on_export: Callable[[str], None],
+                 health_rows: Optional[Callable[[], List[Dict]]] = None):
+        self.metrics = metrics
+        self.health_rows = health_rows
+        # 서버별 연결 상태 (정상/불안정/차단) 와 적응형 제한 시간
+        self.health_table = KeyedTable(["서버", "상태", "연속 실패", "평균 소요", "제한 시간", "다시 확인", "마지막 오류"],
+                                       numeric=(2, 3, 4, 5))
+        self.summary_text = ft.Text("", size=14, color=ft.Colors.GREY_600)
+        self.table = KeyedTable(["서버", "단계", "횟수", "p50", "p95", "max"], numeric=(2, 3, 4, 5))
+        self.empty_text = ft.Text("아직 기록된 측정값이 없습니다. 서버를 조회하면 단계별 시간이 기록됩니다.",
+                                  size=14, color=ft.Colors.GREY_600)
+        self.root = ft.Column(
+            controls=[
+                ft.Row(
+                    controls=[
+                        ft.Text("진단: 단계별 지연 시간", size=20, weight=ft.FontWeight.BOLD),
+                        ft.Container(width=20),
+                        self.summary_text,
+                        ft.Container(expand=True),
+                        ft.OutlinedButton("새로 고침", icon=ft.Icons.REFRESH, on_click=self._on_refresh),
+                        ft.OutlinedButton("JSON 저장", icon=ft.Icons.SAVE_ALT, on_click=lambda e: on_export("json")),
+                        ft.OutlinedButton("Prometheus 저장", icon=ft.Icons.SAVE_ALT,
+                                          on_click=lambda e: on_export("prom")),
+                        ft.TextButton("초기화", on_click=self._on_reset),
+                    ],
+                ),
+                ft.Divider(height=1, color=ft.Colors.GREY_300),
+                self.health_table.table,
+                self.table.table,
+                self.empty_text,
+            ],
+            scroll=ft.ScrollMode.AUTO,
+        )
+
+    def refresh(self):
+        health = self.health_rows() if self.health_rows else []
+        self.health_table.sync([
+            (row["host"], [row["host"], STATE_LABELS[row["state"]], str(row["failures"]),
+                           format_duration(row["latency"]) if row["latency"] is not None else "-",
+                           format_duration(row["timeout"]) if row["timeout"] is not None else "기본값",
+                           f"{row['retry_in']:.0f}초 후" if row["retry_in"] is not None else "-",
+                           (row["error"] or "")[:60]])
+            for row in health
+        ])
+        _set(self.health_table.table, "visible", bool(health))
+        rows = self.metrics.rows()
+        self.table.sync([
+            ((host, phase), [host, phase, str(summary["count"]), format_duration(summary["p50"]),
+                             format_duration(summary["p95"]), format_duration(summary["max"])])
+            for host, phase, summary in rows
+        ])
+        _set(self.empty_text, "visible", not rows)
+        _set(self.summary_text, "value", f"서버 {len({row[0] for row in rows})}대 · 측정 구간 {len(rows)}개")
+
+    def _on_refresh(self, e):
+        self.refresh()
+        e.page.update()
+
+    def _on_reset(self, e):
+        self.metrics.reset()
+        self.refresh()
+        e.page.update()
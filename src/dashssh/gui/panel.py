@@ -0,0 +1,314 @@
+"""한 번 만든 컨트롤을 유지하면서 바뀐 값만 고치는 상태 패널"""
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+import flet as ft
+
+from ..cache import ServerSnapshot
+from ..nvsmi import GpuRecord, ProcessRecord
+from ..formatting import format_percent, format_snapshot, format_system_info, format_top_users
+from ..procinfo import format_elapsed, short_command
+
+if TYPE_CHECKING:  # summary 는 numpy 를 불러온다
+    from ..summary import PoolSummary
+
+
+def _value(number: int, suffix: str = "") -> str:
+    return "N/A" if number < 0 else f"{number}{suffix}"
+
+
+def _set(control: ft.Control, attr: str, value) -> bool:
+    """값이 바뀐 경우에만 속성 변경 (바뀌지 않은 컨트롤은 update 때 전송되지 않음)"""
+    if getattr(control, attr) == value:
+        return False
+    setattr(control, attr, value)
+    return True
+
+
+def _text_block(text: ft.Text) -> ft.Container:
+    return ft.Container(
+        content=text,
+        bgcolor=ft.Colors.GREY_50,
+        padding=10,
+        border_radius=5,
+    )
+
+
+def _mono_text() -> ft.Text:
+    return ft.Text("", size=14, font_family="Consolas", selectable=True)
+
+
+def _section(title: str, body: ft.Control, bottom: int = 20) -> ft.Container:
+    return ft.Container(
+        content=ft.Column([ft.Text(title, size=16, weight=ft.FontWeight.BOLD), body]),
+        margin=ft.margin.only(bottom=bottom),
+    )
+
+
+class KeyedTable:
+    """키로 행을 관리하는 DataTable. 바뀐 셀만 고치고 생기거나 사라진 행만 추가/삭제"""
+
+    def __init__(self, columns: List[str], numeric: Iterable[int] = ()):
+        numeric = set(numeric)
+        self.table = ft.DataTable(
+            columns=[ft.DataColumn(ft.Text(name), numeric=i in numeric) for i, name in enumerate(columns)],
+            rows=[],
+            column_spacing=20,
+            heading_row_height=36,
+            data_row_min_height=32,
+            data_row_max_height=32,
+        )
+        self.width = len(columns)
+        self._rows: Dict[Hashable, ft.DataRow] = {}
+
+    def sync(self, items: List[Tuple[Hashable, List[str]]]) -> int:
+        """items 순서대로 행을 맞추고 변경된 셀/행 수를 반환"""
+        changes = 0
+        seen = set()
+        for key, values in items:
+            seen.add(key)
+            row = self._rows.get(key)
+            if row is None:
+                row = ft.DataRow(cells=[ft.DataCell(ft.Text(v)) for v in values])
+                self._rows[key] = row
+                changes += 1
+            else:
+                for cell, value in zip(row.cells, values):
+                    changes += _set(cell.content, "value", value)
+        for key in [key for key in self._rows if key not in seen]:
+            del self._rows[key]
+            changes += 1
+        order = [self._rows[key] for key, _ in items]
+        if order != self.table.rows:
+            self.table.rows = order
+        return changes
+
+
+GPU_COLUMNS = ["GPU", "Name", "Memory (MiB)", "Util", "Temp"]
+PROCESS_COLUMNS = ["GPU", "PID", "User", "Command", "Memory", "Time"]
+
+
+def _gpu_table() -> KeyedTable:
+    return KeyedTable(GPU_COLUMNS, numeric=(2, 3, 4))
+
+
+def _process_table() -> KeyedTable:
+    return KeyedTable(PROCESS_COLUMNS, numeric=(4, 5))
+
+
+def _gpu_rows(gpus: List[GpuRecord]) -> List[Tuple[Hashable, List[str]]]:
+    return [
+        (gpu.index, [
+            str(gpu.index),
+            gpu.name,
+            f"{_value(gpu.memory_used)} / {_value(gpu.memory_total)}",
+            _value(gpu.utilization, "%"),
+            _value(gpu.temperature, "C"),
+        ])
+        for gpu in gpus
+    ]
+
+
+def _process_rows(processes: List[ProcessRecord]) -> List[Tuple[Hashable, List[str]]]:
+    now = time.time()
+    return [
+        ((proc.pid, proc.gpu_uuid), [
+            str(proc.gpu_index) if proc.gpu_index >= 0 else "?",
+            str(proc.pid),
+            proc.user,
+            short_command(proc.command, proc.name),
+            _value(proc.used_memory, "MiB"),
+            format_elapsed(now - proc.started_at) if proc.started_at else "",
+        ])
+        for proc in processes
+    ]
+
+
+class ServerStatusPanel:
+    """서버 한 대의 상태 패널. 서버마다 한 번 만들고 이후에는 값만 갱신"""
+
+    def __init__(self, server: Dict, on_toggle_live: Callable[[Dict], None]):
+        self.server = server
+        self.live = False
+        self.updated_text = ft.Text("", size=14, color=ft.Colors.GREY_600)
+        self.note_text = ft.Text("", size=14, color=ft.Colors.BLUE_400)
+        self.live_button = ft.OutlinedButton(
+            "실시간 보기",
+            icon=ft.Icons.PLAY_ARROW,
+            on_click=lambda e: on_toggle_live(self.server),
+        )
+        self.system_text = _mono_text()
+        self.users_text = _mono_text()
+        self.gpu_text = _mono_text()
+        self.history_text = _mono_text()
+        self.gpu_table = _gpu_table()
+        self.process_table = _process_table()
+        self.empty_processes = ft.Text("실행 중인 프로세스 없음", size=14, color=ft.Colors.GREY_600)
+
+        self.gpu_section = _section("GPU 상태", ft.Column([self.gpu_table.table, self.gpu_text]))
+        self.process_section = _section(
+            "GPU 프로세스 정보", ft.Column([self.process_table.table, self.empty_processes]))
+        self.history_section = _section("GPU 사용률 기록 (최근 6시간)", _text_block(self.history_text))
+
+        self.root = ft.Column(
+            controls=[
+                ft.Row(
+                    controls=[
+                        ft.Text(f"{server['name']} 상태", size=20, weight=ft.FontWeight.BOLD),
+                        ft.Container(width=20),
+                        self.updated_text,
+                        self.note_text,
+                        ft.Container(expand=True),
+                        self.live_button,
+                    ],
+                ),
+                ft.Divider(height=1, color=ft.Colors.GREY_300),
+                ft.Container(content=_text_block(self.system_text), margin=ft.margin.only(bottom=20)),
+                _section("현재 접속 중인 사용자", _text_block(self.users_text)),
+                self.gpu_section,
+                self.process_section,
+                self.history_section,
+            ],
+            scroll=ft.ScrollMode.AUTO,
+        )
+
+    def set_header(self, updated: str, note: str = "", is_error: bool = False):
+        _set(self.updated_text, "value", updated)
+        _set(self.note_text, "value", note)
+        _set(self.note_text, "color", ft.Colors.ORANGE_700 if is_error else ft.Colors.BLUE_400)
+
+    def set_live(self, live: bool):
+        self.live = live
+        _set(self.live_button, "text", "실시간 중지" if live else "실시간 보기")
+        _set(self.live_button, "icon", ft.Icons.STOP if live else ft.Icons.PLAY_ARROW)
+
+    def set_texts(self, system: str, users: str, history: Optional[str]):
+        _set(self.system_text, "value", system)
+        _set(self.users_text, "value", users)
+        _set(self.history_text, "value", history or "")
+        _set(self.history_section, "visible", bool(history))
+
+    def show_gpu_text(self, text: str):
+        """구조화된 레코드가 없을 때 (table 수집 방식) 텍스트 표로 표시"""
+        _set(self.gpu_text, "value", text)
+        _set(self.gpu_text, "visible", True)
+        _set(self.gpu_table.table, "visible", False)
+        _set(self.process_section, "visible", False)
+
+    def update_gpus(self, gpus: List[GpuRecord]) -> int:
+        _set(self.gpu_text, "visible", False)
+        _set(self.gpu_table.table, "visible", True)
+        return self.gpu_table.sync(_gpu_rows(gpus))
+
+    def update_processes(self, processes: List[ProcessRecord]) -> int:
+        _set(self.process_section, "visible", True)
+        _set(self.empty_processes, "visible", not processes)
+        return self.process_table.sync(_process_rows(processes))
+
+
+class _ServerBlock:
+    """전체 조회 화면의 서버 한 대 블록. GPU/프로세스는 행 단위로 고치고 나머지는 텍스트로 표시"""
+
+    def __init__(self, server: Dict):
+        self.text = _mono_text()
+        self.gpu_table = _gpu_table()
+        self.process_table = _process_table()
+        self.tables = ft.Column([self.gpu_table.table, self.process_table.table], visible=False)
+        self.root = _section(f"=== {server['name']} ===", ft.Column([_text_block(self.text), self.tables]),
+                             bottom=10)
+
+    def mark_stale(self):
+        _set(self.text, "color", ft.Colors.GREY_600)
+        _set(self.tables, "opacity", 0.5)
+
+    def show(self, snapshot: Optional[ServerSnapshot], status: str) -> int:
+        """스냅샷의 GPU/프로세스는 표로 (바뀐 행만), 구조화된 레코드가 없으면 텍스트로 표시"""
+        _set(self.text, "color", None)
+        _set(self.tables, "opacity", 1.0)
+        if snapshot is None or snapshot.gpu is None:
+            _set(self.text, "value", format_snapshot(snapshot) if snapshot is not None else status)
+            _set(self.tables, "visible", False)
+            return 0
+        _set(self.text, "value", format_system_info(snapshot.sections))
+        _set(self.tables, "visible", True)
+        _set(self.process_table.table, "visible", bool(snapshot.gpu.processes))
+        return self.gpu_table.sync(_gpu_rows(snapshot.gpu.gpus)) + \
+            self.process_table.sync(_process_rows(snapshot.gpu.processes))
+
+
+class AllServersPanel:
+    """전체 서버 조회 화면. 진행 상황과 서버별 결과 블록을 유지하며 값만 갱신"""
+
+    def __init__(self, servers: List[Dict]):
+        self.title_text = ft.Text("", size=20, weight=ft.FontWeight.BOLD)
+        self.updated_text = ft.Text("", size=14, color=ft.Colors.GREY_600)
+        self.progress_bar = ft.ProgressBar(width=400, value=0)
+        self.progress_text = ft.Text("", size=14, color=ft.Colors.GREY_600)
+        self.server_status_text = ft.Text("", size=14, color=ft.Colors.GREY_600)
+        # 완료된 서버를 끝난 순서대로 보여줄 영역
+        self.finished_list = ft.Column(spacing=2)
+        self.blocks: Dict[str, _ServerBlock] = {server["name"]: _ServerBlock(server) for server in servers}
+        self.total = len(servers)
+        self.done = 0
+        self.summary_table = KeyedTable(["GPU 종류", "서버", "빈 GPU", "여유 메모리", "사용률 p50/p90", "주요 사용자"],
+                                        numeric=(1, 2, 3))
+        self.summary_section = _section("GPU 종류별 요약", self.summary_table.table)
+
+        self.root = ft.Column(
+            controls=[
+                ft.Row(controls=[self.title_text, ft.Container(width=20), self.updated_text]),
+                ft.Divider(height=1, color=ft.Colors.GREY_300),
+                ft.Column(
+                    controls=[self.progress_bar, self.progress_text, self.server_status_text, self.finished_list],
+                    horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+                ),
+                ft.Divider(height=1, color=ft.Colors.GREY_300),
+                self.summary_section,
+                *(block.root for block in self.blocks.values()),
+            ],
+            scroll=ft.ScrollMode.AUTO,
+        )
+
+    def start(self, status: str):
+        self.done = 0
+        _set(self.title_text, "value", "모든 GPU 상태 로딩 중...")
+        _set(self.progress_bar, "value", 0)
+        _set(self.progress_text, "value", f"진행 상황: 0/{self.total} (0%)")
+        _set(self.server_status_text, "value", status)
+        self.finished_list.controls.clear()
+        for block in self.blocks.values():
+            block.mark_stale()
+
+    def add_result(self, server_name: str, summary: str, ok: bool, snapshot: Optional[ServerSnapshot],
+                   status: str = ""):
+        """서버 한 대의 조회 결과 반영 (snapshot 이 없으면 status 를 표시)"""
+        self.done += 1
+        progress = self.done / self.total if self.total else 1
+        _set(self.progress_bar, "value", progress)
+        _set(self.progress_text, "value", f"진행 상황: {self.done}/{self.total} ({int(progress * 100)}%)")
+        self.finished_list.controls.append(
+            ft.Text(summary, size=12, color=ft.Colors.GREEN_700 if ok else ft.Colors.RED_400)
+        )
+        block = self.blocks.get(server_name)
+        if block is not None:
+            block.show(snapshot, status)
+
+    def update_summary(self, pools: List["PoolSummary"]) -> int:
+        _set(self.summary_section, "visible", bool(pools))
+        return self.summary_table.sync([
+            (pool.spec, [
+                pool.spec,
+                f"{pool.servers}/{pool.servers_total}",
+                f"{pool.free_gpus}/{pool.gpus}",
+                f"{pool.free_memory_mib / 1024:.0f} GB",
+                "/".join(format_percent(value) for value in (pool.util_p50, pool.util_p90)),
+                format_top_users(pool),
+            ])
+            for pool in pools
+        ])
+
+    def finish(self, updated: str):
+        _set(self.title_text, "value", "전체 GPU 상태")
+        _set(self.updated_text, "value", f"마지막 업데이트: {updated}")
+        _set(self.progress_text, "value", "모든 서버 정보 수집 완료!")
+        _set(self.server_status_text, "value", "")
@@ -0,0 +1,81 @@
+"""검색 가능한 서버 카드 목록 (보이는 부분의 카드만 만든다)"""
+from typing import Callable, Dict, Iterable, List
+
+import flet as ft
+
+from ..inventory import ServerIndex, parse_query
+
+PAGE_SIZE = 20
+
+
+class ServerList:
+    """검색어에 맞는 서버 카드를 ListView 에 한 묶음씩 붙인다
+
+    카드는 처음 보일 때 만들어 재사용하고, 스크롤이 끝에 가까워지면 다음 묶음을 붙인다.
+    서버 수가 수백 대여도 화면에 나온 적 없는 카드는 만들지 않는다.
+    """
+
+    def __init__(self, index: ServerIndex, build_card: Callable[[Dict], ft.Control],
+                 page_size: int = PAGE_SIZE):
+        self.index = index
+        self.build_card = build_card
+        self.page_size = page_size
+        self.query = parse_query("")
+        self._cards: Dict[str, ft.Control] = {}
+        self._matches: List[str] = []
+        self.search_field = ft.TextField(
+            hint_text="검색: 이름, IP, GPU 종류, gpu:4, free",
+            prefix_icon=ft.Icons.SEARCH,
+            border_radius=10,
+            dense=True,
+            on_change=self._on_search,
+        )
+        self.count_text = ft.Text("", size=12, color=ft.Colors.GREY_600)
+        self.list_view = ft.ListView(spacing=10, expand=True, on_scroll=self._on_scroll,
+                                     on_scroll_interval=100)
+        self.root = ft.Column([self.search_field, self.count_text, self.list_view], spacing=10, expand=True)
+        self.apply()
+
+    def card(self, name: str) -> ft.Control:
+        card = self._cards.get(name)
+        if card is None:
+            card = self._cards[name] = self.build_card(self.index.server(name))
+        return card
+
+    def apply(self, keep_shown: bool = False):
+        """현재 검색어로 목록을 다시 채운다 (keep_shown 이면 이미 펼친 만큼은 유지)"""
+        shown = len(self.list_view.controls) if keep_shown else 0
+        self._matches = self.index.search(self.query)
+        count = min(len(self._matches), max(self.page_size, shown))
+        self.list_view.controls = [self.card(name) for name in self._matches[:count]]
+        total = len(self.index)
+        self.count_text.value = (f"서버 {total}대" if self.query.empty
+                                 else f"서버 {total}대 중 {len(self._matches)}대")
+
+    def _extend(self) -> bool:
+        shown = len(self.list_view.controls)
+        if shown >= len(self._matches):
+            return False
+        self.list_view.controls.extend(self.card(name)
+                                       for name in self._matches[shown:shown + self.page_size])
+        return True
+
+    def _on_search(self, e):
+        self.query = parse_query(self.search_field.value or "")
+        self.apply()
+        self.root.update()
+
+    def _on_scroll(self, e: ft.OnScrollEvent):
+        if e.max_scroll_extent - e.pixels <= e.viewport_dimension and self._extend():
+            self.list_view.update()
+
+    def on_live_change(self):
+        """빈 GPU 상태가 바뀌었을 때 (그 상태로 거르는 중이면 다시 검색)"""
+        if self.query.uses_live_state:
+            self.apply(keep_shown=True)
+
+    def invalidate(self, names: Iterable[str]):
+        """servers.json 에서 바뀌거나 빠진 서버의 카드를 버리고 목록을 다시 채운다"""
+        for name in names:
+            self._cards.pop(name, None)
+        self.apply(keep_shown=True)
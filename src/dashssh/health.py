@@ -0,0 +1,204 @@
+"""서버별 연결 상태 (정상 / 불안정 / 차단) 와 적응형 제한 시간
+
+연결이 연속으로 실패한 서버는 일정 시간 차단(open circuit)하여 조회하지 않고 바로 실패시킨다.
+차단 시간이 지나면 TCP 연결만 확인(점프 호스트 경유 서버는 확인 없이 한 번 시도)하고,
+되살아났으면 실제 조회를 한 번 허용한다. 다시 실패하면 차단 시간을 두 배로 늘린다.
+성공한 조회의 소요 시간으로 서버별 명령 실행 제한 시간을 정하고 (TCP 재전송 시간 계산과 같은 방식),
+시간 초과로 실패하면 다음 한 번은 제한 시간을 두 배로 늘려 느린 서버가 학습될 기회를 준다.
+"""
+import socket
+import threading
+import time
+from typing import Dict, List, Optional
+
+HEALTHY = "healthy"
+DEGRADED = "degraded"
+OPEN = "open"
+
+DEFAULT_FAILURE_THRESHOLD = 2
+DEFAULT_BACKOFF = 10.0
+DEFAULT_MAX_BACKOFF = 300.0
+DEFAULT_TCP_CHECK_TIMEOUT = 2.0
+DEFAULT_MIN_TIMEOUT = 3.0
+DEFAULT_MAX_TIMEOUT = 60.0
+DEFAULT_DEGRADED_LATENCY = 3.0
+
+STATE_LABELS = {HEALTHY: "정상", DEGRADED: "불안정", OPEN: "차단"}
+
+
+class HostUnavailable(OSError):
+    """차단된 서버 (연결을 시도하지 않음)"""
+
+
+class _HostState:
+    __slots__ = ("failures", "timeouts", "opens", "open_until", "probing", "srtt", "rttvar", "last_error")
+
+    def __init__(self):
+        self.failures = 0          # 연속 실패 수 (연결 또는 실행)
+        self.timeouts = 0          # 그중 시간 초과 수
+        self.opens = 0             # 연속 차단 횟수 (차단 시간 = backoff * 2^(opens-1))
+        self.open_until = 0.0      # 0 이면 차단되지 않음
+        self.probing = False       # 차단 시간이 지나 한 스레드가 확인 중
+        self.srtt: Optional[float] = None
+        self.rttvar = 0.0
+        self.last_error: Optional[str] = None
+
+
+class HostHealth:
+    """서버 label 별 상태. SSHConnectionPool 이 연결/실행 결과를 기록한다"""
+
+    def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 backoff: float = DEFAULT_BACKOFF, max_backoff: float = DEFAULT_MAX_BACKOFF,
+                 tcp_check_timeout: float = DEFAULT_TCP_CHECK_TIMEOUT, adaptive_timeout: bool = True,
+                 min_timeout: float = DEFAULT_MIN_TIMEOUT, max_timeout: float = DEFAULT_MAX_TIMEOUT,
+                 degraded_latency: float = DEFAULT_DEGRADED_LATENCY):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.backoff = float(backoff)
+        self.max_backoff = float(max_backoff)
+        self.tcp_check_timeout = float(tcp_check_timeout)
+        self.adaptive_timeout = bool(adaptive_timeout)
+        self.min_timeout = float(min_timeout)
+        self.max_timeout = float(max_timeout)
+        self.degraded_latency = float(degraded_latency)
+        self._hosts: Dict[str, _HostState] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict) -> "HostHealth":
+        """servers.json 의 "health" 항목으로 생성"""
+        options = config.get("health", {})
+        return cls(
+            failure_threshold=options.get("failure_threshold", DEFAULT_FAILURE_THRESHOLD),
+            backoff=options.get("backoff", DEFAULT_BACKOFF),
+            max_backoff=options.get("max_backoff", DEFAULT_MAX_BACKOFF),
+            tcp_check_timeout=options.get("tcp_check_timeout", DEFAULT_TCP_CHECK_TIMEOUT),
+            adaptive_timeout=options.get("adaptive_timeout", True),
+            min_timeout=options.get("min_timeout", DEFAULT_MIN_TIMEOUT),
+            max_timeout=options.get("max_timeout", DEFAULT_MAX_TIMEOUT),
+            degraded_latency=options.get("degraded_latency", DEFAULT_DEGRADED_LATENCY),
+        )
+
+    def _host(self, label: str) -> _HostState:
+        host = self._hosts.get(label)
+        if host is None:
+            host = self._hosts[label] = _HostState()
+        return host
+
+    def _state(self, host: _HostState) -> str:
+        if host.open_until:
+            return OPEN
+        if host.failures or (host.srtt is not None and host.srtt > self.degraded_latency):
+            return DEGRADED
+        return HEALTHY
+
+    def state(self, label: str) -> str:
+        with self._lock:
+            host = self._hosts.get(label)
+            return self._state(host) if host else HEALTHY
+
+    def _timeout(self, host: Optional[_HostState], default: float) -> float:
+        if not self.adaptive_timeout or host is None:
+            return default
+        timeout = default if host.srtt is None else max(self.min_timeout, host.srtt + 4 * host.rttvar)
+        if host.timeouts:
+            timeout *= 2
+        return min(self.max_timeout, timeout)
+
+    def timeout_for(self, label: str, default: float) -> float:
+        """관측한 소요 시간에 맞춘 명령 실행 제한 시간 (기록이 없으면 default)
+
+        연결/핸드셰이크 제한 시간에는 쓰지 않는다 (먼 서버나 점프 호스트 경유 연결은 min_timeout 보다 오래 걸릴 수 있다).
+        """
+        with self._lock:
+            return self._timeout(self._hosts.get(label), default)
+
+    def wait_for(self, label: str, default: float, connect_timeout: float = 0.0) -> float:
+        """조회 한 번을 기다릴 시간 (default 와 명령 실행 제한 시간 중 긴 쪽)
+
+        풀에 세션이 없어 연결/인증부터 해야 하면 그 제한 시간을 connect_timeout 으로 받아 더한다.
+        """
+        return max(default, self.timeout_for(label, default)) + connect_timeout
+
+    def check(self, label: str):
+        """차단 중인 서버면 HostUnavailable (차단 시간이 지났으면 통과)"""
+        with self._lock:
+            host = self._hosts.get(label)
+            if host is None or not host.open_until:
+                return
+            wait = host.open_until - time.monotonic()
+            if wait > 0:
+                raise HostUnavailable(f"최근 연결 실패로 건너뜀 ({wait:.0f}초 후 다시 확인): {host.last_error}")
+
+    def before_connect(self, label: str, ip: str, port: int, tcp_check: bool = True):
+        """새 연결을 만들기 전에 호출. 차단 중이면 HostUnavailable
+
+        차단 시간이 지났으면 한 스레드만 TCP 연결을 확인하고 (tcp_check), 그동안 다른 요청은 바로 실패한다.
+        """
+        with self._lock:
+            host = self._hosts.get(label)
+            if host is None or not host.open_until:
+                return
+            now = time.monotonic()
+            if host.probing or now < host.open_until:
+                wait = max(0.0, host.open_until - now)
+                raise HostUnavailable(f"최근 연결 실패로 건너뜀 ({wait:.0f}초 후 다시 확인): {host.last_error}")
+            host.probing = True
+        if tcp_check:
+            try:
+                socket.create_connection((ip, port), timeout=self.tcp_check_timeout).close()
+            except OSError as e:
+                self.record_failure(label, e)
+                raise HostUnavailable(f"연결 불가 (TCP 확인 실패): {e}") from None
+        # 실제 연결 한 번 허용 (probing 은 그 결과를 record_* / release 로 기록할 때 풀린다)
+
+    def record_failure(self, label: str, error: BaseException):
+        """연결 실패 (시간 초과, 연결 거부, 핸드셰이크 실패 등) 또는 실행 중 시간 초과/끊김"""
+        with self._lock:
+            host = self._host(label)
+            host.failures += 1
+            if isinstance(error, socket.timeout):
+                host.timeouts += 1
+            host.probing = False
+            host.last_error = str(error) or type(error).__name__
+            # 차단 후 허용한 시도가 실패하면 기준 횟수와 관계없이 바로 다시 차단
+            if host.failures >= self.failure_threshold or host.opens:
+                host.opens += 1
+                delay = min(self.max_backoff, self.backoff * 2 ** (host.opens - 1))
+                host.open_until = time.monotonic() + delay
+
+    def record_success(self, label: str, elapsed: Optional[float] = None):
+        """연결 또는 실행 성공. elapsed 가 있으면 제한 시간 추정에 반영"""
+        with self._lock:
+            host = self._host(label)
+            host.failures = host.timeouts = host.opens = 0
+            host.open_until = 0.0
+            host.probing = False
+            host.last_error = None
+            if elapsed is None:
+                return
+            if host.srtt is None:
+                host.srtt, host.rttvar = elapsed, elapsed / 2
+            else:
+                host.rttvar = 0.75 * host.rttvar + 0.25 * abs(host.srtt - elapsed)
+                host.srtt = 0.875 * host.srtt + 0.125 * elapsed
+
+    def release(self, label: str):
+        """before_connect 가 허용한 연결이 결과 없이 끝난 경우 (취소 등)"""
+        with self._lock:
+            host = self._hosts.get(label)
+            if host is not None:
+                host.probing = False
+
+    def rows(self) -> List[Dict]:
+        """진단 표시용 서버별 상태"""
+        now = time.monotonic()
+        with self._lock:
+            return [{
+                "host": label,
+                "state": self._state(host),
+                "failures": host.failures,
+                "latency": host.srtt,
+                "timeout": self._timeout(host, 0.0) or None,
+                "retry_in": max(0.0, host.open_until - now) if host.open_until else None,
+                "error": host.last_error,
+            } for label, host in sorted(self._hosts.items())]
@@ -0,0 +1,222 @@
+"""GPU 별 사용률/메모리 기록을 memmap 링 버퍼에 저장하는 시계열 저장소
+
+GPU 하나당 파일 하나를 쓰며, 파일 안에 해상도별 링 버퍼 세 개
+(원본 샘플, 1분 평균, 1시간 평균)가 들어 있다. 파일은 필요할 때만
+memmap 으로 열리므로 전체 기록을 메모리에 올리지 않는다.
+"""
+import os
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .nvsmi import GpuRecord
+from .paths import data_path
+
+SAMPLE_DTYPE = np.dtype([("t", "<f8"), ("util", "<f4"), ("mem", "<f4")])
+
+RESOLUTIONS = ("raw", "minute", "hour")
+BUCKET_SECONDS = {"minute": 60.0, "hour": 3600.0}
+
+DEFAULT_CAPACITY = {"raw": 4096, "minute": 7 * 24 * 60, "hour": 365 * 24}
+
+# 헤더 (float64 배열) 구성
+_HEADER_SIZE = 32
+_H_VERSION, _H_MEMORY_TOTAL = 0, 1
+_H_RING = {"raw": 2, "minute": 4, "hour": 6}              # [쓰기 위치, 개수]
+_H_ACC = {"minute": 8, "hour": 12}                        # [버킷 시작, util 합, mem 합, 샘플 수]
+_VERSION = 1.0
+
+SeriesKey = Tuple[str, int]
+
+
+def _safe_name(name: str) -> str:
+    return re.sub(r"[^0-9A-Za-z_.-]", "_", name)
+
+
+class _Series:
+    """GPU 하나의 기록 파일"""
+
+    def __init__(self, path: str, capacity: Dict[str, int]):
+        self.capacity = capacity
+        total = sum(capacity[res] for res in RESOLUTIONS)
+        size = _HEADER_SIZE * 8 + total * SAMPLE_DTYPE.itemsize
+        new = not os.path.exists(path) or os.path.getsize(path) != size
+        if new:
+            with open(path, "wb") as f:
+                f.truncate(size)
+        self.header = np.memmap(path, dtype="<f8", mode="r+", shape=(_HEADER_SIZE,))
+        if new:
+            self.header[_H_VERSION] = _VERSION
+        self.rings: Dict[str, np.memmap] = {}
+        offset = _HEADER_SIZE * 8
+        for res in RESOLUTIONS:
+            self.rings[res] = np.memmap(path, dtype=SAMPLE_DTYPE, mode="r+",
+                                        offset=offset, shape=(capacity[res],))
+            offset += capacity[res] * SAMPLE_DTYPE.itemsize
+
+    def _append(self, res: str, t: float, util: float, mem: float):
+        slot = _H_RING[res]
+        head, count = int(self.header[slot]), int(self.header[slot + 1])
+        ring = self.rings[res]
+        ring[head] = (t, util, mem)
+        self.header[slot] = (head + 1) % len(ring)
+        self.header[slot + 1] = min(count + 1, len(ring))
+
+    def last_time(self) -> Optional[float]:
+        slot = _H_RING["raw"]
+        head, count = int(self.header[slot]), int(self.header[slot + 1])
+        if not count:
+            return None
+        ring = self.rings["raw"]
+        return float(ring[(head - 1) % len(ring)]["t"])
+
+    def append(self, t: float, util: float, mem: float):
+        """원본 샘플을 기록하고 1분/1시간 버킷이 끝나면 평균을 다음 해상도로 넘긴다"""
+        self._append("raw", t, util, mem)
+        for res, width in BUCKET_SECONDS.items():
+            slot = _H_ACC[res]
+            bucket = t - (t % width)
+            start, util_sum, mem_sum, n = self.header[slot:slot + 4]
+            if n and bucket != start:
+                self._append(res, start, util_sum / n, mem_sum / n)
+                util_sum = mem_sum = n = 0.0
+            self.header[slot:slot + 4] = (bucket, util_sum + util, mem_sum + mem, n + 1)
+
+    def ordered(self, res: str) -> np.ndarray:
+        """시간 순으로 정렬된 샘플 (복사본)"""
+        slot = _H_RING[res]
+        head, count = int(self.header[slot]), int(self.header[slot + 1])
+        ring = self.rings[res]
+        if count < len(ring):
+            return np.array(ring[:count])
+        return np.concatenate((ring[head:], ring[:head]))
+
+    def oldest(self, res: str) -> Optional[float]:
+        slot = _H_RING[res]
+        head, count = int(self.header[slot]), int(self.header[slot + 1])
+        if not count:
+            return None
+        ring = self.rings[res]
+        return float(ring[0]["t"] if count < len(ring) else ring[head]["t"])
+
+    def flush(self):
+        self.header.flush()
+        for ring in self.rings.values():
+            ring.flush()
+
+
+class HistoryStore:
+    """서버/GPU 별 시계열 기록 저장소"""
+
+    def __init__(self, directory: Optional[str] = None, capacity: Optional[Dict[str, int]] = None):
+        self.directory = directory or os.path.dirname(data_path("history", "_"))
+        os.makedirs(self.directory, exist_ok=True)
+        self.capacity = dict(DEFAULT_CAPACITY, **(capacity or {}))
+        self._series: Dict[SeriesKey, _Series] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict) -> "HistoryStore":
+        """servers.json 의 "history" 항목으로 저장소 생성"""
+        options = config.get("history", {})
+        directory = options.get("directory")
+        capacity = {res: options[f"{res}_capacity"] for res in RESOLUTIONS if f"{res}_capacity" in options}
+        return cls(os.path.expanduser(directory) if directory else None, capacity)
+
+    def _path(self, key: SeriesKey) -> str:
+        server, index = key
+        return os.path.join(self.directory, f"{_safe_name(server)}.gpu{index}.hist")
+
+    def _get(self, key: SeriesKey, create: bool) -> Optional[_Series]:
+        series = self._series.get(key)
+        if series is None and (create or os.path.exists(self._path(key))):
+            series = self._series[key] = _Series(self._path(key), self.capacity)
+        return series
+
+    def record(self, server_name: str, gpus: Iterable[GpuRecord], t: Optional[float] = None):
+        """GPU 레코드들의 사용률과 메모리 사용량 기록"""
+        t = time.time() if t is None else t
+        with self._lock:
+            for gpu in gpus:
+                if gpu.index < 0:
+                    continue
+                series = self._get((server_name, gpu.index), create=True)
+                last = series.last_time()
+                if last is not None and t <= last:
+                    continue  # 이미 기록한 구간 (에이전트가 돌려준 이전 샘플, 같은 스냅샷 중복 기록 등)
+                if gpu.memory_total > 0:
+                    series.header[_H_MEMORY_TOTAL] = gpu.memory_total
+                series.append(t, max(gpu.utilization, 0), max(gpu.memory_used, 0))
+
+    def series_keys(self) -> List[SeriesKey]:
+        """디스크에 기록이 있는 (서버, GPU 인덱스) 목록"""
+        keys = set(self._series)
+        pattern = re.compile(r"^(.*)\.gpu(\d+)\.hist$")
+        for filename in os.listdir(self.directory):
+            match = pattern.match(filename)
+            if match:
+                keys.add((match.group(1), int(match.group(2))))
+        return sorted(keys)
+
+    def memory_total(self, server_name: str, index: int) -> Optional[float]:
+        with self._lock:
+            series = self._get((server_name, index), create=False)
+            return float(series.header[_H_MEMORY_TOTAL]) if series is not None else None
+
+    def query(self, server_name: str, index: int, start: float, end: Optional[float] = None,
+              resolution: str = "auto") -> np.ndarray:
+        """[start, end] 구간 샘플. resolution="auto" 면 구간을 덮는 가장 촘촘한 해상도 사용"""
+        end = time.time() if end is None else end
+        with self._lock:
+            series = self._get((server_name, index), create=False)
+            if series is None:
+                return np.empty(0, dtype=SAMPLE_DTYPE)
+            if resolution == "auto":
+                # 구간을 다 덮는 해상도가 없으면 가장 오래된 기록이 있는 해상도 사용
+                resolution, earliest = "raw", None
+                for res in RESOLUTIONS:
+                    oldest = series.oldest(res)
+                    if oldest is None:
+                        continue
+                    if oldest <= start:
+                        resolution = res
+                        break
+                    if earliest is None or oldest < earliest:
+                        resolution, earliest = res, oldest
+            samples = series.ordered(resolution)
+        lo = np.searchsorted(samples["t"], start, side="left")
+        hi = np.searchsorted(samples["t"], end, side="right")
+        return samples[lo:hi]
+
+    def sparklines(self, keys: Iterable[SeriesKey], start: float, end: Optional[float] = None,
+                   points: int = 60, field: str = "util") -> Dict[SeriesKey, np.ndarray]:
+        """여러 GPU 의 구간을 points 개 구간 평균으로 요약 (비어 있는 구간은 NaN)"""
+        end = time.time() if end is None else end
+        width = max(end - start, 1e-9) / points
+        result = {}
+        for key in keys:
+            samples = self.query(key[0], key[1], start, end)
+            bins = np.minimum(((samples["t"] - start) / width).astype(np.int64), points - 1)
+            sums = np.bincount(bins, weights=samples[field], minlength=points)
+            counts = np.bincount(bins, minlength=points)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                result[key] = np.where(counts > 0, sums / counts, np.nan)
+        return result
+
+    def flush(self):
+        with self._lock:
+            for series in self._series.values():
+                series.flush()
+
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+
+def sparkline(values: np.ndarray, maximum: float = 100.0) -> str:
+    """0~maximum 값을 막대 문자로 표시 (기록 없는 구간은 공백)"""
+    levels = np.clip(np.nan_to_num(values / maximum * (len(SPARK_CHARS) - 1), nan=-1), -1,
+                     len(SPARK_CHARS) - 1)
+    return "".join(" " if level < 0 else SPARK_CHARS[int(round(level))] for level in levels)
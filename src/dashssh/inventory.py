@@ -0,0 +1,121 @@
+"""서버 목록 검색 색인 (이름/IP/GPU 종류/GPU 수/빈 GPU 상태)
+
+servers.json 의 서버마다 검색 문자열과 숫자 필드를 미리 만들어 두고, 검색어가 바뀔 때는
+색인만 훑는다. servers.json 이 바뀌면 추가/삭제/변경된 서버의 항목만 다시 만든다.
+
+검색어는 공백으로 나눈 조건을 모두 만족하는 서버를 찾는다.
+  a5000 10.201     : 이름/IP/GPU 종류/설명에 두 문자열이 모두 포함
+  gpu:4            : GPU 가 4개 이상인 서버
+  free / free:2    : 마지막 스냅샷 기준 빈 GPU 가 1개(2개) 이상인 서버 ("빈", "빈:2" 도 같음)
+"""
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from .cache import ServerSnapshot
+
+FREE_KEYWORDS = ("free", "빈")
+
+
+class ServerQuery(NamedTuple):
+    """파싱된 검색어"""
+    words: Tuple[str, ...]
+    min_gpus: int = 0
+    min_free: int = 0
+
+    @property
+    def uses_live_state(self) -> bool:
+        """빈 GPU 상태에 따라 결과가 달라지는 검색어인지 (스냅샷이 바뀌면 다시 검색)"""
+        return self.min_free > 0
+
+    @property
+    def empty(self) -> bool:
+        return not self.words and not self.min_gpus and not self.min_free
+
+
+def parse_query(text: str) -> ServerQuery:
+    words, min_gpus, min_free = [], 0, 0
+    for term in text.lower().split():
+        key, sep, value = term.partition(":")
+        if key in FREE_KEYWORDS and (not sep or value.isdigit()):
+            min_free = max(min_free, int(value) if value else 1)
+        elif key == "gpu" and value.isdigit():
+            min_gpus = max(min_gpus, int(value))
+        else:
+            words.append(term)
+    return ServerQuery(tuple(words), min_gpus, min_free)
+
+
+class _IndexEntry:
+    __slots__ = ("server", "text", "gpu_count", "free_gpus")
+
+    def __init__(self, server: Dict, free_gpus: Optional[int]):
+        self.server = server
+        self.text = " ".join(str(server.get(field, "")) for field in
+                             ("name", "ip", "gpu_spec", "description")).lower()
+        self.gpu_count = int(server.get("gpu_count") or 0)
+        self.free_gpus = free_gpus
+
+
+class ServerIndex:
+    """서버 이름 -> 검색 항목 (servers.json 순서 유지)"""
+
+    def __init__(self, servers: Iterable[Dict] = ()):
+        self._entries: Dict[str, _IndexEntry] = {}
+        self._order: List[str] = []
+        self._lock = threading.Lock()
+        self.set_servers(list(servers))
+
+    def set_servers(self, servers: List[Dict]) -> Tuple[Set[str], Set[str], Set[str]]:
+        """서버 목록 교체. 바뀐 서버만 색인을 다시 만들고 (추가, 삭제, 변경) 이름을 반환"""
+        with self._lock:
+            old = self._entries
+            entries, added, changed = {}, set(), set()
+            for server in servers:
+                name = server["name"]
+                entry = old.get(name)
+                if entry is None:
+                    added.add(name)
+                elif entry.server != server:
+                    changed.add(name)
+                else:
+                    entries[name] = entry
+                    continue
+                entries[name] = _IndexEntry(server, entry.free_gpus if entry else None)
+            removed = set(old) - set(entries)
+            self._entries = entries
+            self._order = [server["name"] for server in servers]
+        return added, removed, changed
+
+    def update(self, snapshot: ServerSnapshot) -> bool:
+        """스냅샷의 빈 GPU 수 반영. 값이 바뀌었으면 True"""
+        free_gpus = snapshot.free_gpu_count()
+        with self._lock:
+            entry = self._entries.get(snapshot.server_name)
+            if entry is None or entry.free_gpus == free_gpus:
+                return False
+            entry.free_gpus = free_gpus
+            return True
+
+    def server(self, name: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(name)
+            return entry.server if entry else None
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def search(self, query: ServerQuery) -> List[str]:
+        """조건에 맞는 서버 이름 (servers.json 순서)"""
+        with self._lock:
+            if query.empty:
+                return list(self._order)
+            result = []
+            for name in self._order:
+                entry = self._entries[name]
+                if entry.gpu_count < query.min_gpus:
+                    continue
+                if query.min_free and (entry.free_gpus or 0) < query.min_free:
+                    continue
+                if all(word in entry.text for word in query.words):
+                    result.append(name)
+            return result
@@ -0,0 +1,138 @@
+"""긴 SSH 채널 하나로 nvidia-smi 루프 출력을 받아 실시간 GPU 상태를 전달"""
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import paramiko
+
+from .nvsmi import GPU_FIELDS, GpuRecord, parse_gpu_lines
+
+DEFAULT_INTERVAL_MS = 500
+DEFAULT_MAX_FPS = 2.0
+
+FrameCallback = Callable[[List[GpuRecord]], None]
+ErrorCallback = Callable[[str], None]
+
+
+def live_command(interval_ms: int) -> str:
+    return f"nvidia-smi --query-gpu={GPU_FIELDS} --format=csv,noheader,nounits -lms {int(interval_ms)}"
+
+
+class LiveTelemetry:
+    """nvidia-smi -lms 출력을 줄 단위로 파싱하고 제한된 프레임 속도로 on_frame 호출
+
+    원격 루프는 pty 가 할당된 채널에서 실행되므로 stop() 으로 채널을 닫으면
+    원격 프로세스도 SIGHUP 으로 종료된다.
+    """
+
+    def __init__(self, open_transport: Callable[[], paramiko.Transport],
+                 on_frame: FrameCallback, on_error: Optional[ErrorCallback] = None,
+                 interval_ms: int = DEFAULT_INTERVAL_MS, max_fps: float = DEFAULT_MAX_FPS,
+                 keepalive: Optional[Callable[[], None]] = None):
+        self.open_transport = open_transport
+        self.on_frame = on_frame
+        self.on_error = on_error
+        self.interval_ms = max(100, int(interval_ms))
+        self.min_frame_gap = 1.0 / max(0.1, float(max_fps))
+        self.keepalive = keepalive
+        self.frames_received = 0
+        self._channel: Optional[paramiko.Channel] = None
+        self._latest: Optional[List[GpuRecord]] = None
+        self._dirty = threading.Event()
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    @classmethod
+    def from_config(cls, config: Dict, open_transport: Callable[[], paramiko.Transport],
+                    on_frame: FrameCallback, **kwargs) -> "LiveTelemetry":
+        """servers.json 의 "live" 항목으로 생성"""
+        options = config.get("live", {})
+        return cls(open_transport, on_frame,
+                   interval_ms=options.get("interval_ms", DEFAULT_INTERVAL_MS),
+                   max_fps=options.get("max_fps", DEFAULT_MAX_FPS), **kwargs)
+
+    @property
+    def running(self) -> bool:
+        return not self._stopped.is_set() and any(t.is_alive() for t in self._threads)
+
+    def start(self):
+        self._threads = [
+            threading.Thread(target=self._read_loop, name="live-reader", daemon=True),
+            threading.Thread(target=self._emit_loop, name="live-emitter", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        """원격 루프를 중단하고 채널 정리"""
+        self._stopped.set()
+        self._dirty.set()
+        with self._lock:
+            channel, self._channel = self._channel, None
+        if channel is not None:
+            channel.close()
+
+    def _read_loop(self):
+        try:
+            channel = self.open_transport().open_session()
+            with self._lock:
+                if self._stopped.is_set():
+                    channel.close()
+                    return
+                self._channel = channel
+            channel.get_pty(width=500)
+            channel.exec_command(live_command(self.interval_ms))
+
+            frame: List[GpuRecord] = []
+            for raw in channel.makefile('r'):
+                if self._stopped.is_set():
+                    break
+                records = parse_gpu_lines([raw.strip()])
+                if not records:
+                    continue
+                # GPU 인덱스가 다시 작아지면 한 주기의 출력이 끝난 것
+                if frame and records[0].index <= frame[-1].index:
+                    self._publish(frame)
+                    frame = []
+                frame.append(records[0])
+            if not self._stopped.is_set():
+                if frame:
+                    self._publish(frame)
+                self._fail("실시간 스트림이 종료되었습니다.")
+        except Exception as e:
+            if not self._stopped.is_set():
+                self._fail(str(e) or type(e).__name__)
+        finally:
+            self.stop()
+
+    def _publish(self, frame: List[GpuRecord]):
+        self.frames_received += 1
+        with self._lock:
+            self._latest = frame
+        self._dirty.set()
+
+    def _emit_loop(self):
+        # 줄마다 UI 를 갱신하지 않고 최신 프레임만 최대 max_fps 로 전달
+        while not self._stopped.is_set():
+            self._dirty.wait()
+            if self._stopped.is_set():
+                break
+            self._dirty.clear()
+            with self._lock:
+                frame, self._latest = self._latest, None
+            if frame is not None:
+                try:
+                    self.on_frame(frame)
+                    if self.keepalive is not None:
+                        self.keepalive()
+                except Exception as e:
+                    self._fail(str(e))
+            self._stopped.wait(self.min_frame_gap)
+
+    def _fail(self, message: str):
+        if self.on_error is not None:
+            try:
+                self.on_error(message)
+            except Exception:
+                pass
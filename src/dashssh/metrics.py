@@ -0,0 +1,149 @@
+"""서버/단계별 지연 시간 히스토그램
+
+연결(dns, tcp_connect, handshake, auth_agent / auth_key / auth_password), 명령 실행(channel_open, exec,
+nvidia_smi), 파싱(parse), 화면 갱신(render) 등 각 단계의 소요 시간을 서버마다
+기록한다. 항상 켜 두어도 부담이 없도록 기록은 고정 버킷 카운터 증가만 한다.
+"""
+import json
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+# 0.1ms ~ 약 105초, √2 배 간격의 버킷 상한 (초). 백분위 오차는 버킷 폭(약 41%) 이내
+BUCKETS: Tuple[float, ...] = tuple(0.0001 * 2 ** (i / 2) for i in range(41))
+
+MetricKey = Tuple[str, str]
+
+
+class LatencyHistogram:
+    """고정 버킷 히스토그램 (잠금은 LatencyRecorder 가 담당)"""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # 마지막 칸은 +Inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q: float) -> float:
+        """q 분위가 속한 버킷의 상한 (최댓값을 넘지 않음)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(BUCKETS[i] if i < len(BUCKETS) else self.max, self.max)
+        return self.max
+
+    def summary(self) -> Dict:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "max": self.max,
+        }
+
+
+class _Span:
+    """with 블록의 소요 시간을 기록 (예외가 나도 기록)"""
+
+    __slots__ = ("recorder", "host", "phase", "start")
+
+    def __init__(self, recorder: "LatencyRecorder", host: str, phase: str):
+        self.recorder = recorder
+        self.host = host
+        self.phase = phase
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.recorder.observe(self.host, self.phase, time.perf_counter() - self.start)
+        return False
+
+
+class LatencyRecorder:
+    """(서버, 단계) 별 히스토그램 모음"""
+
+    def __init__(self):
+        self._histograms: Dict[MetricKey, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, host: str, phase: str, seconds: float):
+        with self._lock:
+            histogram = self._histograms.get((host, phase))
+            if histogram is None:
+                histogram = self._histograms[(host, phase)] = LatencyHistogram()
+            histogram.observe(seconds)
+
+    def time(self, host: str, phase: str) -> _Span:
+        """with recorder.time(host, phase): ... 형태로 구간 측정"""
+        return _Span(self, host, phase)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def rows(self, host: Optional[str] = None) -> List[Tuple[str, str, Dict]]:
+        """(서버, 단계, 요약) 목록. 서버 이름 순, 단계는 처음 기록된 순서"""
+        with self._lock:
+            items = [(key, histogram.summary()) for key, histogram in self._histograms.items()
+                     if host is None or key[0] == host]
+        order = {key: i for i, (key, _) in enumerate(items)}
+        items.sort(key=lambda item: (item[0][0], order[item[0]]))
+        return [(key[0], key[1], summary) for key, summary in items]
+
+    def to_dict(self) -> Dict:
+        hosts: Dict[str, Dict] = {}
+        for host, phase, summary in self.rows():
+            hosts.setdefault(host, {})[phase] = summary
+        return {"generated_at": time.time(), "unit": "seconds", "hosts": hosts}
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition 형식 (histogram)"""
+        name = "dashssh_phase_duration_seconds"
+        lines = [f"# HELP {name} DASH-SSH phase latency per host.", f"# TYPE {name} histogram"]
+        with self._lock:
+            items = sorted((key, list(h.counts), h.count, h.total) for key, h in self._histograms.items())
+        for (host, phase), counts, count, total in items:
+            labels = f'host="{_escape(host)}",phase="{_escape(phase)}"'
+            cumulative = 0
+            for bound, bucket in zip(BUCKETS, counts):
+                cumulative += bucket
+                lines.append(f'{name}_bucket{{{labels},le="{bound:.6g}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f"{name}_sum{{{labels}}} {total:.6f}")
+            lines.append(f"{name}_count{{{labels}}} {count}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: str) -> str:
+        """확장자가 .prom/.txt 이면 Prometheus 형식, 그 외에는 JSON 으로 저장"""
+        text = self.to_prometheus() if path.endswith((".prom", ".txt")) else self.to_json() + "\n"
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_duration(seconds: float) -> str:
+    """진단 패널 표시용 (ms / s)"""
+    return f"{seconds * 1000:.1f}ms" if seconds < 1 else f"{seconds:.2f}s"
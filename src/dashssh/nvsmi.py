@@ -0,0 +1,146 @@
+"""nvidia-smi CSV 쿼리 결과를 GPU/프로세스 레코드로 파싱"""
+from typing import Dict, List, Optional
+
+GPU_FIELDS = "index,uuid,memory.used,memory.total,utilization.gpu,temperature.gpu,name"
+APP_FIELDS = "pid,gpu_uuid,used_memory,process_name"
+APPS_SENTINEL = "@@DASHSSH_APPS@@"
+
+# GPU/프로세스 쿼리를 한 번의 exec 로 실행 (두 쿼리는 한 번의 nvidia-smi 호출로 합칠 수 없음)
+QUERY_COMMAND = (
+    f"nvidia-smi --query-gpu={GPU_FIELDS} --format=csv,noheader,nounits; "
+    f"echo '{APPS_SENTINEL}'; "
+    f"nvidia-smi --query-compute-apps={APP_FIELDS} --format=csv,noheader,nounits"
+)
+
+
+def _to_int(value: str) -> int:
+    """숫자로 변환, [N/A] / [Not Supported] 등은 -1"""
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return int(float(value))
+        except ValueError:
+            return -1
+
+
+class GpuRecord:
+    """GPU 한 개의 상태 (메모리 단위: MiB)"""
+    __slots__ = ("index", "uuid", "name", "memory_used", "memory_total", "utilization", "temperature")
+
+    def __init__(self, index: int, uuid: str, name: str, memory_used: int,
+                 memory_total: int, utilization: int, temperature: int):
+        self.index = index
+        self.uuid = uuid
+        self.name = name
+        self.memory_used = memory_used
+        self.memory_total = memory_total
+        self.utilization = utilization
+        self.temperature = temperature
+
+    @property
+    def memory_free(self) -> int:
+        if self.memory_total < 0 or self.memory_used < 0:
+            return -1
+        return self.memory_total - self.memory_used
+
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "GpuRecord":
+        return cls(**{name: data[name] for name in cls.__slots__})
+
+    def __repr__(self) -> str:
+        return (f"GpuRecord(index={self.index}, memory={self.memory_used}/{self.memory_total}MiB, "
+                f"util={self.utilization}%)")
+
+
+class ProcessRecord:
+    """GPU 를 사용 중인 프로세스 한 개 (메모리 단위: MiB)
+
+    user / started_at / command 는 ps 로 보강한 값 (알 수 없으면 "" / 0 / "")
+    """
+    __slots__ = ("pid", "gpu_uuid", "gpu_index", "used_memory", "name", "user", "started_at", "command")
+
+    def __init__(self, pid: int, gpu_uuid: str, used_memory: int, name: str, gpu_index: int = -1,
+                 user: str = "", started_at: float = 0.0, command: str = ""):
+        self.pid = pid
+        self.gpu_uuid = gpu_uuid
+        self.gpu_index = gpu_index
+        self.used_memory = used_memory
+        self.name = name
+        self.user = user
+        self.started_at = started_at
+        self.command = command
+
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ProcessRecord":
+        return cls(**{name: data[name] for name in cls.__slots__ if name in data})
+
+    def __repr__(self) -> str:
+        return f"ProcessRecord(pid={self.pid}, gpu={self.gpu_index}, memory={self.used_memory}MiB)"
+
+
+class GpuSnapshot:
+    """서버 한 대의 GPU/프로세스 레코드 묶음"""
+    __slots__ = ("gpus", "processes")
+
+    def __init__(self, gpus: List[GpuRecord], processes: List[ProcessRecord]):
+        self.gpus = gpus
+        self.processes = processes
+
+    def gpu_by_uuid(self, uuid: str) -> Optional[GpuRecord]:
+        for gpu in self.gpus:
+            if gpu.uuid == uuid:
+                return gpu
+        return None
+
+    def to_dict(self) -> Dict:
+        return {
+            "gpus": [gpu.to_dict() for gpu in self.gpus],
+            "processes": [proc.to_dict() for proc in self.processes],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "GpuSnapshot":
+        return cls([GpuRecord.from_dict(gpu) for gpu in data["gpus"]],
+                   [ProcessRecord.from_dict(proc) for proc in data["processes"]])
+
+
+def parse_gpu_lines(lines: List[str]) -> List[GpuRecord]:
+    gpus = []
+    for line in lines:
+        # 이름에 쉼표가 들어가도 깨지지 않도록 name 은 마지막 필드로 두고 나머지만 분리
+        parts = line.split(", ", 6)
+        if len(parts) != 7:
+            continue
+        index, uuid, used, total, util, temp, name = parts
+        gpus.append(GpuRecord(_to_int(index), uuid, name.strip(), _to_int(used),
+                              _to_int(total), _to_int(util), _to_int(temp)))
+    return gpus
+
+
+def parse_app_lines(lines: List[str], uuid_to_index: Dict[str, int]) -> List[ProcessRecord]:
+    processes = []
+    for line in lines:
+        # 공백이나 쉼표가 들어간 프로세스 이름도 그대로 유지
+        parts = line.split(", ", 3)
+        if len(parts) != 4:
+            continue
+        pid, gpu_uuid, used, name = parts
+        processes.append(ProcessRecord(_to_int(pid), gpu_uuid, _to_int(used), name.strip(),
+                                       uuid_to_index.get(gpu_uuid, -1)))
+    return processes
+
+
+def parse_query_output(output: str) -> GpuSnapshot:
+    """QUERY_COMMAND 출력 파싱"""
+    gpu_part, _, app_part = output.partition(APPS_SENTINEL)
+    gpus = parse_gpu_lines(gpu_part.strip().splitlines())
+    uuid_to_index = {gpu.uuid: gpu.index for gpu in gpus}
+    processes = parse_app_lines(app_part.strip().splitlines(), uuid_to_index)
+    return GpuSnapshot(gpus, processes)
@@ -0,0 +1,11 @@
+"""로컬 데이터 파일 경로"""
+import os
+
+DATA_DIR = os.environ.get("DASHSSH_HOME") or os.path.join(os.path.expanduser("~"), ".dashssh")
+
+
+def data_path(*parts: str) -> str:
+    """DATA_DIR 아래 경로를 돌려주고 상위 디렉터리를 만든다"""
+    path = os.path.join(DATA_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
@@ -0,0 +1,377 @@
+"""(ip, port, username) 별로 인증된 SSH 세션을 유지하는 연결 풀"""
+import errno
+import os
+import select
+import socket
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+import paramiko
+
+from .auth import Authenticator
+from .cancel import Cancelled, CancelToken
+from .config import parse_jump_host
+from .health import HostHealth, HostUnavailable
+from .metrics import LatencyRecorder
+
+DEFAULT_MAX_SIZE = 16
+DEFAULT_IDLE_TIMEOUT = 300.0
+DEFAULT_KEEPALIVE = 30
+DEFAULT_CONNECT_TIMEOUT = 10.0
+
+PoolKey = Tuple[str, int, str]
+
+DEFAULT_PORT = 22
+CANCEL_POLL_INTERVAL = 0.2  # 연결 중 취소 여부를 확인하는 간격 (초)
+_CONNECT_PENDING = {errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY}
+
+
+class _PooledConnection:
+    def __init__(self, transport: paramiko.Transport, jump_key: Optional["PoolKey"] = None):
+        self.transport = transport
+        self.jump_key = jump_key  # 점프 호스트를 거친 연결이면 그 점프 호스트 연결의 키
+        self.last_used = time.monotonic()
+
+    def is_alive(self) -> bool:
+        return self.transport.is_active()
+
+    def close(self):
+        try:
+            self.transport.close()
+        except Exception:
+            pass
+
+
+class SSHConnectionPool:
+    """인증이 끝난 Transport 를 재사용하여 매 요청마다 채널 하나만 여는 풀
+
+    - keepalive 로 세션을 유지하고
+    - idle_timeout 동안 쓰이지 않은 세션은 정리하며
+    - max_size 를 넘으면 가장 오래 쓰지 않은 세션부터 닫는다 (LRU)
+    - 끊어진 세션은 다음 요청 때 자동으로 다시 연결한다
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE,
+                 idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+                 keepalive: int = DEFAULT_KEEPALIVE,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                 metrics: Optional[LatencyRecorder] = None,
+                 authenticator: Optional[Authenticator] = None,
+                 health: Optional[HostHealth] = None):
+        self.max_size = max(1, int(max_size))
+        self.idle_timeout = float(idle_timeout)
+        self.keepalive = int(keepalive)
+        self.connect_timeout = float(connect_timeout)
+        self._connections: "OrderedDict[PoolKey, _PooledConnection]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: Dict[PoolKey, threading.Lock] = {}
+        self._janitor: Optional[threading.Thread] = None
+        self._closed = threading.Event()
+        self.metrics = metrics or LatencyRecorder()
+        self.authenticator = authenticator or Authenticator(metrics=self.metrics)
+        # 서버별 연결 상태: 연속으로 연결에 실패한 서버는 잠시 시도하지 않는다
+        self.health = health or HostHealth()
+
+    @classmethod
+    def from_config(cls, config: Dict, metrics: Optional[LatencyRecorder] = None) -> "SSHConnectionPool":
+        """servers.json 의 "pool" 항목으로 풀 생성"""
+        options = config.get("pool", {})
+        return cls(
+            max_size=options.get("max_size", DEFAULT_MAX_SIZE),
+            idle_timeout=options.get("idle_timeout", DEFAULT_IDLE_TIMEOUT),
+            keepalive=options.get("keepalive", DEFAULT_KEEPALIVE),
+            connect_timeout=options.get("connect_timeout", DEFAULT_CONNECT_TIMEOUT),
+            metrics=metrics,
+            authenticator=Authenticator.from_config(config, metrics),
+            health=HostHealth.from_config(config),
+        )
+
+    @staticmethod
+    def _connect_socket(sock: socket.socket, address, timeout: float, cancel: CancelToken):
+        """cancel 을 확인하며 TCP 연결 (취소되면 Cancelled, 제한 시간이 지나면 socket.timeout)"""
+        sock.setblocking(False)
+        error = sock.connect_ex(address)
+        deadline = time.monotonic() + timeout
+        while error in _CONNECT_PENDING:
+            cancel.check()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise socket.timeout("timed out")
+            _, writable, failed = select.select([], [sock], [sock], min(CANCEL_POLL_INTERVAL, remaining))
+            if writable or failed:
+                error = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+        if error:
+            raise OSError(error, os.strerror(error))
+        sock.settimeout(timeout)
+
+    def _open_socket(self, ip: str, port: int, timeout: float, label: str,
+                     cancel: Optional[CancelToken] = None) -> socket.socket:
+        """이름 풀이와 TCP 연결을 따로 측정하며 소켓 생성"""
+        with self.metrics.time(label, "dns"):
+            addresses = socket.getaddrinfo(ip, port, 0, socket.SOCK_STREAM)
+        error: Optional[OSError] = None
+        with self.metrics.time(label, "tcp_connect"):
+            for family, kind, proto, _, address in addresses:
+                sock = socket.socket(family, kind, proto)
+                try:
+                    if cancel is None:
+                        sock.settimeout(timeout)
+                        sock.connect(address)
+                    else:
+                        self._connect_socket(sock, address, timeout, cancel)
+                except Cancelled:
+                    sock.close()
+                    raise
+                except OSError as e:
+                    sock.close()
+                    error = e
+                    continue
+                # 짧은 요청/응답이 반복되므로 Nagle 알고리즘에 의한 지연(delayed ACK 대기)을 끈다
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                return sock
+        raise error or OSError(f"{ip}:{port} 에 연결할 수 없습니다")
+
+    def _connect(self, ip: str, port: int, username: str, password: str, timeout: float,
+                 label: Optional[str] = None, sock=None, cancel: Optional[CancelToken] = None) -> paramiko.Transport:
+        """TCP 연결과 핸드셰이크는 한 번만 하고, 그 위에서 인증 방법을 차례로 시도
+
+        sock 을 주면 (점프 호스트의 direct-tcpip 채널 등) TCP 연결 대신 사용한다.
+        cancel 이 취소되면 연결 중이든 핸드셰이크/인증 중이든 Transport 를 닫고 Cancelled 를 던진다.
+        """
+        label = label or ip
+        if sock is None:
+            sock = self._open_socket(ip, port, timeout, label, cancel)
+        transport = paramiko.Transport(sock)
+        transport.banner_timeout = timeout
+        transport.auth_timeout = timeout
+        unregister = cancel.on_cancel(transport.close) if cancel is not None else None
+        try:
+            with self.metrics.time(label, "handshake"):
+                transport.start_client(timeout=timeout)
+            # 기존 AutoAddPolicy 와 같이 호스트 키는 검사하지 않는다
+            self.authenticator.authenticate(transport, ip, port, username, password, label)
+            if cancel is not None:
+                cancel.check()
+        except BaseException:
+            transport.close()
+            if cancel is not None:
+                cancel.check()  # 취소로 Transport 가 닫혀 난 오류
+            raise
+        finally:
+            if unregister is not None:
+                unregister()
+        transport.set_keepalive(self.keepalive)
+        return transport
+
+    def _key_lock(self, key: PoolKey) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    @staticmethod
+    def server_options(server: Dict) -> Dict:
+        """servers.json 의 서버 항목에서 run/get_transport 에 넘길 연결 옵션"""
+        return {"port": server.get("port", DEFAULT_PORT), "label": server["name"], "jump": server.get("jump_host")}
+
+    def _open_jump_channel(self, jump: str, ip: str, port: int, username: str, password: str,
+                           timeout: float, label: str,
+                           cancel: Optional[CancelToken] = None) -> Tuple[paramiko.Channel, PoolKey]:
+        """점프 호스트 연결(풀에서 공유)을 통해 대상 서버로 가는 direct-tcpip 채널 생성"""
+        jump_user, jump_ip, jump_port = parse_jump_host(jump)
+        jump_user = jump_user or username
+        bastion = self.get_transport(jump_ip, jump_user, password, timeout, jump_port, label=jump, cancel=cancel)
+        with self.metrics.time(label, "jump_channel"):
+            channel = bastion.open_channel("direct-tcpip", (ip, port), ("127.0.0.1", 0), timeout=timeout)
+        return channel, (jump_ip, jump_port, jump_user)
+
+    def get_transport(self, ip: str, username: str, password: str,
+                      timeout: Optional[float] = None, port: int = DEFAULT_PORT,
+                      label: Optional[str] = None, jump: Optional[str] = None,
+                      cancel: Optional[CancelToken] = None) -> paramiko.Transport:
+        """살아있는 Transport 를 돌려주고, 없거나 끊어졌으면 새로 연결
+
+        jump ("[user@]host[:port]") 를 주면 점프 호스트와의 연결 하나를 모든 서버가 공유하고
+        그 위에 direct-tcpip 채널을 열어 대상 서버에 접속한다.
+        cancel 이 취소되면 새 연결(TCP 연결, 핸드셰이크, 인증)을 중단하고 Cancelled 를 던진다.
+        """
+        key = (ip, port, username)
+        timeout = timeout or self.connect_timeout
+        label = label or ip
+        self.evict_idle()
+        # 같은 서버에 대한 동시 요청이 핸드셰이크를 중복으로 하지 않도록 서버별로 잠근다
+        with self._key_lock(key):
+            with self._lock:
+                conn = self._connections.get(key)
+                if conn is not None and conn.is_alive():
+                    conn.last_used = time.monotonic()
+                    self._connections.move_to_end(key)
+                    return conn.transport
+                self._connections.pop(key, None)
+            if conn is not None:
+                conn.close()
+
+            # 차단된 서버는 연결을 시도하지 않는다 (점프 호스트 경유 서버는 TCP 확인 없이 한 번 시도)
+            self.health.before_connect(label, ip, port, tcp_check=not jump)
+            try:
+                sock, jump_key = None, None
+                if jump:
+                    sock, jump_key = self._open_jump_channel(jump, ip, port, username, password,
+                                                             timeout, label, cancel)
+                conn = _PooledConnection(self._connect(ip, port, username, password, timeout, label, sock,
+                                                       cancel), jump_key)
+            except paramiko.AuthenticationException:
+                self.health.record_success(label)  # 서버는 응답했으므로 연결 실패로 세지 않는다
+                raise
+            except HostUnavailable:
+                self.health.release(label)  # 점프 호스트가 차단된 경우 (점프 호스트 쪽에 기록됨)
+                raise
+            except (paramiko.SSHException, EOFError, OSError) as e:
+                self.health.record_failure(label, e)
+                raise
+            except BaseException:
+                self.health.release(label)
+                raise
+            self.health.record_success(label)
+            with self._lock:
+                self._connections[key] = conn
+                self._connections.move_to_end(key)
+                overflow = []
+                if len(self._connections) > self.max_size:
+                    # 다른 연결이 거쳐 가는 점프 호스트 연결은 닫지 않는다
+                    in_use = self._jump_keys_in_use()
+                    for old_key in [k for k in self._connections if k not in in_use and k != key]:
+                        if len(self._connections) <= self.max_size:
+                            break
+                        overflow.append(self._connections.pop(old_key))
+            for old in overflow:
+                old.close()
+            self._start_janitor()
+            return conn.transport
+
+    def run(self, ip: str, username: str, password: str, command: str,
+            timeout: Optional[float] = None, port: int = DEFAULT_PORT, label: Optional[str] = None,
+            on_line: Optional[Callable[[str], None]] = None, jump: Optional[str] = None,
+            input: Optional[bytes] = None, cancel: Optional[CancelToken] = None) -> str:
+        """명령을 실행하고 stdout 을 문자열로 반환
+
+        on_line 을 주면 출력이 도착하는 대로 한 줄씩 전달한다.
+        input 을 주면 명령의 stdin 으로 보낸 뒤 닫는다 (파일 업로드 등).
+        label 은 지연 시간 기록에 쓰는 서버 이름 (기본: ip).
+        cancel 이 취소되면 채널을 닫고 Cancelled 를 던진다 (세션은 풀에 그대로 남는다).
+        timeout 은 연결/핸드셰이크/인증에 그대로 쓰고, 명령 실행에는 서버별로 관측한 소요 시간에
+        맞춘 값을 쓴다 (health.timeout_for, 제한 시간 조정은 여기서 한 번만 한다).
+        """
+        label = label or ip
+        self.health.check(label)
+        timeout = timeout or self.connect_timeout
+        exec_timeout = self.health.timeout_for(label, timeout)
+        start = time.monotonic()
+        for attempt in range(2):
+            if cancel is not None:
+                cancel.check()
+            transport = self.get_transport(ip, username, password, timeout, port, label, jump, cancel)
+            try:
+                with self.metrics.time(label, "channel_open"):
+                    channel = transport.open_session(timeout=timeout)
+            except (paramiko.SSHException, EOFError, OSError):
+                # 풀에 남아 있던 세션이 서버 쪽에서 끊긴 경우 한 번 다시 연결
+                self.discard(ip, username, port)
+                if attempt:
+                    raise
+                continue
+            unregister = cancel.on_cancel(channel.close) if cancel is not None else None
+            try:
+                with channel, self.metrics.time(label, "exec"):
+                    output = self._exec(channel, command, exec_timeout, on_line, input)
+            except (paramiko.SSHException, EOFError, OSError) as e:
+                if cancel is not None:
+                    cancel.check()  # 취소로 채널이 닫혀 난 오류
+                self.health.record_failure(label, e)
+                raise
+            finally:
+                if unregister is not None:
+                    unregister()
+            if cancel is not None:
+                cancel.check()  # 닫힌 채널에서 읽은 출력은 잘려 있을 수 있다
+            self.health.record_success(label, time.monotonic() - start)
+            return output
+
+    @staticmethod
+    def _exec(channel: paramiko.Channel, command: str, timeout: float,
+              on_line: Optional[Callable[[str], None]], input: Optional[bytes]) -> str:
+        channel.settimeout(timeout)
+        channel.exec_command(command)
+        if input is not None:
+            channel.sendall(input)
+            channel.shutdown_write()
+        if on_line is None:
+            return channel.makefile('rb').read().decode(errors='replace')
+        lines = []
+        for raw in channel.makefile('rb'):
+            line = raw.decode(errors='replace')
+            on_line(line)
+            lines.append(line)
+        return ''.join(lines)
+
+    def has_transport(self, ip: str, username: str, port: int = DEFAULT_PORT) -> bool:
+        """연결 없이 바로 채널을 열 수 있는 살아있는 세션이 풀에 있는지"""
+        with self._lock:
+            conn = self._connections.get((ip, port, username))
+            return conn is not None and conn.is_alive()
+
+    def touch(self, ip: str, username: str, port: int = DEFAULT_PORT):
+        """오래 열려 있는 채널이 쓰는 세션이 idle 로 정리되지 않도록 사용 시각 갱신"""
+        with self._lock:
+            conn = self._connections.get((ip, port, username))
+            if conn is not None:
+                conn.last_used = time.monotonic()
+
+    def discard(self, ip: str, username: str, port: int = DEFAULT_PORT):
+        """해당 서버의 세션을 풀에서 제거"""
+        with self._lock:
+            conn = self._connections.pop((ip, port, username), None)
+        if conn is not None:
+            conn.close()
+
+    def evict_idle(self):
+        """idle_timeout 이 지났거나 끊어진 세션 정리"""
+        now = time.monotonic()
+        with self._lock:
+            in_use = self._jump_keys_in_use()
+            expired = [key for key, conn in self._connections.items()
+                       if not conn.is_alive() or (now - conn.last_used > self.idle_timeout and key not in in_use)]
+            stale = [self._connections.pop(key) for key in expired]
+        for conn in stale:
+            conn.close()
+
+    def _jump_keys_in_use(self) -> set:
+        """살아있는 연결이 거쳐 가고 있는 점프 호스트 연결의 키 (self._lock 안에서 호출)"""
+        return {conn.jump_key for conn in self._connections.values()
+                if conn.jump_key is not None and conn.is_alive()}
+
+    def _start_janitor(self):
+        if self._janitor is not None and self._janitor.is_alive():
+            return
+        self._janitor = threading.Thread(target=self._janitor_loop, name="ssh-pool-janitor", daemon=True)
+        self._janitor.start()
+
+    def _janitor_loop(self):
+        interval = max(1.0, self.idle_timeout / 2)
+        while not self._closed.wait(interval):
+            self.evict_idle()
+            with self._lock:
+                if not self._connections:
+                    break
+
+    def close_all(self):
+        self._closed.set()
+        with self._lock:
+            conns = list(self._connections.values())
+            self._connections.clear()
+        for conn in conns:
+            conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._connections)
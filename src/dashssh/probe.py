@@ -0,0 +1,192 @@
+"""여러 서버를 병렬로 조회하는 엔진"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from .cancel import CancelToken
+from .procinfo import GPU_OUTPUT_VAR, KNOWN_PIDS_VAR, PS_COMMAND
+
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_HOST_TIMEOUT = 10.0
+DEFAULT_SWEEP_TIMEOUT = 30.0
+
+SECTION_PREFIX = "@@DASHSSH:"
+SECTION_SUFFIX = "@@"
+
+# 한 번의 exec 로 수집할 항목 (섹션 이름, 원격 명령)
+PROBE_SECTIONS = (
+    ("users", "w -h 2>/dev/null"),
+    ("gpu", None),  # 수집 방식에 따라 build_probe_script 에서 지정
+    ("procs", PS_COMMAND),  # gpu 섹션 출력의 PID 중 처음 보는 것만 한 번의 ps 로 조회
+    ("loadavg", "cat /proc/loadavg"),
+    ("memory", "free -m"),
+    ("disk", "df -hP /home 2>/dev/null || df -hP /"),
+)
+
+
+def build_probe_script(gpu_command: str, known: str = "") -> str:
+    """섹션마다 구분자를 출력하고 명령을 실행하는 원격 셸 스크립트 생성
+
+    known: 이미 알고 있는 프로세스 ("pid:시작tick" 공백 구분, ProcessInfoCache.known) -> ps 조회에서 제외
+    """
+    lines = [f"{KNOWN_PIDS_VAR}='{known}'"]
+    for name, command in PROBE_SECTIONS:
+        lines.append(f"echo '{SECTION_PREFIX}{name}{SECTION_SUFFIX}'")
+        if command is None:
+            # procs 섹션이 PID 를 다시 읽을 수 있도록 출력을 셸 변수에 담아 두고 출력
+            lines.append(f"{GPU_OUTPUT_VAR}=$({{ {gpu_command}; }} 2>&1)")
+            lines.append(f"printf '%s\\n' \"${GPU_OUTPUT_VAR}\"")
+        else:
+            lines.append(f"{{ {command}; }} 2>&1")
+    return "; ".join(lines)
+
+
+def parse_probe_output(output: str) -> Dict[str, str]:
+    """build_probe_script 출력을 섹션별 문자열로 분리"""
+    sections: Dict[str, List[str]] = {}
+    current: Optional[List[str]] = None
+    for line in output.splitlines():
+        if line.startswith(SECTION_PREFIX) and line.endswith(SECTION_SUFFIX):
+            current = sections.setdefault(line[len(SECTION_PREFIX):-len(SECTION_SUFFIX)], [])
+        elif current is not None:
+            current.append(line)
+    return {name: "\n".join(body) for name, body in sections.items()}
+
+
+class SectionClock:
+    """probe 출력에서 섹션 구분자가 도착한 시각을 기록하여 원격 섹션별 실행 시간을 추정
+
+    원격 셸은 섹션을 순서대로 실행하므로 다음 구분자가 도착할 때까지의 시간이
+    해당 섹션 명령(예: nvidia-smi)의 실행 시간이 된다. 원격에서 별도 명령을 실행하지 않는다.
+    """
+
+    def __init__(self):
+        self.marks: List[Tuple[str, float]] = []
+
+    def feed(self, line: str):
+        line = line.rstrip("\r\n")
+        if line.startswith(SECTION_PREFIX) and line.endswith(SECTION_SUFFIX):
+            self.marks.append((line[len(SECTION_PREFIX):-len(SECTION_SUFFIX)], time.perf_counter()))
+
+    def durations(self, end: Optional[float] = None) -> Dict[str, float]:
+        """섹션별 소요 시간 (마지막 섹션은 end, 기본은 현재 시각까지)"""
+        end = time.perf_counter() if end is None else end
+        stops = [t for _, t in self.marks[1:]] + [end]
+        return {name: stop - start for (name, start), stop in zip(self.marks, stops)}
+
+
+@dataclass
+class ProbeResult:
+    """서버 한 대의 조회 결과"""
+    server: Dict
+    output: Any = ""  # probe 함수의 반환값
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class ProbeEngine:
+    """blocking SSH 조회 함수를 스레드 풀에서 병렬 실행하고 끝나는 순서대로 결과를 전달"""
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 host_timeout: float = DEFAULT_HOST_TIMEOUT,
+                 sweep_timeout: float = DEFAULT_SWEEP_TIMEOUT):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.host_timeout = float(host_timeout)
+        self.sweep_timeout = float(sweep_timeout)
+        # 시간 초과로 포기한 스레드가 잠시 남아 있어도 다음 서버가 밀리지 않도록 여유를 둔다
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency * 2,
+                                            thread_name_prefix="probe")
+
+    @classmethod
+    def from_config(cls, config: Dict) -> "ProbeEngine":
+        """servers.json 의 "probe" 항목으로 엔진 생성"""
+        options = config.get("probe", {})
+        return cls(
+            max_concurrency=options.get("max_concurrency", DEFAULT_MAX_CONCURRENCY),
+            host_timeout=options.get("host_timeout", DEFAULT_HOST_TIMEOUT),
+            sweep_timeout=options.get("sweep_timeout", DEFAULT_SWEEP_TIMEOUT),
+        )
+
+    async def _run_one(self, semaphore: asyncio.Semaphore, server: Dict,
+                       probe: Callable[[Dict, float, CancelToken], Any], timeout: float) -> ProbeResult:
+        loop = asyncio.get_running_loop()
+        cancel = CancelToken()
+        started = loop.create_future()
+
+        def mark_started():
+            if not started.done():
+                started.set_result(None)
+
+        def job():
+            # 서버별 제한 시간은 작업 스레드가 실제로 시작한 뒤부터 잰다 (대기열에 있던 시간 제외)
+            loop.call_soon_threadsafe(mark_started)
+            cancel.check()
+            return probe(server, self.host_timeout, cancel)
+
+        async with semaphore:
+            future = loop.run_in_executor(self._executor, job)
+            start = time.perf_counter()
+            try:
+                await asyncio.wait({started, future}, return_when=asyncio.FIRST_COMPLETED)
+                start = time.perf_counter()
+                output = await asyncio.wait_for(future, timeout)
+                return ProbeResult(server, output=output, elapsed=time.perf_counter() - start)
+            except asyncio.TimeoutError:
+                error = f"응답 시간 초과 ({timeout:.3g}초)"
+            except asyncio.CancelledError:
+                cancel.cancel()  # 전체 조회 시간 초과: 남은 조회도 채널을 닫아 스레드를 돌려받는다
+                raise
+            except Exception as e:
+                error = str(e) or type(e).__name__
+            finally:
+                started.cancel()
+            # 포기한 조회는 채널/연결을 닫아 작업 스레드가 다음 서버를 위해 바로 풀려나게 한다
+            cancel.cancel()
+            return ProbeResult(server, error=error, elapsed=time.perf_counter() - start)
+
+    async def sweep(self, servers: List[Dict], probe: Callable[[Dict, float, CancelToken], Any],
+                    wait_for: Optional[Callable[[Dict, float], float]] = None) -> AsyncIterator[ProbeResult]:
+        """모든 서버를 조회하며 완료된 순서대로 결과를 yield
+
+        probe(server, host_timeout, cancel) 는 blocking 함수로, 주어진 timeout 안에서
+        연결과 명령 실행을 끝내야 한다. 기다리다 포기한 서버는 cancel 을 취소하므로
+        probe 는 그때 연결과 채널을 닫고 빠져나와야 한다. 전체 제한 시간이 지나면 남은 서버는
+        실패 결과로 돌려준다. wait_for(server, host_timeout) 를 주면 서버별로 그만큼 기다린다
+        (probe 에 넘기는 값은 그대로 host_timeout).
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        deadline = loop.time() + self.sweep_timeout
+        pending = {
+            asyncio.ensure_future(self._run_one(
+                semaphore, server, probe,
+                wait_for(server, self.host_timeout) if wait_for else self.host_timeout)): server
+            for server in servers
+        }
+        try:
+            while pending:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                done, _ = await asyncio.wait(pending, timeout=remaining,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    pending.pop(task)
+                    yield task.result()
+            for task, server in list(pending.items()):
+                task.cancel()
+                pending.pop(task)
+                yield ProbeResult(server, error=f"전체 조회 시간 초과 ({self.sweep_timeout:g}초)",
+                                  elapsed=self.sweep_timeout)
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,155 @@
+"""GPU 프로세스의 소유자/실행 시간/명령줄 보강
+
+probe 의 GPU 섹션 출력 (CSV 쿼리 또는 nvidia-smi 표) 에서 원격 셸이 직접 PID 를 뽑아
+/proc/<pid>/stat 의 시작 시각 (부팅 후 clock tick) 을 출력하고, 이전 조회에서 이미 알고 있는
+(PID, 시작 시각) 이 아닌 프로세스만 한 번의 ps 로 조회한다 (같은 exec 안에서 실행되므로 왕복이 늘지 않는다).
+계속 실행 중인 프로세스는 원격에서도 ps 를 거치지 않고, 로컬에서도 다시 해석하지 않는다.
+"""
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .nvsmi import APPS_SENTINEL, ProcessRecord
+
+# probe 에서 GPU 섹션 출력을 담아 두는 셸 변수
+GPU_OUTPUT_VAR = "DASHSSH_GPU"
+# 이미 알고 있는 프로세스 목록 ("pid:시작tick" 을 공백으로 구분) 을 넘기는 셸 변수
+KNOWN_PIDS_VAR = "DASHSSH_KNOWN"
+# procs 섹션에서 시작 시각 줄의 머리말 ("@ pid 시작tick")
+START_MARKER = "@"
+
+# CSV 쿼리: 구분자 뒤 줄의 첫 필드 / nvidia-smi 표: 프로세스 종류(C, G, C+G) 바로 앞의 숫자
+_PID_AWK = (
+    f"/{APPS_SENTINEL}/{{q=1;next}} "
+    "q{split($0,a,\", \"); if(a[1] ~ /^[0-9]+$/) print a[1]; next} "
+    "{for(i=2;i<NF;i++) if($(i+1) ~ /^(C|G|C\\+G|M|M\\+C)$/ && $i ~ /^[0-9]+$/) print $i}"
+)
+
+# /proc/<pid>/stat 의 22 번째 필드 (comm 에 공백이 있을 수 있으므로 ") " 뒤에서 20 번째) 가 시작 시각.
+# 읽을 수 없거나 알고 있는 목록에 없는 PID 만 모아 마지막에 ps 한 번으로 조회한다.
+# user 는 기본 폭이 8 자라 긴 이름이 "+" 로 잘리므로 폭을 넓힌다.
+# lstart 는 로케일에 따라 형식이 달라지므로 C 로케일 고정 (요일 월 일 시각 연도, 5 단어)
+_STAT_AWK = (
+    f"{{f=\"/proc/\"$1\"/stat\"; t=\"\"; if((getline s < f) > 0){{sub(/^.*\\) /,\"\",s); split(s,a,\" \"); "
+    f"t=a[20]; print \"{START_MARKER}\", $1, t}} close(f)}} "
+    "t==\"\" || !index(K,\" \"$1\":\"t\" \"){u=u (u==\"\"?\"\":\",\") $1} "
+    "END{if(u!=\"\"){fflush(); "
+    "system(\"LC_ALL=C ps -ww -o pid=,user:32=,etimes=,lstart=,args= -p \" u)}}"
+)
+PS_COMMAND = (
+    f"printf '%s\\n' \"${GPU_OUTPUT_VAR}\" | awk '{_PID_AWK}' | sort -un | "
+    f"awk -v K=\" ${KNOWN_PIDS_VAR} \" '{_STAT_AWK}'"
+)
+
+# ps 한 줄: (pid, user, 경과 초, 시작 시각 문자열, 명령줄)
+PsRow = Tuple[int, str, int, str, str]
+
+
+def parse_ps_output(output: str) -> List[PsRow]:
+    rows = []
+    for line in output.splitlines():
+        parts = line.split(None, 8)
+        if len(parts) < 8:
+            continue
+        try:
+            pid, etimes = int(parts[0]), int(parts[2])
+        except ValueError:
+            continue  # ps 오류 메시지 등
+        rows.append((pid, parts[1], etimes, " ".join(parts[3:8]), parts[8] if len(parts) > 8 else ""))
+    return rows
+
+
+def parse_start_times(output: str) -> Dict[int, str]:
+    """procs 섹션의 "@ pid 시작tick" 줄 -> {pid: 시작tick}"""
+    starts = {}
+    for line in output.splitlines():
+        parts = line.split()
+        if len(parts) == 3 and parts[0] == START_MARKER and parts[1].isdigit() and parts[2].isdigit():
+            starts[int(parts[1])] = parts[2]
+    return starts
+
+
+class ProcessInfo:
+    """프로세스가 살아 있는 동안 바뀌지 않는 정보"""
+    __slots__ = ("pid", "user", "started_at", "command")
+
+    def __init__(self, pid: int, user: str, started_at: float, command: str):
+        self.pid = pid
+        self.user = user
+        self.started_at = started_at
+        self.command = command
+
+
+class ProcessInfoCache:
+    """(서버, PID, 시작 시각) -> ProcessInfo. 서버마다 마지막 조회에 없던 프로세스는 정리
+
+    시작 시각은 /proc/<pid>/stat 의 tick 이며, 이를 읽지 못한 프로세스 (다른 PID 네임스페이스 등) 는
+    ps 의 lstart 로 구분한다. 후자는 known 에 실리지 않으므로 매번 ps 로 조회된다.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Dict[Tuple[int, str], ProcessInfo]] = {}
+        self._lock = threading.Lock()
+
+    def known(self, host: str) -> str:
+        """probe 스크립트에 넘길 이미 알고 있는 프로세스 목록 ("pid:시작tick ...")"""
+        with self._lock:
+            keys = list(self._entries.get(host, {}))
+        return " ".join(f"{pid}:{start}" for pid, start in keys if start.isdigit())
+
+    def resolve(self, host: str, rows: Iterable[PsRow], starts: Optional[Dict[int, str]] = None,
+                now: Optional[float] = None) -> Dict[int, ProcessInfo]:
+        """ps 결과와 시작 시각으로 PID -> ProcessInfo 색인 생성
+
+        ps 에 없는 PID 는 (PID, 시작 시각) 이 이전 조회와 같을 때만 기존 정보를 다시 쓴다.
+        PID 가 재사용되어도 시작 시각이 다르면 다른 프로세스로 본다.
+        """
+        now = time.time() if now is None else now
+        starts = starts or {}
+        with self._lock:
+            known = self._entries.get(host, {})
+            current: Dict[Tuple[int, str], ProcessInfo] = {}
+            for pid, start in starts.items():
+                info = known.get((pid, start))
+                if info is not None:
+                    current[(pid, start)] = info
+            for pid, user, etimes, lstart, command in rows:
+                key = (pid, starts.get(pid, lstart))
+                info = known.get(key)
+                if info is None:
+                    info = ProcessInfo(pid, user, now - etimes, command)
+                current[key] = info
+            self._entries[host] = current
+        return {info.pid: info for info in current.values()}
+
+
+def enrich_processes(processes: Iterable[ProcessRecord], infos: Dict[int, ProcessInfo]):
+    """PID 색인으로 ProcessRecord 에 소유자/시작 시각/명령줄을 채운다"""
+    for proc in processes:
+        info = infos.get(proc.pid)
+        if info is not None:
+            proc.user = info.user
+            proc.started_at = info.started_at
+            proc.command = info.command
+
+
+def short_command(command: str, name: str = "") -> str:
+    """명령줄의 실행 파일은 이름만 남김 (/opt/conda/bin/python train.py -> python train.py)"""
+    if not command:
+        return name
+    head, _, rest = command.partition(" ")
+    head = head.rsplit("/", 1)[-1] or head
+    return f"{head} {rest}" if rest else head
+
+
+def format_elapsed(seconds: float) -> str:
+    """ps 의 etime 과 비슷한 짧은 형식 (3d04h, 5h12m, 12:34)"""
+    seconds = max(0, int(seconds))
+    days, rest = divmod(seconds, 86400)
+    hours, rest = divmod(rest, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if days:
+        return f"{days}d{hours:02d}h"
+    if hours:
+        return f"{hours}h{minutes:02d}m"
+    return f"{minutes}:{seconds:02d}"
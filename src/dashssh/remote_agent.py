@@ -0,0 +1,494 @@
+"""GPU 서버에 설치되어 상주하는 수집 에이전트 (표준 라이브러리만 사용, Python 3.6+)
+
+이 파일은 클라이언트가 SSH 로 서버의 ~/.cache/dashssh/agent-<hash>.py 에 그대로 복사한다.
+
+    python3 agent.py serve <interval> <capacity>   # 상주 프로세스: NVML 을 열어 두고 주기적으로 샘플링
+    python3 agent.py attach <interval> <capacity>  # SSH 채널용: 상주 프로세스가 없으면 띄우고 stdin/stdout 중계
+
+요청 (한 줄 JSON): {"since": <seq>, "users": true}
+응답 (한 줄 JSON): seq 이후의 샘플만 담은 변경분과 현재 시스템 섹션
+"""
+import collections
+import ctypes
+import fcntl
+import json
+import os
+import pwd
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+NAME = os.path.splitext(os.path.basename(os.path.abspath(__file__)))[0]
+PRIVATE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "dashssh")
+# 소켓은 사용자만 들어갈 수 있는 폴더 (0700) 에 둔다: 서버의 로컬 런타임 폴더가 있으면 그곳,
+# 없으면 ~/.cache/dashssh (홈이 여러 서버에 공유될 수 있으므로 파일 이름에 호스트 이름을 붙인다)
+RUN_DIR = (os.path.join(os.environ["XDG_RUNTIME_DIR"], "dashssh")
+           if os.path.isdir(os.environ.get("XDG_RUNTIME_DIR", "")) else PRIVATE_DIR)
+RUN_NAME = "{}.{}".format(NAME, socket.gethostname())
+IDLE_EXIT = 900  # 이 시간(초) 동안 요청이 없으면 상주 프로세스 종료
+USERS_TTL = 5.0
+
+GPU_QUERY = ["nvidia-smi", "--query-gpu=index,uuid,memory.used,memory.total,utilization.gpu,temperature.gpu,name",
+             "--format=csv,noheader,nounits"]
+APP_QUERY = ["nvidia-smi", "--query-compute-apps=pid,gpu_uuid,used_memory,process_name",
+             "--format=csv,noheader,nounits"]
+
+NVML_TEMPERATURE_GPU = 0
+NVML_ERROR_INSUFFICIENT_SIZE = 7
+NVML_VALUE_NOT_AVAILABLE = 0xFFFFFFFFFFFFFFFF
+MIB = 1024 * 1024
+
+
+def _int(value):
+    try:
+        return int(value)
+    except ValueError:
+        return -1
+
+
+class _Memory(ctypes.Structure):
+    _fields_ = [("total", ctypes.c_ulonglong), ("free", ctypes.c_ulonglong), ("used", ctypes.c_ulonglong)]
+
+
+class _Utilization(ctypes.Structure):
+    _fields_ = [("gpu", ctypes.c_uint), ("memory", ctypes.c_uint)]
+
+
+class _ProcessV1(ctypes.Structure):
+    _fields_ = [("pid", ctypes.c_uint), ("usedGpuMemory", ctypes.c_ulonglong)]
+
+
+class _ProcessV2(ctypes.Structure):
+    _fields_ = [("pid", ctypes.c_uint), ("usedGpuMemory", ctypes.c_ulonglong),
+                ("gpuInstanceId", ctypes.c_uint), ("computeInstanceId", ctypes.c_uint)]
+
+
+def _process_name(pid):
+    try:
+        return os.readlink("/proc/%d/exe" % pid)
+    except OSError:
+        pass
+    try:
+        with open("/proc/%d/comm" % pid) as f:
+            return f.read().strip()
+    except OSError:
+        return "[unknown]"
+
+
+def _boot_time():
+    try:
+        with open("/proc/stat") as f:
+            for line in f:
+                if line.startswith("btime "):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+BOOT_TIME = _boot_time()
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def _start_ticks(pid):
+    """부팅 후 프로세스 시작 시각 (tick). PID 가 재사용되었는지 구분하는 데 사용"""
+    try:
+        with open("/proc/%d/stat" % pid) as f:
+            stat = f.read()
+        return int(stat[stat.rindex(")") + 2:].split()[19])
+    except (OSError, ValueError, IndexError):
+        return -1
+
+
+def _process_details(pid, ticks):
+    """[소유자, 시작 시각 (epoch), 명령줄]"""
+    try:
+        user = pwd.getpwuid(os.stat("/proc/%d" % pid).st_uid).pw_name
+    except (OSError, KeyError):
+        user = ""
+    try:
+        with open("/proc/%d/cmdline" % pid, "rb") as f:
+            command = f.read().rstrip(b"\0").replace(b"\0", b" ").decode("utf-8", "replace")
+    except OSError:
+        command = ""
+    started_at = BOOT_TIME + ticks / float(CLOCK_TICKS) if ticks >= 0 and BOOT_TIME else 0.0
+    return [user, started_at, command]
+
+
+class NvmlSampler:
+    """libnvidia-ml 을 한 번 초기화해 두고 재사용"""
+
+    def __init__(self):
+        self.lib = ctypes.CDLL("libnvidia-ml.so.1")
+        self._check(self.lib.nvmlInit_v2())
+        count = ctypes.c_uint()
+        self._check(self.lib.nvmlDeviceGetCount_v2(ctypes.byref(count)))
+        self.handles = []
+        self.static = []
+        for index in range(count.value):
+            handle = ctypes.c_void_p()
+            self._check(self.lib.nvmlDeviceGetHandleByIndex_v2(index, ctypes.byref(handle)))
+            name = ctypes.create_string_buffer(96)
+            uuid = ctypes.create_string_buffer(96)
+            memory = _Memory()
+            self._check(self.lib.nvmlDeviceGetName(handle, name, 96))
+            self._check(self.lib.nvmlDeviceGetUUID(handle, uuid, 96))
+            self._check(self.lib.nvmlDeviceGetMemoryInfo(handle, ctypes.byref(memory)))
+            self.handles.append(handle)
+            self.static.append([index, uuid.value.decode(), memory.total // MIB, name.value.decode()])
+        self._process_fn, self._process_struct = self._find_process_fn()
+
+    @staticmethod
+    def _check(code):
+        if code != 0:
+            raise OSError("NVML error %d" % code)
+
+    def _find_process_fn(self):
+        for name, struct in (("nvmlDeviceGetComputeRunningProcesses_v3", _ProcessV2),
+                             ("nvmlDeviceGetComputeRunningProcesses_v2", _ProcessV2),
+                             ("nvmlDeviceGetComputeRunningProcesses", _ProcessV1)):
+            try:
+                return getattr(self.lib, name), struct
+            except AttributeError:
+                continue
+        return None, None
+
+    def sample(self):
+        rows = []
+        for index, handle in enumerate(self.handles):
+            memory = _Memory()
+            util = _Utilization()
+            temp = ctypes.c_uint()
+            used = memory.used // MIB if self.lib.nvmlDeviceGetMemoryInfo(handle, ctypes.byref(memory)) == 0 else -1
+            gpu_util = util.gpu if self.lib.nvmlDeviceGetUtilizationRates(handle, ctypes.byref(util)) == 0 else -1
+            temperature = temp.value if self.lib.nvmlDeviceGetTemperature(
+                handle, NVML_TEMPERATURE_GPU, ctypes.byref(temp)) == 0 else -1
+            rows.append([index, used, gpu_util, temperature])
+        return rows
+
+    def processes(self):
+        if self._process_fn is None:
+            return []
+        result = []
+        for (index, uuid, _, _), handle in zip(self.static, self.handles):
+            count = ctypes.c_uint(0)
+            code = self._process_fn(handle, ctypes.byref(count), None)
+            if code not in (0, NVML_ERROR_INSUFFICIENT_SIZE) or count.value == 0:
+                continue
+            count = ctypes.c_uint(count.value + 8)  # 그 사이 늘어난 프로세스 여유분
+            infos = (self._process_struct * count.value)()
+            if self._process_fn(handle, ctypes.byref(count), infos) != 0:
+                continue
+            for info in infos[:count.value]:
+                used = -1 if info.usedGpuMemory == NVML_VALUE_NOT_AVAILABLE else info.usedGpuMemory // MIB
+                result.append([info.pid, uuid, used, _process_name(info.pid)])
+        return sorted(result)
+
+
+class SmiSampler:
+    """NVML 을 쓸 수 없으면 nvidia-smi 를 주기적으로 실행 (클라이언트 수와 무관하게 한 번만)"""
+
+    def __init__(self):
+        self.static = []
+        subprocess.check_output(["nvidia-smi", "-L"], universal_newlines=True, timeout=30)
+
+    def sample(self):
+        output = subprocess.check_output(GPU_QUERY, universal_newlines=True, timeout=30)
+        static, rows = [], []
+        for line in output.strip().splitlines():
+            parts = line.split(", ", 6)
+            if len(parts) != 7:
+                continue
+            index, uuid, used, total, util, temp, name = parts
+            static.append([_int(index), uuid, _int(total), name.strip()])
+            rows.append([_int(index), _int(used), _int(util), _int(temp)])
+        self.static = static
+        return rows
+
+    def processes(self):
+        output = subprocess.check_output(APP_QUERY, universal_newlines=True, timeout=30)
+        result = []
+        for line in output.strip().splitlines():
+            parts = line.split(", ", 3)
+            if len(parts) == 4:
+                result.append([_int(parts[0]), parts[1], _int(parts[2]), parts[3].strip()])
+        return sorted(result)
+
+
+def read_loadavg():
+    with open("/proc/loadavg") as f:
+        return f.read()
+
+
+def read_memory():
+    """/proc/meminfo 를 free -m 형식으로"""
+    info = {}
+    with open("/proc/meminfo") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            info[key] = int(value.split()[0]) // 1024
+    total = info.get("MemTotal", 0)
+    free = info.get("MemFree", 0)
+    cache = info.get("Buffers", 0) + info.get("Cached", 0) + info.get("SReclaimable", 0)
+    available = info.get("MemAvailable", free + cache)
+    used = total - free - cache
+    return ("               total        used        free      shared  buff/cache   available\n"
+            "Mem:     %11d %11d %11d %11d %11d %11d\n"
+            % (total, used, free, info.get("Shmem", 0), cache, available))
+
+
+def _human(size):
+    for unit in ("", "K", "M", "G", "T", "P"):
+        if size < 1024 or unit == "P":
+            return ("%.1f%s" % (size, unit)) if size < 10 and unit else ("%d%s" % (size, unit))
+        size /= 1024.0
+
+
+def read_disk():
+    """/home (없으면 /) 를 df -hP 형식으로"""
+    mount = "/home" if os.path.isdir("/home") else "/"
+    stat = os.statvfs(mount)
+    size = stat.f_blocks * stat.f_frsize
+    avail = stat.f_bavail * stat.f_frsize
+    used = (stat.f_blocks - stat.f_bfree) * stat.f_frsize
+    percent = int(round(used * 100.0 / (used + avail))) if used + avail else 0
+    return ("Filesystem      Size  Used Avail Use%% Mounted on\n"
+            "-               %4s  %4s  %4s %3d%% %s\n" % (_human(size), _human(used), _human(avail), percent, mount))
+
+
+class Agent:
+    """고정 주기 샘플링 + 링 버퍼. 요청에는 since 이후의 샘플만 돌려준다"""
+
+    def __init__(self, interval, capacity):
+        self.interval = interval
+        self.samples = collections.deque(maxlen=capacity)
+        self.seq = 0
+        self.processes = []
+        self.processes_seq = 0
+        self.last_request = time.time()
+        self.lock = threading.Lock()
+        self._users = ("", 0.0)
+        self._details = {}  # pid -> (시작 tick, 상세 정보). 계속 실행 중인 프로세스는 다시 읽지 않는다
+        try:
+            self.sampler = NvmlSampler()
+            self.backend = "nvml"
+        except (OSError, AttributeError):
+            self.sampler = SmiSampler()
+            self.backend = "nvidia-smi"
+
+    def sample_once(self):
+        started = time.time()
+        try:
+            rows = self.sampler.sample()
+            processes = self.with_details(self.sampler.processes())
+        except Exception:
+            return
+        with self.lock:
+            self.seq += 1
+            self.samples.append([self.seq, started, rows])
+            if processes != self.processes:
+                self.processes = processes
+                self.processes_seq = self.seq
+
+    def with_details(self, processes):
+        details = {}
+        for row in processes:
+            pid = row[0]
+            ticks = _start_ticks(pid)
+            cached = self._details.get(pid)
+            if cached is None or cached[0] != ticks:
+                cached = (ticks, _process_details(pid, ticks))
+            details[pid] = cached
+            row.extend(cached[1])
+        self._details = details
+        return processes
+
+    def sample_loop(self):
+        started = time.time()
+        while True:
+            time.sleep(max(0.05, self.interval - (time.time() - started)))
+            started = time.time()
+            self.sample_once()
+
+    def users(self):
+        text, taken = self._users
+        if time.time() - taken > USERS_TTL:
+            try:
+                text = subprocess.check_output(["w", "-h"], universal_newlines=True, timeout=10)
+            except Exception:
+                text = ""
+            self._users = (text, time.time())
+        return text
+
+    def handle(self, request):
+        since = int(request.get("since", 0))
+        self.last_request = time.time()
+        with self.lock:
+            if since > self.seq:
+                since = 0  # 상주 프로세스가 재시작되어 번호가 처음부터 다시 시작됨
+            samples = [sample for sample in self.samples if sample[0] > since]
+            response = {
+                "seq": self.seq,
+                "time": time.time(),  # 클라이언트가 시계 차이를 보정하는 데 사용
+                "backend": self.backend,
+                "interval": self.interval,
+                "gpus": self.sampler.static,
+                "samples": samples,
+            }
+            # 프로세스 목록은 바뀐 경우에만 전송
+            if since == 0 or self.processes_seq > since:
+                response["processes"] = self.processes
+        sections = {"loadavg": read_loadavg(), "memory": read_memory(), "disk": read_disk()}
+        if request.get("users", True):
+            sections["users"] = self.users()
+        response["sections"] = sections
+        return response
+
+
+def _private_dir(path):
+    """사용자만 접근할 수 있는 폴더를 만든다 (다른 사용자의 폴더면 PermissionError)"""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    st = os.lstat(path)
+    if st.st_uid != os.getuid():
+        raise PermissionError("{} 의 소유자가 다릅니다".format(path))
+    if st.st_mode & 0o077:
+        os.chmod(path, 0o700)
+
+
+def _listen():
+    """잠금을 얻고 소켓을 연다. 이미 실행 중이면 None"""
+    _private_dir(RUN_DIR)
+    lock = os.open(os.path.join(RUN_DIR, RUN_NAME + ".lock"), os.O_RDONLY | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(lock)
+        return None
+    path = os.path.join(RUN_DIR, RUN_NAME + ".sock")
+    try:
+        if os.path.exists(path):
+            os.unlink(path)  # 비정상 종료한 이전 프로세스의 소켓
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(path)
+        os.chmod(path, 0o600)
+    except OSError:
+        os.close(lock)
+        raise
+    return server, path, lock
+
+
+def serve(interval, capacity):
+    opened = _listen()
+    if opened is None:
+        return  # 이미 다른 상주 프로세스가 실행 중
+    server, path, _lock = opened
+    agent = Agent(interval, capacity)
+    agent.sample_once()  # 첫 요청부터 GPU 상태를 돌려줄 수 있도록 한 번 샘플링한 뒤 연결을 받는다
+    threading.Thread(target=agent.sample_loop, daemon=True).start()
+    server.listen(16)
+    server.settimeout(30)
+
+    def client(conn):
+        with conn:
+            reader = conn.makefile("r")
+            for line in reader:
+                try:
+                    response = agent.handle(json.loads(line))
+                except Exception as e:
+                    response = {"error": str(e)}
+                conn.sendall((json.dumps(response, separators=(",", ":")) + "\n").encode())
+
+    while time.time() - agent.last_request < IDLE_EXIT:
+        try:
+            conn, _ = server.accept()
+        except socket.timeout:
+            continue
+        threading.Thread(target=client, args=(conn,), daemon=True).start()
+    os.unlink(path)  # 잠금을 놓기 전에 지워야 새 프로세스의 소켓을 지우지 않는다
+    server.close()
+
+
+def _connect():
+    path = os.path.join(RUN_DIR, RUN_NAME + ".sock")
+    if os.lstat(path).st_uid != os.getuid():
+        raise PermissionError("{} 의 소유자가 다릅니다".format(path))
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def _spawn(interval, capacity):
+    """상주 프로세스를 세션에서 분리하여 실행 (오류는 사용자 폴더의 로그 파일에 남긴다)"""
+    _private_dir(PRIVATE_DIR)
+    with open(os.devnull, "r+") as devnull, open(os.path.join(PRIVATE_DIR, RUN_NAME + ".log"), "w") as log:
+        return subprocess.Popen([sys.executable, os.path.abspath(__file__), "serve", str(interval), str(capacity)],
+                                stdin=devnull, stdout=devnull, stderr=log, close_fds=True,
+                                start_new_session=True)
+
+
+def _start_error():
+    try:
+        with open(os.path.join(PRIVATE_DIR, RUN_NAME + ".log")) as f:
+            lines = f.read().strip().splitlines()
+    except OSError:
+        lines = []
+    return lines[-1] if lines else "상주 프로세스를 시작하지 못했습니다"
+
+
+def attach(interval, capacity):
+    """상주 프로세스에 연결 (없으면 띄움) 하고 stdin 의 요청을 그대로 전달"""
+    out = sys.stdout
+    try:
+        sock = _connect()
+    except OSError:
+        process = _spawn(interval, capacity)
+        deadline = time.time() + 10
+        while True:
+            time.sleep(0.1)
+            exited = process.poll() is not None  # 연결 시도 전에 확인해야 경쟁 상태에서도 한 번 더 시도한다
+            try:
+                sock = _connect()
+                break
+            except OSError:
+                if exited or time.time() > deadline:
+                    out.write(json.dumps({"error": _start_error()}) + "\n")
+                    out.flush()
+                    return 1
+    reader = sock.makefile("r")
+    out.write(json.dumps({"ready": True}) + "\n")
+    out.flush()
+    try:
+        for line in sys.stdin:
+            sock.sendall(line.encode())
+            response = reader.readline()
+            if not response:
+                return 1  # 상주 프로세스가 종료됨. 클라이언트가 다시 연결한다
+            out.write(response)
+            out.flush()
+    except OSError:
+        return 1
+    return 0
+
+
+def main(argv):
+    command = argv[1] if len(argv) > 1 else "attach"
+    interval = float(argv[2]) if len(argv) > 2 else 2.0
+    capacity = int(argv[3]) if len(argv) > 3 else 600
+    if command == "serve":
+        serve(interval, capacity)
+    elif command == "attach":
+        return attach(interval, capacity)
+    else:
+        sys.stderr.write("usage: agent.py serve|attach [interval] [capacity]\n")
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,179 @@
+"""VS Code Remote-SSH 가 사용할 ~/.ssh 설정 관리
+
+VS Code 의 --remote ssh-remote+<host> 는 점프 호스트나 포트를 직접 받지 못하므로,
+서버마다 DASH-SSH 가 관리하는 별도 파일(~/.ssh/dashssh_config)에 Host 항목을 만들고
+~/.ssh/config 맨 위에 Include 한 줄을 추가하여 별칭으로 접속한다.
+
+Host 항목에는 점프 호스트/포트 외에 ControlMaster 설정을 넣어 VS Code 가 여는 여러 ssh 가
+연결 하나를 함께 쓰게 하고, 앱이 알아 둔 인증 방법을 적어 실패할 인증 시도를 건너뛰게 한다.
+Windows 의 OpenSSH 는 ControlMaster 를 지원하지 않으므로 Windows 에서는 넣지 않는다.
+
+servers.json 의 값은 그대로 설정 파일에 들어가므로 줄바꿈 등으로 다른 지시어를 끼워 넣을 수 없게
+검사하고 (ValueError), 공백이 있는 값은 큰따옴표로 감싼다. ~/.ssh/config 를 처음 고칠 때는
+config.dashssh.bak 으로 원본을 남긴다.
+"""
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+from typing import Dict, List, Optional
+
+from .config import parse_jump_host
+
+SSH_DIR = os.path.join(os.path.expanduser("~"), ".ssh")
+MANAGED_NAME = "dashssh_config"
+INCLUDE_LINE = f"Include {MANAGED_NAME}"
+BACKUP_NAME = "config.dashssh.bak"
+HEADER = "# DASH-SSH 가 자동으로 관리하는 파일입니다. 직접 수정하지 마세요.\n"
+
+MULTIPLEXING = os.name != "nt"
+CONTROL_PATH = "~/.ssh/dashssh-cm-%C"  # %C: 접속 대상의 해시 (소켓 경로 길이 제한 때문)
+CONTROL_PERSIST = "10m"
+WARM_TIMEOUT = 10
+
+_ALIAS_UNSAFE = re.compile(r"[^A-Za-z0-9._-]")
+_VALUE_UNSAFE = re.compile(r'["\x00-\x1f\x7f]')  # 줄바꿈/제어 문자, 따옴표 (ssh_config 에는 이스케이프가 없다)
+
+
+def host_alias(server: Dict) -> str:
+    """Host 별칭. 공백/한글 등이 있는 이름은 바꾸고, 겹치지 않도록 이름의 해시를 붙인다"""
+    name = server["name"]
+    safe = _ALIAS_UNSAFE.sub("_", name)
+    if safe != name:
+        safe += "-" + hashlib.sha1(name.encode()).hexdigest()[:6]
+    return f"dashssh-{safe}"
+
+
+def quote_value(value, what: str, always: bool = False) -> str:
+    """ssh_config 값으로 쓸 수 있게 검사하고 공백이 있으면 (always 면 항상) 큰따옴표로 감싼다"""
+    text = str(value)
+    if not text.strip() or _VALUE_UNSAFE.search(text):
+        raise ValueError(f"ssh 설정에 쓸 수 없는 {what}: {text!r}")
+    return f'"{text}"' if always or re.search(r"\s", text) else text
+
+
+def auth_options(method: Optional[Dict]) -> List[str]:
+    """앱이 성공했던 인증 방법 (auth.AuthMethodCache 형식) 을 ssh 옵션으로"""
+    if not method:
+        return []
+    if method["method"] == "key":
+        return [f'IdentityFile {quote_value(method["key"], "키 파일 경로", always=True)}',
+                "IdentitiesOnly yes", "PreferredAuthentications publickey"]
+    if method["method"] == "agent":
+        return ["PreferredAuthentications publickey"]
+    if method["method"] == "password":
+        return ["PreferredAuthentications keyboard-interactive,password", "PubkeyAuthentication no"]
+    return []
+
+
+def host_block(server: Dict, username: str, auth: Optional[Dict] = None) -> str:
+    """서버 한 대의 Host 항목. 설정에 쓸 수 없는 값이 있으면 ValueError"""
+    lines = [
+        f"Host {host_alias(server)}",
+        f"    HostName {quote_value(server['ip'], '주소')}",
+        f"    User {quote_value(username, '사용자 이름')}",
+        f"    Port {int(server.get('port', 22))}",
+    ]
+    if server.get("jump_host"):
+        jump_user, jump_ip, jump_port = parse_jump_host(server["jump_host"])
+        jump = f"{jump_user or username}@{jump_ip}:{jump_port}"
+        lines.append(f"    ProxyJump {quote_value(jump, '점프 호스트')}")
+    if MULTIPLEXING:
+        lines += ["    ControlMaster auto", f"    ControlPath {CONTROL_PATH}",
+                  f"    ControlPersist {CONTROL_PERSIST}"]
+    lines += [f"    {option}" for option in auth_options(auth)]
+    return "\n".join(lines) + "\n"
+
+
+def render_config(servers: List[Dict], username: str, auth_methods: Optional[Dict[str, Dict]] = None) -> str:
+    """auth_methods: 서버 이름 -> 마지막으로 성공한 인증 방법"""
+    auth_methods = auth_methods or {}
+    blocks = []
+    for server in servers:
+        try:
+            blocks.append(host_block(server, username, auth_methods.get(server["name"])))
+        except ValueError:
+            continue  # 잘못된 항목 하나 때문에 다른 서버의 설정까지 막지 않는다 (연결할 때 remote_target 이 알림)
+    return HEADER + "\n" + "\n".join(blocks)
+
+
+def _write_if_changed(path: str, text: str) -> bool:
+    try:
+        with open(path, encoding="utf-8") as f:
+            if f.read() == text:
+                return False
+    except OSError:
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    if os.path.exists(path):
+        shutil.copymode(path, tmp)  # ssh 는 권한이 넓은 설정 파일을 거부하므로 기존 권한 유지
+    os.replace(tmp, path)
+    return True
+
+
+def backup_path(ssh_dir: str = SSH_DIR) -> str:
+    return os.path.join(ssh_dir, BACKUP_NAME)
+
+
+def ensure_include(ssh_dir: str = SSH_DIR) -> bool:
+    """~/.ssh/config 맨 위에 Include 줄이 없으면 추가 (Host 블록 안에 두면 조건부가 되므로 맨 위)
+
+    기존 파일이 있으면 처음 고치기 전에 config.dashssh.bak 으로 복사해 둔다 (이미 있으면 덮어쓰지 않음).
+    추가했으면 True
+    """
+    path = os.path.join(ssh_dir, "config")
+    try:
+        with open(path, encoding="utf-8") as f:
+            current = f.read()
+    except FileNotFoundError:
+        current = ""
+    if any(line.strip() == INCLUDE_LINE for line in current.splitlines()):
+        return False
+    if current and not os.path.exists(backup_path(ssh_dir)):
+        shutil.copy2(path, backup_path(ssh_dir))
+    return _write_if_changed(path, f"{INCLUDE_LINE}\n\n{current}")
+
+
+def install(servers: List[Dict], username: str, ssh_dir: Optional[str] = None,
+            auth_methods: Optional[Dict[str, Dict]] = None) -> bool:
+    """관리 파일을 갱신하고 Include 를 보장. 바뀐 내용이 있으면 True"""
+    ssh_dir = ssh_dir or SSH_DIR
+    changed = _write_if_changed(os.path.join(ssh_dir, MANAGED_NAME),
+                                render_config(servers, username, auth_methods))
+    return ensure_include(ssh_dir) or changed
+
+
+def remote_target(server: Dict, username: str) -> str:
+    """VS Code --remote ssh-remote+ 뒤에 붙일 접속 대상 (관리 파일의 Host 별칭)
+
+    관리 파일에 넣을 수 없는 서버 항목이면 ValueError
+    """
+    host_block(server, username)
+    return host_alias(server)
+
+
+def warm_master(server: Dict, auth: Optional[Dict] = None) -> bool:
+    """VS Code 가 쓸 ControlMaster 연결을 미리 열어 둔다 (이미 있으면 그대로). 시작했으면 True
+
+    ssh 는 비밀번호를 인자로 받지 않으므로 키/에이전트로 인증되는 서버만 미리 연다.
+    비밀번호 서버는 VS Code 의 첫 ssh 가 master 가 되어 ControlPersist 동안 유지된다.
+    """
+    ssh = shutil.which("ssh")
+    if not MULTIPLEXING or ssh is None or not auth or auth["method"] not in ("key", "agent", "none"):
+        return False
+    alias = host_alias(server)
+    try:
+        check = subprocess.run([ssh, "-O", "check", alias], stdin=subprocess.DEVNULL,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=WARM_TIMEOUT)
+        if check.returncode == 0:
+            return False
+        # -f: 인증이 끝나면 백그라운드로, -N: 명령 없이 master 만 유지
+        subprocess.Popen([ssh, "-fN", "-o", "BatchMode=yes", "-o", f"ConnectTimeout={WARM_TIMEOUT}", alias],
+                         stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return True
@@ -0,0 +1,98 @@
+"""서버별 마지막 스냅샷을 로컬 SQLite 파일에 보관 (앱을 다시 켰을 때 바로 표시하기 위함)
+
+스냅샷이 갱신될 때마다 그 서버의 행 하나만 덮어쓴다. 내용은 ServerSnapshot.to_state() 의
+JSON 을 zlib 으로 압축한 것이며, 형식이 바뀌면 SCHEMA_VERSION 을 올려 이전 파일은 버린다.
+paramiko 를 import 하지 않으므로 첫 화면을 그리기 전에 불러와도 된다.
+"""
+import json
+import os
+import sqlite3
+import threading
+import zlib
+from typing import Dict, Iterable, Optional
+
+from .cache import ServerSnapshot
+from .paths import data_path
+
+SCHEMA_VERSION = 1
+
+
+class StateStore:
+    """서버 이름 -> 마지막 스냅샷"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or data_path("state.sqlite3")
+        self._lock = threading.Lock()
+        self._saved: Dict[str, float] = {}  # 서버 -> 마지막으로 저장한 스냅샷 시각
+        self._db: Optional[sqlite3.Connection] = None
+
+    @classmethod
+    def from_config(cls, config: Dict) -> Optional["StateStore"]:
+        """servers.json 의 "state" 항목 ({"enabled": true, "path": ...}). 끄면 None"""
+        options = config.get("state", {})
+        if not options.get("enabled", True):
+            return None
+        path = options.get("path")
+        return cls(os.path.expanduser(path) if path else None)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            if db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                db.execute("DROP TABLE IF EXISTS snapshots")
+                db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            db.execute("CREATE TABLE IF NOT EXISTS snapshots "
+                       "(server TEXT PRIMARY KEY, taken_at REAL NOT NULL, state BLOB NOT NULL)")
+            self._db = db
+        return self._db
+
+    def load(self, server_names: Optional[Iterable[str]] = None) -> Dict[str, ServerSnapshot]:
+        """저장된 스냅샷 (server_names 가 있으면 그 서버만, 나머지 행은 삭제)"""
+        wanted = set(server_names) if server_names is not None else None
+        snapshots = {}
+        with self._lock:
+            try:
+                db = self._connect()
+                rows = db.execute("SELECT server, taken_at, state FROM snapshots").fetchall()
+                stale = [(name,) for name, _, _ in rows if wanted is not None and name not in wanted]
+                if stale:
+                    db.executemany("DELETE FROM snapshots WHERE server = ?", stale)
+            except sqlite3.Error:
+                return {}
+            for name, taken_at, blob in rows:
+                if wanted is not None and name not in wanted:
+                    continue
+                try:
+                    snapshots[name] = ServerSnapshot.from_state(json.loads(zlib.decompress(blob)))
+                except (zlib.error, ValueError, KeyError, TypeError):
+                    continue  # 손상된 행은 다음 갱신 때 덮어쓴다
+                self._saved[name] = taken_at
+        return snapshots
+
+    def save(self, snapshot: ServerSnapshot):
+        """스냅샷 한 대 저장 (이미 저장한 스냅샷이면 건너뜀)"""
+        name = snapshot.server_name
+        with self._lock:
+            if self._saved.get(name) == snapshot.taken_at:
+                return
+            blob = zlib.compress(json.dumps(snapshot.to_state(), ensure_ascii=False,
+                                            separators=(",", ":")).encode(), 6)
+            try:
+                self._connect().execute("INSERT OR REPLACE INTO snapshots (server, taken_at, state) VALUES (?, ?, ?)",
+                                        (name, snapshot.taken_at, blob))
+            except sqlite3.Error:
+                return  # 저장하지 못해도 이번 실행에는 영향 없음
+            self._saved[name] = snapshot.taken_at
+
+    def update(self, server: Dict, snapshot: Optional[ServerSnapshot], error: Optional[str]):
+        """SnapshotCache listener"""
+        if snapshot is not None:
+            self.save(snapshot)
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,314 @@
+"""GPU 종류(gpu_spec)별 클러스터 요약
+
+서버 스냅샷이 바뀔 때마다 그 서버의 GPU/프로세스 행만 열(column) 배열 표에 덮어쓰고,
+요약할 때는 표 전체를 numpy 로 한꺼번에 집계한다
+(GPU 종류별 합계는 bincount, 사용률 백분위수는 정렬 후 구간별 보간, 주요 사용자는 argsort).
+같은 상태에서 다시 요청하면 이전 결과를 그대로 돌려준다.
+"""
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .cache import FREE_GPU_MEMORY_MIB, ServerSnapshot
+
+GPU_COLUMNS = {"spec": np.int32, "server": np.int32, "used": np.float64, "total": np.float64,
+               "util": np.float64, "busy": np.bool_}
+PROC_COLUMNS = {"spec": np.int32, "user": np.int32, "gpu": np.int64, "memory": np.float64}
+
+GPUS_PER_SERVER_KEY = 1024   # 프로세스의 GPU 키 = 서버 번호 * 1024 + GPU 인덱스 (GPU 를 모르면 -1)
+PERCENTILES = (50.0, 90.0)
+TOP_USERS = 3
+
+
+@dataclass
+class PoolSummary:
+    """GPU 종류 하나의 요약 (메모리 단위: MiB)"""
+    spec: str
+    servers: int              # 구조화된 GPU 정보를 받은 서버 수
+    servers_total: int        # servers.json 에 등록된 서버 수
+    gpus: int
+    free_gpus: int
+    free_memory_mib: float
+    total_memory_mib: float
+    util_mean: float          # 사용률을 알 수 없으면 NaN
+    util_p50: float
+    util_p90: float
+    top_users: List[Tuple[str, int, float]]   # (사용자, 사용 중인 GPU 수, 메모리)
+
+    def to_dict(self) -> Dict:
+        def number(value: float) -> Optional[float]:
+            return None if np.isnan(value) else round(float(value), 1)
+
+        return {
+            "spec": self.spec,
+            "servers": self.servers,
+            "servers_total": self.servers_total,
+            "gpus": self.gpus,
+            "free_gpus": self.free_gpus,
+            "free_memory_mib": int(self.free_memory_mib),
+            "total_memory_mib": int(self.total_memory_mib),
+            "util_mean": number(self.util_mean),
+            "util_p50": number(self.util_p50),
+            "util_p90": number(self.util_p90),
+            "top_users": [{"user": user, "gpus": gpus, "memory_mib": int(memory)}
+                          for user, gpus, memory in self.top_users],
+        }
+
+
+def group_percentiles(groups: np.ndarray, values: np.ndarray, n_groups: int,
+                      percentiles=PERCENTILES) -> np.ndarray:
+    """그룹별 백분위수 (np.percentile 의 linear 보간과 같음). 결과 shape: (백분위수 수, n_groups)"""
+    order = np.lexsort((values, groups))
+    ordered = values[order]
+    counts = np.bincount(groups, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    result = np.full((len(percentiles), n_groups), np.nan)
+    present = counts > 0
+    if not present.any():
+        return result
+    q = np.asarray(percentiles, dtype=float)[:, None] / 100.0
+    position = starts[present][None, :] + q * (counts[present] - 1)[None, :]
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, (starts + counts - 1)[present][None, :])
+    fraction = position - lower
+    result[:, present] = ordered[lower] + (ordered[upper] - ordered[lower]) * fraction
+    return result
+
+
+class _Interner:
+    """문자열 -> 연속된 정수 코드"""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.names: List[str] = []
+
+    def __call__(self, name: str) -> int:
+        code = self.codes.get(name)
+        if code is None:
+            code = self.codes[name] = len(self.names)
+            self.names.append(name)
+        return code
+
+
+class ColumnTable:
+    """열 배열 표. 서버마다 연속된 행 구간을 잡아 두고 스냅샷이 바뀌면 그 구간만 덮어쓴다
+
+    행 수가 늘어 구간이 모자라면 끝에 새 구간을 잡고 이전 구간은 비워 둔다 (valid=False).
+    비워 둔 행이 절반을 넘으면 한 번에 압축한다.
+    """
+
+    def __init__(self, columns: Dict[str, type], capacity: int = 256):
+        self.dtypes = columns
+        self.columns = {name: np.zeros(capacity, dtype) for name, dtype in columns.items()}
+        self.valid = np.zeros(capacity, dtype=bool)
+        self.size = 0
+        self.live = 0
+        self.slots: Dict[str, Tuple[int, int, int]] = {}  # 키 -> (시작, 행 수, 잡아 둔 행 수)
+
+    def _grow(self, needed: int):
+        capacity = len(self.valid)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name, column in self.columns.items():
+            grown = np.zeros(capacity, column.dtype)
+            grown[:self.size] = column[:self.size]
+            self.columns[name] = grown
+        valid = np.zeros(capacity, dtype=bool)
+        valid[:self.size] = self.valid[:self.size]
+        self.valid = valid
+
+    def put(self, key: str, rows: Dict[str, list]):
+        count = len(next(iter(rows.values())))
+        start, old_count, reserved = self.slots.get(key, (0, 0, -1))
+        if count > reserved:
+            self.remove(key)
+            reserved = max(4, count * 2 if reserved >= 0 else count)  # 행 수가 바뀌는 구간은 여유를 둔다
+            self._grow(self.size + reserved)
+            start, old_count = self.size, 0
+            self.size += reserved
+        for name, values in rows.items():
+            self.columns[name][start:start + count] = values
+        self.valid[start:start + count] = True
+        self.valid[start + count:start + reserved] = False
+        self.live += count - old_count
+        self.slots[key] = (start, count, reserved)
+
+    def remove(self, key: str):
+        slot = self.slots.pop(key, None)
+        if slot is None:
+            return
+        start, count, reserved = slot
+        self.valid[start:start + reserved] = False
+        self.live -= count
+        if self.size > 64 and self.live * 2 < self.size:
+            self._compact()
+
+    def _compact(self):
+        slots, offset = {}, 0
+        order = sorted(self.slots.items(), key=lambda item: item[1][0])
+        for key, (start, count, reserved) in order:
+            if start != offset:
+                for column in self.columns.values():
+                    column[offset:offset + reserved] = column[start:start + reserved].copy()
+                self.valid[offset:offset + reserved] = self.valid[start:start + reserved].copy()
+            slots[key] = (offset, count, reserved)
+            offset += reserved
+        self.valid[offset:self.size] = False
+        self.slots, self.size = slots, offset
+
+    def rows(self) -> Dict[str, np.ndarray]:
+        """유효한 행만 모은 열 배열 (복사본)"""
+        valid = self.valid[:self.size]
+        return {name: column[:self.size][valid] for name, column in self.columns.items()}
+
+
+class ClusterSummary:
+    """서버별 GPU/프로세스 블록을 보관하고 GPU 종류별 요약을 계산"""
+
+    def __init__(self, servers: Optional[List[Dict]] = None, top_users: int = TOP_USERS):
+        self.top_users = top_users
+        self._specs = _Interner()
+        self._servers = _Interner()
+        self._users = _Interner()
+        self._server_specs: Dict[str, str] = {}
+        self._gpus = ColumnTable(GPU_COLUMNS)
+        self._procs = ColumnTable(PROC_COLUMNS)
+        self._version = 0
+        self._cached: Tuple[int, List[PoolSummary]] = (-1, [])
+        self._lock = threading.Lock()
+        self.set_servers(servers or [])
+
+    def set_servers(self, servers: List[Dict]):
+        with self._lock:
+            self._server_specs = {server["name"]: server.get("gpu_spec") or "(미지정)" for server in servers}
+            for name in [name for name in self._gpus.slots if name not in self._server_specs]:
+                self._gpus.remove(name)
+                self._procs.remove(name)
+            for spec in self._server_specs.values():
+                self._specs(spec)
+            self._version += 1
+
+    def update(self, snapshot: ServerSnapshot):
+        """서버 스냅샷이 바뀔 때 그 서버의 행만 다시 쓴다"""
+        name = snapshot.server_name
+        if snapshot.gpu is None:
+            return
+        with self._lock:
+            if name not in self._server_specs:
+                return
+            spec = self._specs(self._server_specs[name])
+            server = self._servers(name)
+            gpus, procs = snapshot.gpu.gpus, [proc for proc in snapshot.gpu.processes if proc.user]
+            busy = {proc.gpu_index for proc in snapshot.gpu.processes}
+            self._gpus.put(name, {
+                "spec": [spec] * len(gpus),
+                "server": [server] * len(gpus),
+                "used": [gpu.memory_used for gpu in gpus],
+                "total": [gpu.memory_total for gpu in gpus],
+                "util": [gpu.utilization for gpu in gpus],
+                "busy": [gpu.index in busy for gpu in gpus],
+            })
+            self._procs.put(name, {
+                "spec": [spec] * len(procs),
+                "user": [self._users(proc.user) for proc in procs],
+                "gpu": [server * GPUS_PER_SERVER_KEY + proc.gpu_index if proc.gpu_index >= 0 else -1
+                        for proc in procs],
+                "memory": [max(proc.used_memory, 0) for proc in procs],
+            })
+            self._version += 1
+
+    def remove(self, server_name: str):
+        with self._lock:
+            if server_name in self._gpus.slots:
+                self._gpus.remove(server_name)
+                self._procs.remove(server_name)
+                self._version += 1
+
+    def tables(self) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+        """전체 GPU 표와 프로세스 표 (열 배열)"""
+        with self._lock:
+            return self._gpus.rows(), self._procs.rows()
+
+    def summarize(self) -> List[PoolSummary]:
+        """GPU 종류별 요약 (등록된 서버가 많은 종류부터)"""
+        with self._lock:
+            if self._cached[0] == self._version:
+                return self._cached[1]
+            version = self._version
+            gpus, procs = self._gpus.rows(), self._procs.rows()
+            specs = list(self._specs.names)
+            users = list(self._users.names)
+            counts = Counter(self._server_specs.values())
+            registered = [counts.get(spec, 0) for spec in specs]
+        pools = self._aggregate(gpus, procs, specs, users, registered)
+        with self._lock:
+            self._cached = (version, pools)
+        return pools
+
+    def _aggregate(self, gpus: Dict[str, np.ndarray], procs: Dict[str, np.ndarray], specs: List[str], users: List[str],
+                   registered: List[int]) -> List[PoolSummary]:
+        n = len(specs)
+        spec = gpus["spec"]
+        used, total, util = gpus["used"], gpus["total"], gpus["util"]
+
+        gpu_count = np.bincount(spec, minlength=n)
+        free = ~gpus["busy"] & (used >= 0) & (used <= FREE_GPU_MEMORY_MIB)
+        free_count = np.bincount(spec, weights=free, minlength=n)
+        known = (total > 0) & (used >= 0)
+        free_memory = np.bincount(spec, weights=np.where(known, total - used, 0.0), minlength=n)
+        total_memory = np.bincount(spec, weights=np.where(total > 0, total, 0.0), minlength=n)
+
+        servers = np.unique(spec.astype(np.int64) << 32 | gpus["server"]) >> 32
+        server_count = np.bincount(servers, minlength=n)
+
+        measured = util >= 0
+        util_spec, util_values = spec[measured], util[measured]
+        util_count = np.bincount(util_spec, minlength=n)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            util_mean = np.bincount(util_spec, weights=util_values, minlength=n) / util_count
+        percentiles = group_percentiles(util_spec, util_values, n)
+
+        top = self._top_users(procs, n, len(users))
+
+        pools = []
+        for code in np.argsort([-count for count in registered], kind="stable"):
+            if not registered[code] and not gpu_count[code]:
+                continue
+            pools.append(PoolSummary(
+                spec=specs[code],
+                servers=int(server_count[code]),
+                servers_total=registered[code],
+                gpus=int(gpu_count[code]),
+                free_gpus=int(free_count[code]),
+                free_memory_mib=float(free_memory[code]),
+                total_memory_mib=float(total_memory[code]),
+                util_mean=float(util_mean[code]),
+                util_p50=float(percentiles[0, code]),
+                util_p90=float(percentiles[1, code]),
+                top_users=[(users[user], gpus_held, memory) for user, gpus_held, memory in top[code]],
+            ))
+        return pools
+
+    def _top_users(self, procs: Dict[str, np.ndarray], n_specs: int, n_users: int) -> List[List[Tuple[int, int, float]]]:
+        """GPU 종류별로 사용 중인 GPU 수 (같으면 메모리) 가 많은 사용자 상위 top_users 명"""
+        if not len(procs["user"]) or not n_users:
+            return [[] for _ in range(n_specs)]
+        key = procs["spec"].astype(np.int64) * n_users + procs["user"]
+        memory = np.bincount(key, weights=procs["memory"], minlength=n_specs * n_users)
+        # 같은 사용자가 한 GPU 에 프로세스를 여러 개 띄워도 GPU 는 한 번만 센다 (GPU 를 모르는 프로세스는 제외)
+        known = procs["gpu"] >= 0
+        width = max(1, int(procs["gpu"].max()) + 1)
+        gpu_keys = np.unique(key[known] * width + procs["gpu"][known]) // width
+        held = np.bincount(gpu_keys, minlength=n_specs * n_users)
+        memory, held = memory.reshape(n_specs, n_users), held.reshape(n_specs, n_users)
+        order = np.lexsort((-memory, -held))[:, :self.top_users]  # 행(GPU 종류)마다 정렬
+        rows = []
+        for code in range(n_specs):
+            rows.append([(int(user), int(held[code, user]), float(memory[code, user]))
+                         for user in order[code] if held[code, user]])
+        return rows
@@ -0,0 +1,49 @@
+"""probe 섹션 (w -h, /proc/loadavg, free -m, df -hP) 파싱"""
+from typing import Dict, List, Optional
+
+
+def parse_users(output: str) -> List[Dict]:
+    """w -h 출력을 사용자 목록으로 변환"""
+    users = []
+    for line in output.strip().splitlines():
+        parts = line.split()
+        if len(parts) >= 5:
+            users.append({
+                "user": parts[0],
+                "tty": parts[1],
+                "from": parts[2],
+                "login": " ".join(parts[3:5]),
+                "what": " ".join(parts[5:]),
+            })
+    return users
+
+
+def parse_loadavg(output: str) -> Optional[List[float]]:
+    parts = output.split()
+    try:
+        return [float(value) for value in parts[:3]] if len(parts) >= 3 else None
+    except ValueError:
+        return None
+
+
+def parse_memory(output: str) -> Optional[Dict[str, int]]:
+    """free -m 의 Mem: 행 (단위 MiB)"""
+    for line in output.splitlines():
+        parts = line.split()
+        if parts and parts[0] == "Mem:" and len(parts) >= 7:
+            try:
+                return {"total": int(parts[1]), "used": int(parts[2]), "available": int(parts[6])}
+            except ValueError:
+                return None
+    return None
+
+
+def parse_disk(output: str) -> Optional[Dict[str, str]]:
+    """df -hP 의 마지막 행"""
+    lines = output.strip().splitlines()
+    if len(lines) >= 2:
+        parts = lines[-1].split()
+        if len(parts) >= 6:
+            return {"size": parts[1], "used": parts[2], "available": parts[3],
+                    "use_percent": parts[4], "mount": parts[5]}
+    return None
@@ -0,0 +1,48 @@
+"""VS Code 실행 파일 찾기와 Remote-SSH 로 실행
+
+설치 경로는 처음 한 번만 찾고 기억해 둔다 (클릭할 때마다 여러 경로를 확인하지 않도록).
+"""
+import os
+import shutil
+import subprocess
+import threading
+from typing import List, Optional
+
+_lock = threading.Lock()
+_resolved: Optional[str] = None
+
+
+def candidate_paths() -> List[str]:
+    paths = [
+        # Windows paths
+        r"C:\Program Files\Microsoft VS Code\Code.exe",
+        os.path.expandvars(r"%LOCALAPPDATA%\Programs\Microsoft VS Code\Code.exe"),
+        # Mac path
+        "/Applications/Visual Studio Code.app/Contents/Resources/app/bin/code",
+    ]
+    on_path = shutil.which("code")  # Linux 또는 PATH 에 code 명령을 설치한 경우
+    if on_path:
+        paths.append(on_path)
+    return paths
+
+
+def find_vscode() -> Optional[str]:
+    """VS Code 실행 파일 경로 (없으면 None). 찾은 경로는 지워지지 않은 한 계속 사용"""
+    global _resolved
+    with _lock:
+        if _resolved is not None and os.path.exists(_resolved):
+            return _resolved
+        _resolved = next((path for path in candidate_paths() if os.path.exists(path)), None)
+        return _resolved
+
+
+def forget():
+    """실행에 실패했을 때 다음 호출에서 다시 찾도록"""
+    global _resolved
+    with _lock:
+        _resolved = None
+
+
+def launch(vscode_path: str, remote_target: str, folder: str) -> subprocess.Popen:
+    """VS Code 를 Remote-SSH 로 실행 (기다리지 않음)"""
+    return subprocess.Popen([vscode_path, "--remote", f"ssh-remote+{remote_target}", folder])
@@ -0,0 +1,464 @@
+"""감시 규칙: 빈 GPU 가 생기거나 작업이 끝나면 알림
+
+규칙은 SnapshotCache 의 listener 로 등록되어 새 스냅샷이 도착할 때마다 평가된다 (따로 폴링하지 않음).
+서버마다 직전 스냅샷의 GPU/프로세스 상태를 기억해 두고, 바뀐 GPU 와 새로 생기거나 사라진 프로세스만
+규칙에 넘긴다. 조건이 새로 만족되면 한 번 알리고, 조건이 풀렸다가 다시 만족되면 다시 알린다.
+같은 규칙은 서버마다 debounce 초 안에 다시 알리지 않는다 (그 사이 만족된 조건은 debounce 가 지난 뒤 알린다).
+
+  GpuFreeRule(count=2, min_free_gb=20, spec="NVIDIA RTX A5000")  : 프로세스 없이 여유 20GB 이상인 GPU 가 2개 이상인 A5000 서버
+  ProcessExitRule("Server4", pid=12345)                           : Server4 의 PID 12345 종료
+  ProcessExitRule("Server4", user="kim")                          : Server4 에서 kim 의 GPU 프로세스가 모두 종료
+
+알림마다 command (servers.json 의 watch.command 또는 규칙별 command) 를 셸로 실행할 수 있으며,
+DASHSSH_SERVER / DASHSSH_MESSAGE / DASHSSH_RULE / CUDA_VISIBLE_DEVICES 환경변수로 내용을 넘긴다.
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from .cache import ServerSnapshot
+from .nvsmi import ProcessRecord
+from .paths import data_path
+
+DEFAULT_DEBOUNCE = 300.0
+DEFAULT_REFRESH_INTERVAL = 60.0
+
+# GPU 인덱스 -> 여유 메모리 (MiB, 알 수 없으면 -1)
+GpuState = Dict[int, int]
+
+
+@dataclass
+class WatchEvent:
+    """규칙이 만족되어 알린 내용"""
+    rule_id: str
+    server_name: str
+    message: str
+    gpu_indexes: List[int] = field(default_factory=list)
+    fired_at: float = field(default_factory=time.time)
+    command: Optional[str] = None     # 규칙별 command (없으면 watch.command)
+    hook_error: Optional[str] = None
+
+    def env(self) -> Dict[str, str]:
+        """command 에 넘길 환경변수"""
+        env = {
+            "DASHSSH_RULE": self.rule_id,
+            "DASHSSH_SERVER": self.server_name,
+            "DASHSSH_MESSAGE": self.message,
+        }
+        if self.gpu_indexes:
+            env["CUDA_VISIBLE_DEVICES"] = ",".join(str(index) for index in self.gpu_indexes)
+        return env
+
+    def to_dict(self) -> Dict:
+        return {
+            "rule": self.rule_id,
+            "server": self.server_name,
+            "message": self.message,
+            "gpus": self.gpu_indexes,
+            "fired_at": self.fired_at,
+            "hook_error": self.hook_error,
+        }
+
+
+class WatchRule:
+    """감시 규칙 공통 부분. 하위 클래스는 서버별 상태를 바뀐 부분만으로 갱신하고 만족 여부를 돌려준다"""
+    kind = ""
+    once = False  # 한 번 알린 뒤 규칙을 지울지
+
+    def __init__(self, rule_id: Optional[str] = None, debounce: Optional[float] = None,
+                 command: Optional[str] = None):
+        self.rule_id = rule_id or uuid.uuid4().hex[:8]
+        self.debounce = debounce
+        self.command = command
+
+    def applies(self, server: Dict) -> bool:
+        raise NotImplementedError
+
+    def gpus_changed(self, server_name: str, changes: Dict[int, Optional[int]]) -> Optional[bool]:
+        """바뀐 GPU 만 받아 만족 여부 반환 (GPU 를 보지 않는 규칙은 None)"""
+        return None
+
+    def processes_changed(self, server_name: str, processes: List[ProcessRecord]) -> Optional[bool]:
+        """프로세스가 생기거나 사라지거나 GPU 를 옮겼을 때 만족 여부 반환 (프로세스를 보지 않는 규칙은 None)"""
+        return None
+
+    def forget(self, server_name: str):
+        """서버가 목록에서 빠졌을 때 서버별 상태 삭제"""
+
+    def message(self, server_name: str) -> str:
+        raise NotImplementedError
+
+    def gpu_indexes(self, server_name: str) -> List[int]:
+        return []
+
+    def describe(self) -> str:
+        raise NotImplementedError
+
+    def to_dict(self) -> Dict:
+        data = {"id": self.rule_id, "kind": self.kind}
+        if self.debounce is not None:
+            data["debounce"] = self.debounce
+        if self.command:
+            data["command"] = self.command
+        return data
+
+
+class GpuFreeRule(WatchRule):
+    """프로세스가 없고 여유 메모리가 min_free_gb 이상인 GPU 가 count 개 이상인 서버가 생기면 알림
+
+    빈 GPU 의 기준은 ServerSnapshot.free_gpu_count 와 같이 GPU 프로세스가 없는 것이다.
+    spec (gpu_spec) 이나 server 로 대상 서버를 좁힐 수 있다. 서버별로 여유 메모리 조건을 만족하는
+    GPU 와 프로세스가 있는 GPU 의 인덱스 집합을 유지하므로 바뀐 GPU 만 다시 확인한다.
+    """
+    kind = "gpu_free"
+
+    def __init__(self, count: int = 1, min_free_gb: float = 0.0, spec: Optional[str] = None,
+                 server: Optional[str] = None, **options):
+        super().__init__(**options)
+        self.count = max(1, int(count))
+        self.min_free_gb = float(min_free_gb)
+        self.min_free_mib = int(self.min_free_gb * 1024)
+        self.spec = spec or None
+        self.server = server or None
+        self._roomy: Dict[str, Set[int]] = {}   # 여유 메모리 조건을 만족하는 GPU
+        self._busy: Dict[str, Set[int]] = {}    # 프로세스가 있는 GPU
+
+    def applies(self, server: Dict) -> bool:
+        if self.server and server["name"] != self.server:
+            return False
+        return not self.spec or server.get("gpu_spec") == self.spec
+
+    def _matching(self, server_name: str) -> List[int]:
+        return sorted(self._roomy.get(server_name, set()) - self._busy.get(server_name, set()))
+
+    def gpus_changed(self, server_name: str, changes: Dict[int, Optional[int]]) -> bool:
+        roomy = self._roomy.setdefault(server_name, set())
+        for index, free in changes.items():
+            if free is not None and free >= self.min_free_mib:
+                roomy.add(index)
+            else:
+                roomy.discard(index)
+        return len(self._matching(server_name)) >= self.count
+
+    def processes_changed(self, server_name: str, processes: List[ProcessRecord]) -> bool:
+        self._busy[server_name] = {proc.gpu_index for proc in processes if proc.gpu_index >= 0}
+        return len(self._matching(server_name)) >= self.count
+
+    def forget(self, server_name: str):
+        self._roomy.pop(server_name, None)
+        self._busy.pop(server_name, None)
+
+    def gpu_indexes(self, server_name: str) -> List[int]:
+        return self._matching(server_name)[:self.count]
+
+    def message(self, server_name: str) -> str:
+        matching = self._matching(server_name)
+        return (f"{server_name}: 여유 {self.min_free_gb:g}GB 이상 빈 GPU {len(matching)}개 "
+                f"(GPU {','.join(str(index) for index in matching)})")
+
+    def describe(self) -> str:
+        target = self.server or self.spec or "모든 서버"
+        return f"{target}: 여유 {self.min_free_gb:g}GB 이상 빈 GPU {self.count}개 이상"
+
+    def to_dict(self) -> Dict:
+        data = super().to_dict()
+        data.update(count=self.count, min_free_gb=self.min_free_gb, spec=self.spec, server=self.server)
+        return data
+
+
+class ProcessExitRule(WatchRule):
+    """server 의 PID (또는 user 의 모든 GPU 프로세스) 가 끝나면 한 번 알리고 지워지는 규칙"""
+    kind = "process_exit"
+    once = True
+
+    def __init__(self, server: str, pid: Optional[int] = None, user: Optional[str] = None,
+                 seen: bool = False, **options):
+        if pid is None and not user:
+            raise ValueError("pid 또는 user 가 필요합니다")
+        super().__init__(**options)
+        self.server = server
+        self.pid = int(pid) if pid is not None else None
+        self.user = user or None
+        self.seen = bool(seen)  # 실행 중인 것을 본 적이 있는지 (없으면 "실행 중이 아님" 으로 알림)
+
+    def applies(self, server: Dict) -> bool:
+        return server["name"] == self.server
+
+    def processes_changed(self, server_name: str, processes: List[ProcessRecord]) -> bool:
+        if self.pid is not None:
+            running = any(proc.pid == self.pid for proc in processes)
+        else:
+            running = any(proc.user == self.user for proc in processes)
+        self.seen = self.seen or running
+        return not running
+
+    def _target(self) -> str:
+        return f"PID {self.pid}" if self.pid is not None else f"{self.user} 의 GPU 프로세스"
+
+    def message(self, server_name: str) -> str:
+        if self.seen:
+            return f"{server_name}: {self._target()} 종료"
+        return f"{server_name}: {self._target()} 실행 중이 아님"
+
+    def describe(self) -> str:
+        return f"{self.server}: {self._target()} 종료"
+
+    def to_dict(self) -> Dict:
+        data = super().to_dict()
+        data.update(server=self.server, pid=self.pid, user=self.user, seen=self.seen)
+        return data
+
+
+RULE_TYPES = {rule.kind: rule for rule in (GpuFreeRule, ProcessExitRule)}
+
+
+def rule_from_dict(data: Dict) -> WatchRule:
+    options = {key: value for key, value in data.items() if key not in ("kind", "id")}
+    return RULE_TYPES[data["kind"]](rule_id=data.get("id"), **options)
+
+
+class _ServerState:
+    __slots__ = ("taken_at", "gpus", "processes", "placement")
+
+    def __init__(self):
+        self.taken_at = 0.0
+        self.gpus: GpuState = {}
+        self.processes: List[ProcessRecord] = []
+        self.placement: Optional[Set[Tuple[int, int]]] = None  # (PID, GPU 인덱스), 아직 못 받았으면 None
+
+
+def notify_desktop(title: str, message: str) -> bool:
+    """운영체제 알림 표시 (Windows 풍선 알림, macOS 알림 센터, Linux notify-send). 표시했으면 True"""
+    try:
+        if sys.platform == "darwin":
+            script = f"display notification {json.dumps(message)} with title {json.dumps(title)}"
+            subprocess.Popen(["osascript", "-e", script])
+        elif os.name == "nt":
+            quote = lambda text: "'" + text.replace("'", "''") + "'"
+            script = ("Add-Type -AssemblyName System.Windows.Forms; "
+                      "$n = New-Object System.Windows.Forms.NotifyIcon; "
+                      "$n.Icon = [System.Drawing.SystemIcons]::Information; $n.Visible = $true; "
+                      f"$n.ShowBalloonTip(10000, {quote(title)}, {quote(message)}, "
+                      "[System.Windows.Forms.ToolTipIcon]::Info); Start-Sleep -Seconds 10; $n.Dispose()")
+            subprocess.Popen(["powershell", "-NoProfile", "-WindowStyle", "Hidden", "-Command", script],
+                             creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0))
+        elif shutil.which("notify-send"):
+            subprocess.Popen(["notify-send", title, message])
+        else:
+            return False
+    except OSError:
+        return False
+    return True
+
+
+Listener = Callable[[WatchEvent], None]
+
+
+class WatchManager:
+    """감시 규칙 목록과 서버별 직전 상태. update 를 SnapshotCache 에 subscribe 하여 사용
+
+    규칙은 path (기본: 데이터 폴더의 watch.json) 에 저장되어 앱을 다시 켜도 유지된다 (path=None 이면 저장하지 않음).
+    알림은 subscribe 한 listener 로 전달되며 (스냅샷을 받은 작업 스레드에서 실행), command 가 있으면 실행한다.
+    """
+
+    def __init__(self, servers: Optional[List[Dict]] = None, debounce: float = DEFAULT_DEBOUNCE,
+                 command: Optional[str] = None, refresh_interval: float = DEFAULT_REFRESH_INTERVAL,
+                 desktop: bool = True, path: Optional[str] = None):
+        self.debounce = float(debounce)
+        self.command = command or None
+        self.refresh_interval = float(refresh_interval)
+        self.desktop = bool(desktop)
+        self.path = path
+        self._servers: Dict[str, Dict] = {server["name"]: server for server in servers or []}
+        self._rules: Dict[str, WatchRule] = {}
+        self._states: Dict[str, _ServerState] = {}
+        self._armed: Dict[Tuple[str, str], bool] = {}     # (규칙, 서버) -> 조건이 풀린 뒤 아직 알리지 않음
+        self._pending: Set[Tuple[str, str]] = set()       # 만족했지만 debounce 로 미룬 알림
+        self._last_fired: Dict[Tuple[str, str], float] = {}
+        self._listeners: List[Listener] = []
+        self._lock = threading.RLock()
+        if path is not None:
+            self._load()
+
+    @classmethod
+    def from_config(cls, config: Dict, persist: bool = True) -> "WatchManager":
+        """servers.json 의 "watch" 항목 ({"debounce", "command", "refresh_interval", "desktop"})
+
+        persist 이면 데이터 폴더의 watch.json 에 규칙을 저장한다.
+        """
+        options = config.get("watch", {})
+        return cls(
+            config["servers"],
+            debounce=options.get("debounce", DEFAULT_DEBOUNCE),
+            command=options.get("command"),
+            refresh_interval=options.get("refresh_interval", DEFAULT_REFRESH_INTERVAL),
+            desktop=options.get("desktop", True),
+            path=data_path("watch.json") if persist else None,
+        )
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                rules = [rule_from_dict(data) for data in json.load(f)]
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+        for rule in rules:
+            self._rules[rule.rule_id] = rule
+
+    def _save(self):
+        if self.path is None:
+            return
+        data = json.dumps([rule.to_dict() for rule in self._rules.values()], ensure_ascii=False, indent=2)
+        try:
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # 저장하지 못해도 이번 실행 동안은 유지
+
+    def subscribe(self, listener: Listener):
+        self._listeners.append(listener)
+
+    def rules(self) -> List[WatchRule]:
+        with self._lock:
+            return list(self._rules.values())
+
+    def add(self, rule: WatchRule) -> List[WatchEvent]:
+        """규칙 추가. 이미 받은 스냅샷으로 바로 평가하여 만족하면 알린다"""
+        events = []
+        with self._lock:
+            self._rules[rule.rule_id] = rule
+            for name, state in self._states.items():
+                server = self._servers.get(name)
+                if server is None or not rule.applies(server):
+                    continue
+                satisfied = rule.gpus_changed(name, dict(state.gpus))
+                by_processes = rule.processes_changed(name, state.processes)
+                if by_processes is not None:
+                    satisfied = by_processes
+                self._transition(rule, name, bool(satisfied), events)
+            self._save()
+        self._deliver(events)
+        return events
+
+    def remove(self, rule_id: str) -> bool:
+        with self._lock:
+            if self._rules.pop(rule_id, None) is None:
+                return False
+            self._drop_keys(rule_id)
+            self._save()
+            return True
+
+    def _drop_keys(self, rule_id: str):
+        for key in [key for key in self._armed if key[0] == rule_id]:
+            del self._armed[key]
+        self._pending = {key for key in self._pending if key[0] != rule_id}
+        for key in [key for key in self._last_fired if key[0] == rule_id]:
+            del self._last_fired[key]
+
+    def set_servers(self, servers: List[Dict]):
+        """servers.json 이 바뀌었을 때. 빠진 서버와 설정이 바뀐 서버의 상태를 버린다"""
+        with self._lock:
+            previous = self._servers
+            self._servers = {server["name"]: server for server in servers}
+            for name in list(self._states):
+                if previous.get(name) != self._servers.get(name):
+                    del self._states[name]
+                    for rule in self._rules.values():
+                        rule.forget(name)
+                    for key in [key for key in self._armed if key[1] == name]:
+                        del self._armed[key]
+                    self._pending = {key for key in self._pending if key[1] != name}
+
+    def watched_servers(self) -> Set[str]:
+        """규칙이 지켜보는 서버 이름 (더 자주 갱신할 대상)"""
+        with self._lock:
+            return {name for name, server in self._servers.items()
+                    if any(rule.applies(server) for rule in self._rules.values())}
+
+    def update(self, server: Dict, snapshot: Optional[ServerSnapshot], error: Optional[str]):
+        """SnapshotCache listener. 직전 스냅샷과 달라진 GPU/프로세스에 대해서만 규칙 평가"""
+        if error is not None or snapshot is None or snapshot.gpu is None:
+            return  # 조회 실패 시 넘어오는 마지막 스냅샷은 이미 평가한 것
+        name = server["name"]
+        events: List[WatchEvent] = []
+        with self._lock:
+            state = self._states.get(name)
+            if state is None:
+                state = self._states[name] = _ServerState()
+            elif snapshot.taken_at <= state.taken_at:
+                return
+            state.taken_at = snapshot.taken_at
+
+            gpus = {gpu.index: gpu.memory_free for gpu in snapshot.gpu.gpus}
+            changes = {index: value for index, value in gpus.items() if state.gpus.get(index) != value}
+            changes.update((index, None) for index in state.gpus if index not in gpus)
+            state.gpus = gpus
+            processes = list(snapshot.gpu.processes)
+            placement = {(proc.pid, proc.gpu_index) for proc in processes}
+            processes_changed = placement != state.placement
+            state.processes, state.placement = processes, placement
+
+            for rule in list(self._rules.values()):
+                if not rule.applies(server):
+                    continue
+                satisfied = rule.gpus_changed(name, changes) if changes else None
+                if processes_changed:
+                    by_processes = rule.processes_changed(name, processes)
+                    if by_processes is not None:
+                        satisfied = by_processes
+                if satisfied is None:
+                    # 바뀐 것이 없어도 debounce 로 미룬 알림은 다시 확인
+                    if (rule.rule_id, name) not in self._pending:
+                        continue
+                    satisfied = True
+                self._transition(rule, name, satisfied, events)
+            if any(self._rules.get(event.rule_id) is None for event in events):
+                self._save()
+        self._deliver(events)
+
+    def _transition(self, rule: WatchRule, server_name: str, satisfied: bool, events: List[WatchEvent]):
+        """만족 여부 변화에 따라 알림 (조건이 풀렸다가 다시 만족될 때만, debounce 간격 유지)"""
+        key = (rule.rule_id, server_name)
+        if not satisfied:
+            self._armed[key] = True
+            self._pending.discard(key)
+            return
+        if not self._armed.get(key, True):
+            return
+        debounce = self.debounce if rule.debounce is None else rule.debounce
+        now = time.monotonic()
+        last = self._last_fired.get(key)
+        if last is not None and now - last < debounce:
+            self._pending.add(key)
+            return
+        self._armed[key] = False
+        self._pending.discard(key)
+        self._last_fired[key] = now
+        events.append(WatchEvent(rule.rule_id, server_name, rule.message(server_name),
+                                 rule.gpu_indexes(server_name), command=rule.command))
+        if rule.once:
+            self._rules.pop(rule.rule_id, None)
+            self._drop_keys(rule.rule_id)
+
+    def _deliver(self, events: List[WatchEvent]):
+        for event in events:
+            command = event.command or self.command
+            if command:
+                try:
+                    subprocess.Popen(command, shell=True, env={**os.environ, **event.env()})
+                except OSError as e:
+                    event.hook_error = str(e)
+            for listener in list(self._listeners):
+                try:
+                    listener(event)
+                except Exception:
+                    pass
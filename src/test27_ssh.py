@@ -1,23 +1,169 @@
 import flet as ft
-import json
 import os
-import subprocess
-import paramiko
-from typing import Dict, List
+import threading
+from typing import TYPE_CHECKING, Dict, List, Optional
 from datetime import datetime
+from dashssh import formatting, sshconfig, vscode
+from dashssh.cache import ServerSnapshot, SnapshotCache, format_age
+from dashssh.cancel import CancelToken
+from dashssh.config import ConfigWatcher, load_config
+from dashssh.daemonclient import DaemonClient, DaemonEntry
+from dashssh.finder import GpuFinder, Placement
+from dashssh.gui.diagnostics import DiagnosticsPanel
+from dashssh.gui.panel import AllServersPanel, ServerStatusPanel
+from dashssh.gui.serverlist import ServerList
+from dashssh.inventory import ServerIndex
+from dashssh.nvsmi import GpuSnapshot, parse_query_output
+from dashssh.metrics import LatencyRecorder
+from dashssh.paths import data_path
+from dashssh.state import StateStore
+from dashssh.watch import GpuFreeRule, ProcessExitRule, WatchEvent, WatchManager, WatchRule, notify_desktop
+
+if TYPE_CHECKING:  # paramiko/numpy 를 불러오므로 실제 import 는 첫 화면을 그린 뒤에
+    from dashssh.collector import Collector
+    from dashssh.history import HistoryStore
+    from dashssh.live import LiveTelemetry
+    from dashssh.summary import ClusterSummary
 
 class SSHConnector:
     def __init__(self, page: ft.Page):
         self.page = page
         self.config = self.load_config()
+        self.metrics = LatencyRecorder()
+        self._collector: Optional["Collector"] = None
+        self._collector_lock = threading.Lock()
+        # servers.json 에 수집 데몬 주소가 있으면 SSH 대신 데몬이 모아 둔 스냅샷을 사용
+        self.daemon = DaemonClient.from_config(self.config)
+        self.snapshot_cache = SnapshotCache.from_config(self.config, self.fetch_snapshot)
+        self._history: Optional["HistoryStore"] = None
+        self._cluster_summary: Optional["ClusterSummary"] = None
+        self._numpy_lock = threading.Lock()
+        self.gpu_finder = GpuFinder(self.config["servers"])
+        # 서버 목록 검색 색인 (servers.json 이 바뀌면 바뀐 서버만 다시 색인)
+        self.server_index = ServerIndex(self.config["servers"])
+        self.card_badges: Dict[str, ft.Row] = {}
+        self.selected_server: Optional[str] = None
+        # 선택 변경과 갱신 결과 표시가 엇갈리지 않도록 (늦게 도착한 이전 서버 결과는 버린다)
+        self._selection_lock = threading.Lock()
+        self.live_stream: Optional["LiveTelemetry"] = None
+        self.status_panels: Dict[str, ServerStatusPanel] = {}
+        self.all_servers_panel: Optional[AllServersPanel] = None
+        self.diagnostics_panel: Optional[DiagnosticsPanel] = None
+        # 지난 실행에서 저장한 스냅샷으로 카드/요약을 먼저 채우고, 이후 갱신될 때마다 저장
+        self.state_store = StateStore.from_config(self.config)
+        self.restored = self.restore_state()
+        self.snapshot_cache.subscribe(self.on_snapshot_updated)
+        if self.state_store is not None:
+            self.snapshot_cache.subscribe(self.state_store.update)
+        # 감시 규칙은 새로 받은 스냅샷(직접 조회 또는 데몬)마다 바뀐 GPU/프로세스만 평가
+        # (저장된 스냅샷은 오래되었을 수 있으므로 넘기지 않는다)
+        self.watches = WatchManager.from_config(self.config)
+        self.watches.subscribe(self.on_watch_event)
+        self.snapshot_cache.subscribe(self.watches.update)
+        self.apply_watched()
         self.setup_page()
         self.setup_icons()  # 아이콘 설정 추가
         self.create_ui()
 
+        # 첫 화면을 그린 뒤 백그라운드에서 SSH 수집기를 준비하고 주기적 갱신 시작
+        # (데몬을 쓰면 데몬의 변경 알림으로 갱신)
+        threading.Thread(target=self.start_background, name="startup", daemon=True).start()
+
+    @property
+    def collector(self) -> "Collector":
+        """SSH 수집기. paramiko 를 불러오므로 처음 사용할 때 생성"""
+        with self._collector_lock:
+            if self._collector is None:
+                from dashssh.collector import Collector
+                self._collector = Collector(self.config, self.metrics)
+            return self._collector
+
+    @property
+    def history(self) -> "HistoryStore":
+        """GPU 사용률 시계열 저장소. numpy 를 불러오므로 처음 사용할 때 생성"""
+        with self._numpy_lock:
+            if self._history is None:
+                from dashssh.history import HistoryStore
+                self._history = HistoryStore.from_config(self.config)
+            return self._history
+
+    @property
+    def cluster_summary(self) -> "ClusterSummary":
+        """GPU 종류별 요약. numpy 를 불러오므로 처음 사용할 때 캐시에 있는 스냅샷으로 채워 생성"""
+        with self._numpy_lock:
+            if self._cluster_summary is None:
+                from dashssh.summary import ClusterSummary
+                summary = ClusterSummary(self.config["servers"])
+                for server in self.config["servers"]:
+                    snapshot = self.snapshot_cache.get(server["name"])
+                    if snapshot is not None:
+                        summary.update(snapshot)
+                self._cluster_summary = summary
+            return self._cluster_summary
+
+    @property
+    def probe_engine(self):
+        return self.collector.engine
+
+    @property
+    def ssh_pool(self):
+        return self.collector.pool
+
+    def restore_state(self) -> List[ServerSnapshot]:
+        """저장된 마지막 스냅샷을 캐시에 넣는다 (갱신 스케줄러가 곧바로 다시 조회하여 맞춘다)"""
+        if self.state_store is None:
+            return []
+        snapshots = self.state_store.load(server["name"] for server in self.config["servers"])
+        for server in self.config["servers"]:
+            snapshot = snapshots.get(server["name"])
+            if snapshot is not None:
+                self.snapshot_cache.put(server, snapshot)
+                self.gpu_finder.update(snapshot)
+                self.server_index.update(snapshot)
+        return list(snapshots.values())
+
+    def start_background(self):
+        vscode.find_vscode()  # 연결 버튼을 처음 누를 때 경로를 찾지 않도록 미리
+        self.history, self.cluster_summary  # numpy import 도 UI 스레드 밖에서 (요약은 복원한 스냅샷으로 채움)
+        try:
+            ConfigWatcher().start(self.on_config_changed, threading.Event())
+        except FileNotFoundError:
+            pass
+        if self.daemon is not None:
+            self.daemon.follow(self.on_daemon_changes, threading.Event())
+        else:
+            self.collector  # paramiko import 와 풀 생성은 UI 스레드 밖에서
+            self.snapshot_cache.start(self.config["servers"])
+
+    def on_config_changed(self, config: Dict):
+        """servers.json 이 바뀌면 서버 목록만 다시 반영 (바뀐 서버의 카드만 새로 만든다)
+
+        계정/풀/캐시 등 다른 항목은 앱을 다시 시작해야 적용된다.
+        """
+        servers = config["servers"]
+        added, removed, changed = self.server_index.set_servers(servers)
+        self.config["servers"] = servers
+        self.snapshot_cache.set_servers(servers)
+        self.gpu_finder.set_servers(servers)
+        self.cluster_summary.set_servers(servers)
+        self.watches.set_servers(servers)
+        self.apply_watched()
+        for name in removed | changed:
+            self.card_badges.pop(name, None)
+            self.status_panels.pop(name, None)
+        if removed or changed:
+            self.all_servers_panel = None  # 다음 전체 조회 때 새 목록으로 다시 만든다
+        if self.selected_server in removed:
+            self.select_server(None)
+        self.server_list.invalidate(removed | changed)
+        self.page.update()
+        if added or removed or changed:
+            self.show_snackbar(f"servers.json 변경 반영: 추가 {len(added)}, 삭제 {len(removed)}, "
+                               f"변경 {len(changed)}", color="green")
+
     def load_config(self) -> Dict:
         try:
-            with open('servers.json', 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_config()
         except FileNotFoundError:
             self.show_error("servers.json 파일을 찾을 수 없습니다.")
             return {"credentials": {"default_username": "", "default_password": ""}, "servers": []}
@@ -42,6 +188,24 @@ class SSHConnector:
                     bgcolor=ft.Colors.BLUE,
                     on_click=self.handle_check_all_gpu_status,
                 ),
+                ft.ElevatedButton(
+                    "빈 GPU 찾기",
+                    color=ft.Colors.WHITE,
+                    bgcolor=ft.Colors.TEAL,
+                    on_click=self.handle_open_finder,
+                ),
+                ft.ElevatedButton(
+                    "알림",
+                    color=ft.Colors.WHITE,
+                    bgcolor=ft.Colors.INDIGO,
+                    on_click=self.handle_open_watches,
+                ),
+                ft.ElevatedButton(
+                    "진단",
+                    color=ft.Colors.WHITE,
+                    bgcolor=ft.Colors.BLUE_GREY,
+                    on_click=self.handle_open_diagnostics,
+                ),
                 ft.ElevatedButton(
                     "Linux 사용 매뉴얼",
                     color=ft.Colors.WHITE,
@@ -66,6 +230,7 @@ class SSHConnector:
                     ft.Text("GPU 상태", size=20, weight=ft.FontWeight.BOLD),
                     ft.Text("서버를 선택하여 GPU 상태를 확인하세요", 
                         size=14, color=ft.Colors.GREY_600),
+                    *self.restored_note(),
                 ],
                 scroll=ft.ScrollMode.AUTO,
             ),
@@ -98,9 +263,251 @@ class SSHConnector:
         
         
     def handle_check_all_gpu_status(self, e):
-        """GPU 현황 확인 버튼 핸들러 - 웹사이트로 리다이렉션"""
-        import webbrowser
-        webbrowser.open('http://10.201.135.113:8890')
+        """GPU 현황 확인 버튼 핸들러 - 모든 서버 상태를 한 화면에 표시"""
+        self.page.run_task(self.check_all_gpu_status)
+
+    def handle_open_finder(self, e):
+        """빈 GPU 찾기 대화상자 (캐시된 스냅샷 색인으로 즉시 검색)"""
+        count_field = ft.TextField(label="GPU 수", value="1", width=100,
+                                   keyboard_type=ft.KeyboardType.NUMBER)
+        memory_field = ft.TextField(label="GPU 당 최소 여유 메모리 (GB)", value="10", width=220,
+                                    keyboard_type=ft.KeyboardType.NUMBER)
+        spec_dropdown = ft.Dropdown(
+            label="GPU 종류",
+            width=250,
+            value="",
+            options=[ft.dropdown.Option("", "전체")]
+                    + [ft.dropdown.Option(spec) for spec in self.gpu_finder.specs()],
+        )
+        results = ft.Column(spacing=5, scroll=ft.ScrollMode.AUTO, height=350)
+        servers = {server["name"]: server for server in self.config["servers"]}
+
+        def placement_row(placement: Placement) -> ft.Control:
+            server = servers[placement.server_name]
+            return ft.Row(
+                controls=[
+                    ft.Text(
+                        f"{placement.server_name} · GPU {placement.cuda_visible_devices} · "
+                        f"최소 여유 {placement.min_free_mib / 1024:.1f}GB · "
+                        f"사용률 {placement.mean_utilization:.0f}% · "
+                        f"함께 실행 중 {placement.co_tenants} · {format_age(placement.age)}",
+                        size=14,
+                        expand=True,
+                    ),
+                    ft.ElevatedButton(
+                        "연결",
+                        color=ft.Colors.WHITE,
+                        bgcolor=ft.Colors.BLUE,
+                        on_click=lambda e, s=server, p=placement: self.connect_to_placement(dialog, s, p),
+                    ),
+                ],
+            )
+
+        def refresh_results(e=None):
+            try:
+                count = int(count_field.value or 0)
+                min_free = float(memory_field.value or 0)
+            except ValueError:
+                results.controls = [ft.Text("숫자를 입력하세요.", color=ft.Colors.RED_400)]
+                self.page.update()
+                return
+            placements = self.gpu_finder.find(count, min_free, spec_dropdown.value or None)
+            if placements:
+                results.controls = [placement_row(placement) for placement in placements]
+            else:
+                results.controls = [ft.Text("조건에 맞는 GPU 가 없습니다. (최근 조회된 서버 기준)",
+                                            color=ft.Colors.GREY_600)]
+            self.page.update()
+
+        for control in (count_field, memory_field, spec_dropdown):
+            control.on_change = refresh_results
+
+        dialog = ft.AlertDialog(
+            title=ft.Text("빈 GPU 찾기"),
+            content=ft.Column(
+                controls=[ft.Row([count_field, memory_field, spec_dropdown]), ft.Divider(), results],
+                width=800,
+                tight=True,
+            ),
+            actions=[
+                ft.TextButton("이 조건으로 알림 받기", on_click=lambda e: watch_results()),
+                ft.TextButton("닫기", on_click=lambda e: self.page.close(dialog)),
+            ],
+        )
+
+        def watch_results():
+            try:
+                rule = GpuFreeRule(int(count_field.value or 0), float(memory_field.value or 0),
+                                   spec_dropdown.value or None)
+            except ValueError:
+                results.controls = [ft.Text("숫자를 입력하세요.", color=ft.Colors.RED_400)]
+                self.page.update()
+                return
+            self.page.close(dialog)
+            self.add_watch(rule)
+
+        self.page.open(dialog)
+        refresh_results()
+
+    def handle_open_watches(self, e):
+        """감시 규칙 목록과 추가 대화상자 (빈 GPU 생김 / 프로세스 종료)"""
+        server_names = [server["name"] for server in self.config["servers"]]
+        kind_dropdown = ft.Dropdown(
+            label="알림 종류",
+            width=200,
+            value=GpuFreeRule.kind,
+            options=[ft.dropdown.Option(GpuFreeRule.kind, "빈 GPU 생김"),
+                     ft.dropdown.Option(ProcessExitRule.kind, "프로세스 종료")],
+        )
+        server_dropdown = ft.Dropdown(
+            label="서버",
+            width=200,
+            value="",
+            options=[ft.dropdown.Option("", "전체")] + [ft.dropdown.Option(name) for name in server_names],
+        )
+        count_field = ft.TextField(label="GPU 수", value="1", width=100,
+                                   keyboard_type=ft.KeyboardType.NUMBER)
+        memory_field = ft.TextField(label="GPU 당 최소 여유 메모리 (GB)", value="10", width=220,
+                                    keyboard_type=ft.KeyboardType.NUMBER)
+        spec_dropdown = ft.Dropdown(
+            label="GPU 종류",
+            width=250,
+            value="",
+            options=[ft.dropdown.Option("", "전체")]
+                    + [ft.dropdown.Option(spec) for spec in self.gpu_finder.specs()],
+        )
+        pid_field = ft.TextField(label="PID", width=120, keyboard_type=ft.KeyboardType.NUMBER)
+        user_field = ft.TextField(label="또는 사용자 (모든 GPU 프로세스)", width=250)
+        command_field = ft.TextField(label="알림 시 실행할 명령 (선택)", expand=True,
+                                     hint_text="예: python train.py (CUDA_VISIBLE_DEVICES 가 설정됨)")
+        gpu_row = ft.Row([count_field, memory_field, spec_dropdown])
+        process_row = ft.Row([pid_field, user_field], visible=False)
+        message = ft.Text("", size=14, color=ft.Colors.RED_400)
+        rule_list = ft.Column(spacing=5, scroll=ft.ScrollMode.AUTO, height=250)
+
+        def rule_row(rule: WatchRule) -> ft.Control:
+            return ft.Row(
+                controls=[
+                    ft.Text(rule.describe() + (f" · 실행: {rule.command}" if rule.command else ""),
+                            size=14, expand=True),
+                    ft.IconButton(ft.Icons.DELETE_OUTLINE, tooltip="삭제",
+                                  on_click=lambda e, rule_id=rule.rule_id: remove(rule_id)),
+                ],
+            )
+
+        def refresh_rules():
+            rules = self.watches.rules()
+            rule_list.controls = ([rule_row(rule) for rule in rules] if rules else
+                                  [ft.Text("등록된 알림이 없습니다.", color=ft.Colors.GREY_600)])
+            self.page.update()
+
+        def remove(rule_id: str):
+            self.watches.remove(rule_id)
+            self.apply_watched()
+            refresh_rules()
+
+        def on_kind_change(e=None):
+            watching_gpus = kind_dropdown.value == GpuFreeRule.kind
+            gpu_row.visible = watching_gpus
+            process_row.visible = not watching_gpus
+            if not watching_gpus and not server_dropdown.value:
+                server_dropdown.value = self.selected_server or (server_names[0] if server_names else "")
+            self.page.update()
+
+        def add(e):
+            options = {"command": (command_field.value or "").strip() or None}
+            pid, user = (pid_field.value or "").strip(), (user_field.value or "").strip()
+            if kind_dropdown.value == ProcessExitRule.kind and not server_dropdown.value:
+                message.value = "서버를 선택하세요."
+            elif kind_dropdown.value == ProcessExitRule.kind and not (pid or user):
+                message.value = "PID 또는 사용자를 입력하세요."
+            else:
+                try:
+                    if kind_dropdown.value == GpuFreeRule.kind:
+                        rule = GpuFreeRule(int(count_field.value or 0), float(memory_field.value or 0),
+                                           spec_dropdown.value or None, server_dropdown.value or None, **options)
+                    else:
+                        rule = ProcessExitRule(server_dropdown.value, int(pid) if pid else None, user or None,
+                                               **options)
+                except ValueError:
+                    message.value = "숫자를 입력하세요."
+                else:
+                    message.value = ""
+            if message.value:
+                self.page.update()
+                return
+            self.add_watch(rule, announce=False)
+            refresh_rules()
+
+        kind_dropdown.on_change = on_kind_change
+        dialog = ft.AlertDialog(
+            title=ft.Text("알림"),
+            content=ft.Column(
+                controls=[
+                    ft.Text("조건이 만족되면 알림을 보냅니다. 서버 상태가 새로 조회될 때마다 확인하며, "
+                            "알림 대상 서버는 더 자주 조회합니다.", size=12, color=ft.Colors.GREY_600),
+                    ft.Row([kind_dropdown, server_dropdown]),
+                    gpu_row,
+                    process_row,
+                    ft.Row([command_field, ft.ElevatedButton("추가", on_click=add)]),
+                    message,
+                    ft.Divider(),
+                    rule_list,
+                ],
+                width=800,
+                tight=True,
+            ),
+            actions=[ft.TextButton("닫기", on_click=lambda e: self.page.close(dialog))],
+        )
+        self.page.open(dialog)
+        refresh_rules()
+
+    def add_watch(self, rule: WatchRule, announce: bool = True):
+        """감시 규칙 추가. 이미 받은 상태로 만족하면 바로 알린다"""
+        if announce:
+            self.show_snackbar(f"알림 등록: {rule.describe()}", color="green")
+        self.watches.add(rule)
+        self.apply_watched()
+
+    def apply_watched(self):
+        """감시 규칙 대상 서버는 watch.refresh_interval 주기로 갱신"""
+        self.snapshot_cache.set_watched(self.watches.watched_servers(), self.watches.refresh_interval)
+
+    def on_watch_event(self, event: WatchEvent):
+        """규칙이 만족되었을 때 (스냅샷을 받은 작업 스레드에서 실행)"""
+        text = event.message
+        if event.hook_error:
+            text += f" (명령 실행 실패: {event.hook_error})"
+        self.show_snackbar(f"알림: {text}", color="green")
+        if self.watches.desktop:
+            notify_desktop("DASH-SSH", event.message)
+
+    def handle_open_diagnostics(self, e):
+        """서버/단계별 지연 시간 (p50/p95/max) 패널 표시"""
+        self.stop_live()
+        self.select_server(None)
+        if self.diagnostics_panel is None:
+            self.diagnostics_panel = DiagnosticsPanel(self.metrics, self.export_metrics, self.health_rows)
+        self.diagnostics_panel.refresh()
+        self.gpu_status_container.content = self.diagnostics_panel.root
+        self.page.update()
+
+    def health_rows(self) -> List[Dict]:
+        """서버별 연결 상태 (수집기를 아직 만들지 않았으면 없음)"""
+        return self._collector.pool.health.rows() if self._collector is not None else []
+
+    def export_metrics(self, kind: str):
+        """측정값을 데이터 폴더에 JSON 또는 Prometheus 텍스트로 저장"""
+        try:
+            path = self.metrics.export(data_path("metrics.prom" if kind == "prom" else "metrics.json"))
+            self.show_snackbar(f"저장됨: {path}", color="green")
+        except OSError as e:
+            self.show_error(f"저장 실패: {str(e)}")
+
+    def connect_to_placement(self, dialog: ft.AlertDialog, server: Dict, placement: Placement):
+        """추천 배치의 서버에 연결하고 CUDA_VISIBLE_DEVICES 값을 안내"""
+        self.page.close(dialog)
+        self.connect_to_server(server, cuda_visible_devices=placement.cuda_visible_devices)
 
     def handle_open_manual(self, e):
         """Linux 사용 매뉴얼 버튼 핸들러"""
@@ -123,119 +530,60 @@ class SSHConnector:
         
     async def check_all_gpu_status(self):
         try:
-            total_servers = len(self.config["servers"])
-            current_server = 0
-            
-            # 프로그레스 표시 UI 생성
-            progress_bar = ft.ProgressBar(width=400, value=0)
-            progress_text = ft.Text("서버 연결 준비 중...", size=14, color=ft.colors.GREY_600)
-            server_status_text = ft.Text("", size=14, color=ft.colors.GREY_600)
-            
-            loading_content = ft.Column(
-                controls=[
-                    ft.Text("모든 GPU 상태 로딩 중...", size=20, weight=ft.FontWeight.BOLD),
-                    ft.Container(height=20),
-                    progress_bar,
-                    ft.Container(height=10),
-                    progress_text,
-                    server_status_text,
-                ],
-                horizontal_alignment=ft.CrossAxisAlignment.CENTER
-            )
-            self.gpu_status_container.content = loading_content
+            self.stop_live()
+            self.select_server(None)
+
+            # 전체 조회 패널은 한 번만 만들고 이후에는 바뀐 값만 갱신
+            if self.all_servers_panel is None:
+                self.all_servers_panel = AllServersPanel(self.config["servers"])
+            panel = self.all_servers_panel
+            if self.daemon is not None:
+                panel.start(f"수집 데몬에서 {len(self.config['servers'])}개 서버 상태를 받는 중")
+            else:
+                panel.start(f"{len(self.config['servers'])}개 서버 동시 조회 중 "
+                            f"(최대 {self.probe_engine.max_concurrency}개)")
+            panel.update_summary(self.cluster_summary.summarize())  # 조회가 끝나기 전에는 캐시된 상태로 요약
+            self.gpu_status_container.content = panel.root
             self.page.update()
 
-            # 모든 서버의 상태 정보를 저장할 리스트
-            all_status = []
-
-            # 각 서버에 대해 상태 확인
-            for server in self.config["servers"]:
-                current_server += 1
-                progress = current_server / total_servers
-                
-                # 프로그레스 업데이트
-                progress_bar.value = progress
-                progress_text.value = f"진행 상황: {current_server}/{total_servers} ({int(progress * 100)}%)"
-                server_status_text.value = f"현재 서버: {server['name']} ({server['ip']})"
-                self.page.update()
+            username = self.username_field.value or self.config["credentials"]["default_username"]
+            password = self.password_field.value or self.config["credentials"]["default_password"]
 
-                try:
-                    ssh = paramiko.SSHClient()
-                    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-                    
-                    username = self.username_field.value or self.config["credentials"]["default_username"]
-                    password = self.password_field.value or self.config["credentials"]["default_password"]
-                    
-                    server_status_text.value = f"'{server['name']}' 연결 중..."
-                    self.page.update()
-                    
-                    try:
-                        ssh_key_path = os.path.expanduser('~/.ssh/id_rsa')
-                        ssh.connect(server["ip"], username=username, key_filename=ssh_key_path)
-                    except Exception:
-                        ssh.connect(server["ip"], username=username, password=password)
-
-                    server_status_text.value = f"'{server['name']}' GPU 정보 수집 중..."
+            # 모든 서버를 병렬로 조회하고 끝나는 순서대로 표시 (데몬을 쓰면 한 번의 요청으로 전체)
+            source = self.daemon or self.collector
+            async for result, snapshot in source.sweep(self.config["servers"], username, password):
+                server = result.server
+                if snapshot is not None:
+                    # 전체 조회 결과도 캐시에 반영 (카드 배지, 기록, 빈 GPU 색인 갱신)
+                    self.snapshot_cache.put(server, snapshot)
+                    # 데몬의 스냅샷은 이번에 조회한 것이 아니므로 얼마나 오래됐는지 표시
+                    note = f"{result.elapsed:.1f}초" if source is not self.daemon else f"(데몬 {format_age(snapshot.age)} 조회)"
+
+                with self.metrics.time(server["name"], "render"):
+                    panel.add_result(
+                        server["name"],
+                        f"{server['name']} ({server['ip']}): "
+                        + (f"완료 {note}" if result.ok else f"실패 - {result.error}"),
+                        result.ok,
+                        snapshot,
+                        f"연결 실패: {result.error}",
+                    )
                     self.page.update()
-                    
-                    stdin, stdout, stderr = ssh.exec_command('nvidia-smi')
-                    output = stdout.read().decode()
-                    
-                    all_status.append({
-                        "server_name": server["name"],
-                        "status": self.format_gpu_info(output)
-                    })
-                    
-                    ssh.close()
-                    
-                except Exception as e:
-                    all_status.append({
-                        "server_name": server["name"],
-                        "status": f"연결 실패: {str(e)}"
-                    })
 
             # 프로그레스 완료 표시
-            progress_text.value = "모든 서버 정보 수집 완료!"
-            server_status_text.value = "결과 생성 중..."
-            self.page.update()
-
-            # 전체 상태 정보를 하나의 문자열로 결합
-            combined_status = "\n\n".join([
-                f"=== {status['server_name']} ===\n{status['status']}"
-                for status in all_status
-            ])
-
-            # 최종 UI 업데이트
-            status_content = ft.Column(
-                controls=[
-                    ft.Row(
-                        controls=[
-                            ft.Text("전체 GPU 상태", size=20, weight=ft.FontWeight.BOLD),
-                            ft.Container(width=20),
-                            ft.Text(f"마지막 업데이트: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", 
-                                size=14, color=ft.colors.GREY_600),
-                        ],
-                    ),
-                    ft.Divider(height=1, color=ft.colors.GREY_300),
-                    ft.Container(
-                        content=ft.Text(combined_status, 
-                                    size=14, 
-                                    font_family="Consolas",
-                                    selectable=True),
-                        bgcolor=ft.colors.GREY_50,
-                        padding=10,
-                        border_radius=5,
-                    ),
-                ],
-                scroll=ft.ScrollMode.AUTO,
-            )
-
-            self.gpu_status_container.content = status_content
+            panel.finish(datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
             self.page.update()
 
         except Exception as e:
             self.show_error(f"GPU 상태 확인 실패: {str(e)}")
 
+    def render_gpu_output(self, server: Dict, output: str, ps_output: str = "") -> str:
+        """수집 방식에 맞게 GPU 출력 포맷팅 (UI 스레드에서 불리므로 collector 를 만들지 않고 설정만 읽는다)"""
+        mode = server.get("collection") or self.config.get("probe", {}).get("collection", "query")
+        if mode != "table":
+            return self.format_gpu_records(parse_query_output(output))
+        return self.format_gpu_info(output, ps_output)
+
     def create_left_panel(self):
         # Credentials Section
         self.username_field = ft.TextField(
@@ -264,12 +612,8 @@ class SSHConnector:
             spacing=20,
         )
 
-        # 서버 목록
-        server_list = ft.Column(
-            controls=[self.create_server_card(server) for server in self.config["servers"]],
-            scroll=ft.ScrollMode.AUTO,
-            spacing=10,
-        )
+        # 서버 목록 (검색 + 보이는 카드만 만드는 ListView)
+        self.server_list = ServerList(self.server_index, self.create_server_card)
 
         return ft.Container(
             content=ft.Column(
@@ -277,9 +621,8 @@ class SSHConnector:
                     credentials_column,
                     ft.Divider(height=1, color=ft.colors.GREY_300),
                     ft.Text("서버 목록", size=16, weight=ft.FontWeight.BOLD),
-                    server_list,
+                    self.server_list.root,
                 ],
-                scroll=ft.ScrollMode.AUTO,
                 spacing=20,
             ),
             width=400,
@@ -287,6 +630,11 @@ class SSHConnector:
         )
 
     def create_server_card(self, server: Dict) -> ft.Card:
+        # 캐시된 스냅샷 기준 빈 GPU / 여유 메모리 표시
+        badges = ft.Row(spacing=5)
+        self.card_badges[server["name"]] = badges
+        self.update_card_badges(server["name"], self.snapshot_cache.get(server["name"]))
+
         return ft.Card(
             content=ft.Container(
                 content=ft.Column(
@@ -295,6 +643,7 @@ class SSHConnector:
                         ft.Text(f"IP: {server['ip']}", size=14, color=ft.Colors.GREY_700),
                         ft.Text(f"GPU: {server['gpu_count']}x {server['gpu_spec']}", 
                                size=14, color=ft.Colors.GREY_700),
+                        badges,
                         ft.Row(
                             controls=[
                                 ft.ElevatedButton(
@@ -319,220 +668,268 @@ class SSHConnector:
         )
         
 
+    def restored_note(self) -> List[ft.Control]:
+        """지난 실행에서 저장한 상태로 시작했다면 안내 문구"""
+        if not self.restored:
+            return []
+        newest = min(snapshot.age for snapshot in self.restored)
+        return [ft.Text(f"지난 실행에서 저장한 상태를 표시하고 있습니다 ({len(self.restored)}개 서버, "
+                        f"가장 최근 {format_age(newest)}). 백그라운드에서 새로 조회합니다.",
+                        size=12, color=ft.Colors.BLUE_400)]
+
+    def update_card_badges(self, server_name: str, snapshot: Optional[ServerSnapshot]):
+        """서버 카드의 빈 GPU / 여유 메모리 배지 갱신"""
+        badges = self.card_badges.get(server_name)
+        if badges is None:
+            return
+
+        def badge(text: str, color) -> ft.Container:
+            return ft.Container(
+                content=ft.Text(text, size=12, color=ft.Colors.WHITE),
+                bgcolor=color,
+                border_radius=10,
+                padding=ft.padding.symmetric(horizontal=8, vertical=2),
+            )
+
+        free_gpus = snapshot.free_gpu_count() if snapshot else None
+        free_memory = snapshot.free_memory_mib() if snapshot else None
+        if free_gpus is None:
+            badges.controls = [badge("GPU 정보 없음", ft.Colors.GREY_400)]
+        else:
+            badges.controls = [
+                badge(f"빈 GPU {free_gpus}", ft.Colors.GREEN_400 if free_gpus else ft.Colors.RED_300),
+                badge(f"여유 메모리 {free_memory / 1024:.1f}GB", ft.Colors.BLUE_GREY_400),
+                badge(datetime.fromtimestamp(snapshot.taken_at).strftime('%H:%M' if snapshot.age < 86400 else '%m/%d %H:%M')
+                      + " 기준", ft.Colors.GREY_400),
+            ]
+
+    def fetch_snapshot(self, server: Dict, cancel: Optional[CancelToken] = None) -> ServerSnapshot:
+        """서버를 조회하여 스냅샷 생성 (캐시 갱신 스레드에서 실행)"""
+        username = self.username_field.value or self.config["credentials"]["default_username"]
+        password = self.password_field.value or self.config["credentials"]["default_password"]
+
+        if self.daemon is not None:
+            return self.daemon.fetch_snapshot(server)
+        return self.collector.fetch_snapshot(server, username, password, cancel=cancel)
+
+    def select_server(self, name: Optional[str]):
+        """상태 패널에 표시할 서버 변경. 이전 서버의 진행 중인 갱신은 취소하여 새 선택에 자리를 비운다"""
+        with self._selection_lock:
+            previous, self.selected_server = self.selected_server, name
+        if previous is not None and previous != name:
+            self.snapshot_cache.cancel(previous)
+
+    def on_daemon_changes(self, entries: Dict[str, DaemonEntry]):
+        """수집 데몬이 새로 조회한 서버들을 캐시에 반영 (데몬 follow 스레드에서 실행)"""
+        servers = {server["name"]: server for server in self.config["servers"]}
+        for name, (snapshot, error) in entries.items():
+            if name in servers:
+                self.snapshot_cache.put(servers[name], snapshot, error)
+
+    def record_history(self, server_name: str, snapshot: Optional[ServerSnapshot]):
+        """스냅샷의 GPU 사용률/메모리를 시계열 저장소에 기록"""
+        if snapshot is None or snapshot.gpu is None:
+            return
+        try:
+            # 에이전트 조회는 지난 조회 이후의 샘플을 함께 받으므로 모두 기록
+            for taken_at, gpus in snapshot.samples or [(snapshot.taken_at, snapshot.gpu.gpus)]:
+                self.history.record(server_name, gpus, taken_at)
+        except OSError:
+            pass
+
+    def format_history(self, server_name: str, gpu_indexes: List[int], hours: float = 6) -> str:
+        """GPU 별 최근 사용률을 스파크라인으로 표시"""
+        import numpy as np
+        from dashssh.history import sparkline
+
+        now = datetime.now().timestamp()
+        keys = [(server_name, index) for index in gpu_indexes]
+        util = self.history.sparklines(keys, now - hours * 3600, now, points=48)
+        mem = self.history.sparklines(keys, now - hours * 3600, now, points=48, field="mem")
+        lines = []
+        for key in keys:
+            total = self.history.memory_total(*key) or 0
+            avg_util = util[key][~np.isnan(util[key])]
+            avg_mem = mem[key][~np.isnan(mem[key])]
+            if not len(avg_util):
+                lines.append(f"GPU {key[1]:<2} 기록 없음")
+                continue
+            mem_ratio = f"{avg_mem.mean() / total * 100:3.0f}%" if total else "N/A"
+            lines.append(f"GPU {key[1]:<2} {sparkline(util[key])} "
+                         f"평균 사용률 {avg_util.mean():3.0f}% / 메모리 {mem_ratio}")
+        return '\n'.join(lines)
+
+    def on_snapshot_updated(self, server: Dict, snapshot: Optional[ServerSnapshot], error: Optional[str]):
+        """캐시 갱신 완료 시 카드 배지와 (선택된 서버라면) 상태 패널 갱신"""
+        if error is None:
+            self.record_history(server["name"], snapshot)
+            if snapshot is not None:
+                self.gpu_finder.update(snapshot)
+                self.cluster_summary.update(snapshot)
+                if self.server_index.update(snapshot):
+                    self.server_list.on_live_change()
+        self.update_card_badges(server["name"], snapshot)
+        with self.metrics.time(server["name"], "render"):
+            panel = self.all_servers_panel
+            if panel is not None and self.gpu_status_container.content is panel.root:
+                # 전체 조회 화면이 열려 있으면 요약만 다시 집계 (바뀐 셀만 전송)
+                panel.update_summary(self.cluster_summary.summarize())
+            with self._selection_lock:
+                selected = self.selected_server == server["name"] and self.live_stream is None
+            if selected:
+                if snapshot is not None:
+                    self.render_server_status(server, snapshot, error=error)
+                else:
+                    self.show_error(f"상태 확인 실패: {error}")
+            self.page.update()
+
     def update_gpu_status(self, server: Dict):
         try:
-            # 로딩 중 메시지 표시
-            loading_content = ft.Column(
-                controls=[
-                    ft.Row(
+            self.stop_live()
+            self.select_server(server["name"])
+
+            # 선택 잠금은 선택된 서버를 읽을 때만 잡는다 (화면 전송 중에 갱신 스레드가 기다리지 않도록)
+            with self._selection_lock:
+                selected = self.selected_server
+            if selected != server["name"]:
+                return  # 그 사이 다른 서버가 선택됨
+            with self.metrics.time(server["name"], "render"):
+                snapshot = self.snapshot_cache.get(server["name"])
+                fresh = self.snapshot_cache.is_fresh(server["name"])
+                if snapshot is not None:
+                    # 캐시된 스냅샷을 바로 보여주고 오래된 경우 백그라운드에서 갱신
+                    shown = self.render_server_status(server, snapshot, refreshing=not fresh)
+                else:
+                    # 로딩 중 메시지 표시
+                    loading_content = ft.Column(
                         controls=[
-                            ft.Text("서버 정보 로딩 중...", size=20, weight=ft.FontWeight.BOLD),
-                            ft.Container(width=20),
-                            ft.Text("정보 업데이트 중입니다. 잠시만 기다려주세요.", size=14, color=ft.colors.GREY_600),
+                            ft.Row(
+                                controls=[
+                                    ft.Text("서버 정보 로딩 중...", size=20, weight=ft.FontWeight.BOLD),
+                                    ft.Container(width=20),
+                                    ft.Text("정보 업데이트 중입니다. 잠시만 기다려주세요.", size=14, color=ft.colors.GREY_600),
+                                ],
+                            ),
                         ],
-                    ),
-                ],
-            )
-            self.gpu_status_container.content = loading_content
-            self.page.update()
+                    )
+                    shown = self.show_if_selected(server["name"], loading_content)
+                if shown:
+                    self.page.update()
 
-            # SSH 연결
-            ssh = paramiko.SSHClient()
-            ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            if not fresh:
+                self.snapshot_cache.refresh(server)
             
-            username = self.username_field.value or self.config["credentials"]["default_username"]
-            password = self.password_field.value or self.config["credentials"]["default_password"]
-            
-            try:
-                ssh.connect(server["ip"], username=username, key_filename=os.path.expanduser('~/.ssh/id_rsa'))
-            except Exception:
-                ssh.connect(server["ip"], username=username, password=password)
+        except Exception as e:
+            self.show_error(f"상태 확인 실패: {str(e)}")
 
-            # 사용자 정보 얻기
-            stdin, stdout, stderr = ssh.exec_command('w -h')  # -h 옵션은 헤더를 제외
-            users_output = stdout.read().decode()
-            
-            # GPU 정보 얻기
-            stdin, stdout, stderr = ssh.exec_command('nvidia-smi')
-            gpu_output = stdout.read().decode()
+    def show_if_selected(self, name: str, content: ft.Control) -> bool:
+        """name 이 아직 선택된 서버일 때만 상태 영역에 content 를 표시 (그 사이 선택된 다른 서버를 덮지 않음)"""
+        with self._selection_lock:
+            if self.selected_server != name:
+                return False
+            self.gpu_status_container.content = content
+            return True
 
-            # 출력 포맷팅
-            formatted_gpu = self.format_gpu_info(gpu_output)
-            formatted_users = self.format_user_info(users_output)
+    def render_server_status(self, server: Dict, snapshot: ServerSnapshot,
+                             refreshing: bool = False, error: Optional[str] = None) -> bool:
+        """스냅샷으로 상태 패널 갱신 (서버별 패널을 재사용하고 바뀐 값만 전송). 표시했으면 True"""
+        panel = self.get_status_panel(server)
+        sections = snapshot.sections
 
-            # 상태 정보 업데이트
-            status_content = ft.Column(
-                controls=[
-                    ft.Row(
-                        controls=[
-                            ft.Text(f"{server['name']} 상태", size=20, weight=ft.FontWeight.BOLD),
-                            ft.Container(width=20),
-                            ft.Text(f"마지막 업데이트: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", 
-                                size=14, color=ft.colors.GREY_600),
-                        ],
-                    ),
-                    ft.Divider(height=1, color=ft.colors.GREY_300),
-                    # 사용자 정보 표시
-                    ft.Container(
-                        content=ft.Column([
-                            ft.Text("현재 접속 중인 사용자", size=16, weight=ft.FontWeight.BOLD),
-                            ft.Container(
-                                content=ft.Text(formatted_users, 
-                                            size=14, 
-                                            font_family="Consolas",
-                                            selectable=True),
-                                bgcolor=ft.colors.GREY_50,
-                                padding=10,
-                                border_radius=5,
-                            ),
-                        ]),
-                        margin=ft.margin.only(bottom=20),
-                    ),
-                    # GPU 정보 표시
-                    ft.Container(
-                        content=ft.Column([
-                            ft.Text("GPU 상태", size=16, weight=ft.FontWeight.BOLD),
-                            ft.Container(
-                                content=ft.Text(formatted_gpu, 
-                                            size=14, 
-                                            font_family="Consolas",
-                                            selectable=True),
-                                bgcolor=ft.colors.GREY_50,
-                                padding=10,
-                                border_radius=5,
-                            ),
-                        ]),
-                    ),
-                ],
-                scroll=ft.ScrollMode.AUTO,
-            )
+        formatted_history = None
+        if snapshot.gpu is not None and snapshot.gpu.gpus:
+            formatted_history = self.format_history(server["name"], [gpu.index for gpu in snapshot.gpu.gpus])
+        panel.set_texts(self.format_system_info(sections),
+                        self.format_user_info(sections.get("users", "")),
+                        formatted_history)
+
+        if snapshot.gpu is not None:
+            panel.update_gpus(snapshot.gpu.gpus)
+            panel.update_processes(snapshot.gpu.processes)
+        else:
+            panel.show_gpu_text(self.render_gpu_output(server, sections.get("gpu", ""), sections.get("procs", "")))
+
+        taken_at = datetime.fromtimestamp(snapshot.taken_at).strftime('%Y-%m-%d %H:%M:%S')
+        if error:
+            status_note = f"갱신 실패: {error}"
+        elif refreshing:
+            status_note = "갱신 중..."
+        else:
+            status_note = ""
+        panel.set_header(f"마지막 업데이트: {taken_at} ({format_age(snapshot.age)})", status_note, bool(error))
+        panel.set_live(False)
 
-            self.gpu_status_container.content = status_content
+        return self.show_if_selected(server["name"], panel.root)
+
+    def get_status_panel(self, server: Dict) -> ServerStatusPanel:
+        panel = self.status_panels.get(server["name"])
+        if panel is None:
+            panel = self.status_panels[server["name"]] = ServerStatusPanel(server, self.toggle_live)
+        return panel
+
+    def toggle_live(self, server: Dict):
+        if self.live_stream is not None and self.selected_server == server["name"]:
+            self.update_gpu_status(server)
+        else:
+            self.start_live(server)
+
+    def start_live(self, server: Dict):
+        """채널 하나로 nvidia-smi 루프를 실행하여 GPU 상태를 실시간으로 표시"""
+        self.stop_live()
+        self.select_server(server["name"])
+        username = self.username_field.value or self.config["credentials"]["default_username"]
+        password = self.password_field.value or self.config["credentials"]["default_password"]
+
+        panel = self.get_status_panel(server)
+        panel.set_live(True)
+        panel.set_header("실시간 스트림 연결 중...")
+        self.gpu_status_container.content = panel.root
+        self.page.update()
+
+        def on_frame(gpus):
+            self.history.record(server["name"], gpus)
+            # GPU 행에서 바뀐 셀만 갱신
+            panel.update_gpus(gpus)
+            panel.set_header(f"실시간 · 마지막 수신: {datetime.now().strftime('%H:%M:%S')}")
             self.page.update()
 
-            ssh.close()
-            
-        except Exception as e:
-            self.show_error(f"상태 확인 실패: {str(e)}")
-            
+        def on_error(message):
+            panel.set_header("", f"스트림 중단: {message}", is_error=True)
+            self.page.update()
+
+        from dashssh.live import LiveTelemetry
+
+        self.live_stream = LiveTelemetry.from_config(
+            self.config,
+            lambda: self.ssh_pool.get_transport(server["ip"], username, password,
+                                                **self.ssh_pool.server_options(server)),
+            on_frame,
+            on_error=on_error,
+            keepalive=lambda: self.ssh_pool.touch(server["ip"], username, server.get("port", 22)),
+        )
+        self.live_stream.start()
+
+    def stop_live(self):
+        """실시간 스트림 중단 (원격 루프 종료 및 채널 해제)"""
+        if self.live_stream is not None:
+            self.live_stream.stop()
+            self.live_stream = None
+
+    def format_system_info(self, sections: Dict[str, str]) -> str:
+        """부하/메모리/디스크 섹션을 요약"""
+        return formatting.format_system_info(sections)
+
     def format_user_info(self, output: str) -> str:
         """사용자 정보를 포맷팅"""
-        if not output.strip():
-            return "현재 접속 중인 사용자가 없습니다."
-            
-        lines = output.strip().split('\n')
-        
-        # 테이블 설정
-        table_width = 75
-        user_width = 15
-        tty_width = 10
-        from_width = 20
-        login_width = 15
-        what_width = table_width - user_width - tty_width - from_width - login_width - 9  # 구분자 여백
-        
-        # 테이블 생성
-        border = "+" + "-" * table_width + "+"
-        header = f"| {'사용자':^{user_width}} | {'TTY':^{tty_width}} | {'접속위치':^{from_width}} | {'로그인시간':^{login_width}} | {'작업':^{what_width}} |"
-        
-        formatted_output = [
-            border,
-            header,
-            border
-        ]
-        
-        # 사용자 정보 추가
-        for line in lines:
-            if not line.strip():
-                continue
-                
-            parts = line.split()
-            if len(parts) >= 5:
-                user = parts[0][:user_width]
-                tty = parts[1][:tty_width]
-                from_loc = parts[2][:from_width]
-                login_time = ' '.join(parts[3:5])[:login_width]
-                what = ' '.join(parts[5:])[:what_width] if len(parts) > 5 else ''
-                
-                formatted_line = f"| {user:<{user_width}} | {tty:<{tty_width}} | {from_loc:<{from_width}} | {login_time:<{login_width}} | {what:<{what_width}} |"
-                formatted_output.append(formatted_line)
-        
-        formatted_output.append(border)
-        return '\n'.join(formatted_output)        
+        return formatting.format_user_info(output)
 
-    def format_gpu_info(self, output: str) -> str:
+    def format_gpu_info(self, output: str, ps_output: str = "") -> str:
         """nvidia-smi 출력을 파싱하여 정돈된 형식으로 변환"""
-        lines = output.split('\n')
-        
-        # GPU 개수 카운트
-        gpu_count = sum(1 for line in lines if 'NVIDIA' in line and 'On' in line)
-        
-        # 프로세스 정보 파싱
-        processes = []
-        is_process_section = False
-        
-        for line in lines:
-            if 'Processes' in line:
-                is_process_section = True
-                continue
-                
-            if is_process_section and line.strip():
-                if 'GPU   GI   CI' in line or '=' in line or not line.strip('| '):
-                    continue
-                    
-                content = line.strip('| \n')
-                if content:
-                    parts = ' '.join(content.split()).split()
-                    
-                    if len(parts) >= 7:
-                        process = {
-                            'gpu': parts[0],
-                            'pid': parts[3],
-                            'type': parts[4],
-                            'name': parts[5],
-                            'memory': parts[-1]
-                        }
-                        processes.append(process)
-        
-        # 테이블 너비 설정
-        table_width = 75
-        gpu_width = 4
-        pid_width = 8
-        type_width = 6
-        memory_width = 12
-        name_width = table_width - gpu_width - pid_width - type_width - memory_width - 9  # 구분자 여백 고려
-        
-        # 포맷된 출력 생성
-        border = "+" + "-" * table_width + "+"
-        formatted_output = [
-            border,
-            f"| 총 GPU 수: {gpu_count}{' ' * (table_width - len(str(gpu_count)) - 10)}|",
-            border,
-            "| GPU 프로세스 정보:",
-            "+" + "=" * table_width + "+",
-            f"| {'GPU':^{gpu_width}} | {'PID':^{pid_width}} | {'Type':^{type_width}} | {'Process Name':^{name_width}} | {'Memory':^{memory_width}} |",
-            border
-        ]
-        
-        # 프로세스 정보 추가
-        for proc in processes:
-            name = proc['name']
-            if len(name) > name_width:
-                name = "..." + name[-(name_width-3):]  # 긴 이름은 뒷부분만 표시
-            
-            line = (f"| {proc['gpu']:^{gpu_width}} "
-                    f"| {proc['pid']:^{pid_width}} "
-                    f"| {proc['type']:^{type_width}} "
-                    f"| {name:<{name_width}} "
-                    f"| {proc['memory']:>{memory_width}} |")
-            formatted_output.append(line)
-        
-        if not processes:
-            empty_msg = "실행 중인 프로세스 없음"
-            formatted_output.append(f"| {empty_msg:^{table_width}} |")
-        
-        formatted_output.append(border)
-        return '\n'.join(formatted_output)
+        return formatting.format_gpu_info(output, ps_output)
 
+    def format_gpu_records(self, snapshot: GpuSnapshot) -> str:
+        """GPU/프로세스 레코드를 표 형식으로 변환"""
+        return formatting.format_gpu_records(snapshot)
 
     def highlight_process_info(self, output: str) -> str:
         # 프로세스 정보에 빨간색 하이라이트 추가
@@ -542,60 +939,69 @@ class SSHConnector:
         # 실제 GPU 프로세스 정보에 맞는 부분을 찾아서 해당 부분을 스타일링해야 합니다.
         return highlighted
 
-    def connect_to_server(self, server: Dict):
+    def connect_to_server(self, server: Dict, cuda_visible_devices: Optional[str] = None):
+        """VS Code 를 바로 실행하고 연결 확인은 백그라운드에서 진행"""
         username = self.username_field.value or self.config["credentials"]["default_username"]
         password = self.password_field.value or self.config["credentials"]["default_password"]
 
+        vscode_path = vscode.find_vscode()
+        if vscode_path is None:
+            self.show_error("VS Code가 설치되어 있지 않거나 기본 경로에서 찾을 수 없습니다.")
+            return
         try:
-            # SSH 연결 설정
-            ssh = paramiko.SSHClient()
-            ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            
-            # SSH 연결 시도 중임을 표시
-            self.show_snackbar(f"{server['name']}에 연결 중...")
-            
-            # SSH 키 경로
-            ssh_key_path = os.path.expanduser('~/.ssh/id_rsa')
-            
-            # SSH 연결 시도 (먼저 키 인증 시도, 실패시 비밀번호 사용)
-            try:
-                ssh.connect(server["ip"], username=username, key_filename=ssh_key_path)
-            except Exception as key_error:
-                ssh.connect(server["ip"], username=username, password=password)
-            
-            # 1111 명령어 실행
-            stdin, stdout, stderr = ssh.exec_command("1111")
-            
-            # VS Code 경로 찾기
-            vscode_paths = [
-                # Windows paths
-                r"C:\Program Files\Microsoft VS Code\Code.exe",
-                os.path.expandvars(r"%LOCALAPPDATA%\Programs\Microsoft VS Code\Code.exe"),
-                # Mac path
-                "/Applications/Visual Studio Code.app/Contents/Resources/app/bin/code"
-            ]
-            
-            vscode_path = None
-            for path in vscode_paths:
-                if os.path.exists(path):
-                    vscode_path = path
-                    break
-                    
-            if vscode_path:
-                subprocess.Popen([
-                    vscode_path,
-                    "--remote",
-                    f"ssh-remote+{username}@{server['ip']}",
-                    f"/home/{username}"
-                ])
-                self.show_snackbar(f"{server['name']}에 성공적으로 연결되었습니다!", color="green")
-            else:
-                self.show_error("VS Code가 설치되어 있지 않거나 기본 경로에서 찾을 수 없습니다.")
-            
-            ssh.close()
-            
+            with self.metrics.time(server["name"], "vscode_launch"):
+                # 점프 호스트/포트/ControlMaster/인증 방법은 ~/.ssh 의 관리 파일에 Host 별칭으로 기록
+                # (~/.ssh/config 에 Include 를 처음 추가할 때는 원본을 백업하고 알린다)
+                included = sshconfig.ensure_include()
+                sshconfig.install(self.config["servers"], username, auth_methods=self.learned_auth_methods(username))
+                vscode.launch(vscode_path, sshconfig.remote_target(server, username), f"/home/{username}")
+        except (OSError, ValueError) as e:
+            vscode.forget()
+            self.show_error(f"VS Code 실행 실패: {str(e)}")
+            return
+
+        note = ""
+        if included:
+            backup = sshconfig.backup_path()
+            note = (f" ~/.ssh/config 맨 위에 '{sshconfig.INCLUDE_LINE}' 를 추가했습니다"
+                    + (f" (원본: {backup})." if os.path.exists(backup) else "."))
+        if cuda_visible_devices:
+            # 추천 GPU 를 바로 쓸 수 있도록 export 문을 클립보드에 복사
+            export = f"export CUDA_VISIBLE_DEVICES={cuda_visible_devices}"
+            self.page.set_clipboard(export)
+            self.show_snackbar(f"{server['name']}에 연결 중입니다. 추천 GPU: {export} (클립보드에 복사됨)" + note,
+                               color="green")
+        else:
+            self.show_snackbar(f"{server['name']}에 VS Code 로 연결 중입니다..." + note, color="green")
+        threading.Thread(target=self.check_connection, args=(server, username, password),
+                         name="connect-check", daemon=True).start()
+
+    def check_connection(self, server: Dict, username: str, password: str):
+        """VS Code 가 뜨는 동안 master 연결을 미리 열고, 풀의 세션으로 계정을 확인"""
+        sshconfig.warm_master(server, self.learned_auth_methods(username).get(server["name"]))
+        try:
+            self.ssh_pool.run(server["ip"], username, password, "true",
+                              **self.ssh_pool.server_options(server))
         except Exception as e:
             self.show_error(f"연결 실패: {str(e)}")
+            return
+        # 이번에 알게 된 인증 방법을 관리 파일에 반영 (다음 연결부터 적용)
+        try:
+            sshconfig.install(self.config["servers"], username, auth_methods=self.learned_auth_methods(username))
+        except OSError:
+            pass
+
+    def learned_auth_methods(self, username: str) -> Dict[str, Dict]:
+        """서버 이름 -> 앱이 마지막으로 성공한 인증 방법 (수집기를 아직 만들지 않았으면 빈 dict)"""
+        if self._collector is None:
+            return {}
+        cache = self._collector.pool.authenticator.cache
+        methods = {}
+        for server in self.config["servers"]:
+            method = cache.get(server["ip"], server.get("port", 22), username)
+            if method is not None:
+                methods[server["name"]] = method
+        return methods
 
     def show_error(self, message: str):
         self.page.show_snack_bar(
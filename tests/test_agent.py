@@ -0,0 +1,81 @@
+import socket
+
+import pytest
+
+from dashssh.agent import AgentClient, AgentUnavailable
+from dashssh.collector import Collector
+from dashssh.metrics import LatencyRecorder
+
+SERVER = {"name": "A", "ip": "10.0.0.1"}
+
+
+@pytest.fixture
+def collector(tmp_path, monkeypatch):
+    monkeypatch.setattr("dashssh.paths.DATA_DIR", str(tmp_path))
+    collector = Collector({"credentials": {}, "probe": {"collection": "agent"}, "auth": {"use_agent": False}})
+    yield collector
+    collector.close()
+
+
+@pytest.mark.parametrize("error", [EOFError("closed"), RuntimeError("에이전트 오류: nvml"), socket.timeout()])
+def test_agent_errors_fall_back_to_nvidia_smi(collector, monkeypatch, error):
+    def broken_fetch(*args):
+        raise error
+
+    probes = []
+    monkeypatch.setattr(collector.agents, "fetch", broken_fetch)
+    monkeypatch.setattr(collector, "probe", lambda server, *args: probes.append(server["name"]) or "")
+
+    snapshot = collector.fetch_snapshot(SERVER, "kim", "pw", 1.0)
+
+    assert snapshot.server_name == "A"
+    assert probes == ["A"]
+    assert collector.agents.unavailable_reason(SERVER) is not None
+
+
+class SilentChannel:
+    """준비 응답도 종료 코드도 보내지 않는 에이전트 채널"""
+
+    def settimeout(self, timeout):
+        pass
+
+    def exec_command(self, command):
+        pass
+
+    def makefile(self, mode):
+        return self
+
+    def readline(self):
+        return b""
+
+    def exit_status_ready(self):
+        return False
+
+    def recv_exit_status(self):
+        raise AssertionError("종료 코드를 제한 시간 없이 기다리면 안 됨")
+
+    def close(self):
+        pass
+
+
+class FakePool:
+    metrics = LatencyRecorder()
+
+    @staticmethod
+    def server_options(server):
+        return {"port": 22, "label": server["name"], "jump": None}
+
+    def get_transport(self, *args, **kwargs):
+        return self
+
+    def open_session(self, timeout):
+        return SilentChannel()
+
+
+def test_silent_agent_channel_gives_up_after_the_timeout():
+    agents = AgentClient(FakePool())
+
+    with pytest.raises(AgentUnavailable):
+        agents.fetch(SERVER, "kim", "pw", 0.2)
+
+    assert agents.unavailable_reason(SERVER) is not None
@@ -0,0 +1,64 @@
+import json
+
+import paramiko
+import pytest
+
+from dashssh.auth import Authenticator, AuthMethodCache
+
+HOST, PORT, USER = "10.0.0.1", 22, "kim"
+
+
+class FakeTransport:
+    """비밀번호 인증만 허용하는 서버 흉내"""
+
+    def __init__(self, password: str):
+        self.password = password
+        self.authenticated = False
+
+    def auth_none(self, username):
+        raise paramiko.BadAuthenticationType("none", ["password"])
+
+    def auth_password(self, username, password):
+        if password != self.password:
+            raise paramiko.AuthenticationException("bad password")
+        self.authenticated = True
+
+    def auth_publickey(self, username, key):
+        raise paramiko.BadAuthenticationType("publickey", ["password"])
+
+    def is_authenticated(self):
+        return self.authenticated
+
+    def is_active(self):
+        return True
+
+
+def make_authenticator(tmp_path, remembered):
+    cache = AuthMethodCache(str(tmp_path / "auth_methods.json"))
+    cache.remember(HOST, PORT, USER, remembered)
+    return Authenticator(key_files=[str(tmp_path / "missing_key")], use_agent=False, cache=cache)
+
+
+def saved_methods(authenticator):
+    with open(authenticator.cache.path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_stale_method_is_replaced_by_the_one_that_works(tmp_path):
+    authenticator = make_authenticator(tmp_path, {"method": "key", "key": str(tmp_path / "missing_key")})
+
+    method = authenticator.authenticate(FakeTransport("pw"), HOST, PORT, USER, "pw")
+
+    assert method == {"method": "password"}
+    assert authenticator.cache.get(HOST, PORT, USER) == {"method": "password"}
+    assert saved_methods(authenticator) == {f"{USER}@{HOST}:{PORT}": {"method": "password"}}
+
+
+def test_failed_remembered_method_is_forgotten_even_if_nothing_else_works(tmp_path):
+    authenticator = make_authenticator(tmp_path, {"method": "password"})
+
+    with pytest.raises(paramiko.AuthenticationException):
+        authenticator.authenticate(FakeTransport("new-password"), HOST, PORT, USER, "old-password")
+
+    assert authenticator.cache.get(HOST, PORT, USER) is None
+    assert saved_methods(authenticator) == {}
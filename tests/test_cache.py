@@ -0,0 +1,92 @@
+import threading
+
+from dashssh.cache import ServerSnapshot, SnapshotCache
+
+SERVER = {"name": "A", "ip": "10.0.0.1"}
+
+
+class BlockingFetch:
+    """첫 조회는 release 될 때까지 취소를 보지 않고 멈춰 있는 fetch (느린 SSH 연결 흉내)"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.tokens = []
+
+    def __call__(self, server, token):
+        self.tokens.append(token)
+        if len(self.tokens) == 1:
+            self.started.set()
+            self.release.wait(5)
+            token.check()
+        return ServerSnapshot(server["name"], {"gpu": f"call {len(self.tokens)}"})
+
+
+def make_cache(fetch, workers=2):
+    cache = SnapshotCache(fetch, max_concurrent_refreshes=workers)
+    notified = []
+    cache.subscribe(lambda server, snapshot, error: notified.append((snapshot, error)))
+    return cache, notified
+
+
+def test_refresh_shares_in_flight_future():
+    fetch = BlockingFetch()
+    cache, notified = make_cache(fetch)
+    first = cache.refresh(SERVER)
+    assert fetch.started.wait(5)
+    assert cache.refresh(SERVER) is first
+    assert cache.is_refreshing("A")
+    fetch.release.set()
+    assert first.result(5).sections == {"gpu": "call 1"}
+    assert len(notified) == 1 and notified[0][1] is None
+
+
+def test_failed_refresh_keeps_last_snapshot():
+    calls = []
+
+    def fetch(server, token):
+        calls.append(server)
+        if len(calls) > 1:
+            raise OSError("connection refused")
+        return ServerSnapshot(server["name"], {})
+
+    cache, notified = make_cache(fetch)
+    first = cache.refresh(SERVER).result(5)
+    assert cache.refresh(SERVER).result(5) is first
+    assert cache.error("A") == "connection refused"
+    assert notified[-1] == (first, "connection refused")
+
+
+def test_cancel_then_reselect_starts_new_refresh():
+    fetch = BlockingFetch()
+    cache, notified = make_cache(fetch)
+    first = cache.refresh(SERVER)
+    assert fetch.started.wait(5)
+
+    assert cache.cancel("A")
+    assert fetch.tokens[0].cancelled
+    # 취소된 갱신이 아직 끝나지 않았어도 다시 선택하면 새 갱신을 시작한다
+    second = cache.refresh(SERVER)
+    assert second is not first
+    assert second.result(5).sections == {"gpu": "call 2"}
+    assert cache.get("A").sections == {"gpu": "call 2"}
+
+    fetch.release.set()
+    assert first.result(5) is None
+    # 취소된 갱신은 결과도 오류도 알리지 않는다
+    assert [snapshot.sections for snapshot, _ in notified] == [{"gpu": "call 2"}]
+    assert cache.error("A") is None
+
+
+def test_cancel_queued_refresh_never_fetches():
+    fetch = BlockingFetch()
+    cache, notified = make_cache(fetch, workers=1)
+    blocker = cache.refresh({"name": "B", "ip": "10.0.0.2"})
+    assert fetch.started.wait(5)
+    queued = cache.refresh(SERVER)
+    assert cache.cancel("A")
+    assert queued.cancelled()
+    fetch.release.set()
+    blocker.result(5)
+    assert len(fetch.tokens) == 1
+    assert cache.get("A") is None
@@ -0,0 +1,34 @@
+import threading
+
+import pytest
+
+from dashssh.daemon import CollectorDaemon
+from dashssh.daemonclient import DaemonClient
+
+
+@pytest.fixture
+def daemon(tmp_path, monkeypatch):
+    monkeypatch.setattr("dashssh.paths.DATA_DIR", str(tmp_path))
+    monkeypatch.delenv("DASHSSH_DAEMON_TOKEN", raising=False)
+    config = {"servers": [], "credentials": {}, "daemon": {"port": 0, "token": "s3cret"}}
+    daemon = CollectorDaemon.from_config(config, "kim", "pw")
+    thread = threading.Thread(target=daemon.httpd.serve_forever, daemon=True)
+    thread.start()
+    yield daemon
+    daemon.httpd.shutdown()
+    daemon.close()
+
+
+def test_daemon_listens_on_loopback_by_default(daemon):
+    assert daemon.address[0] == "127.0.0.1"
+    assert not daemon.exposed
+
+
+def test_requests_without_the_token_are_rejected(daemon):
+    url = "http://%s:%d" % daemon.address
+
+    with pytest.raises(RuntimeError, match="토큰"):
+        DaemonClient(url).fetch_all()
+    with pytest.raises(RuntimeError, match="토큰"):
+        DaemonClient(url, token="wrong").fetch_all()
+    assert DaemonClient(url, token="s3cret").fetch_all() == {}
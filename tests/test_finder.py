@@ -0,0 +1,49 @@
+from dashssh.cache import ServerSnapshot
+from dashssh.finder import GpuFinder
+from dashssh.nvsmi import GpuRecord, GpuSnapshot, ProcessRecord
+
+SERVERS = [
+    {"name": "A", "gpu_spec": "A5000"},
+    {"name": "B", "gpu_spec": "A5000"},
+    {"name": "C", "gpu_spec": "A6000"},
+]
+
+
+def snapshot(name, gpus, busy=()):
+    """gpus: (사용 메모리, 사용률) 목록, busy: 프로세스가 있는 GPU 인덱스"""
+    records = [GpuRecord(index, f"{name}-{index}", "gpu", used, 24576, util, 30)
+               for index, (used, util) in enumerate(gpus)]
+    procs = [ProcessRecord(100 + index, f"{name}-{index}", 100, "python", gpu_index=index) for index in busy]
+    return ServerSnapshot(name, {}, GpuSnapshot(records, procs))
+
+
+def make_finder():
+    finder = GpuFinder(SERVERS)
+    finder.update(snapshot("A", [(0, 90), (0, 80), (20000, 0)]))
+    finder.update(snapshot("B", [(0, 0), (1000, 10), (0, 0)], busy=(0,)))
+    finder.update(snapshot("C", [(0, 0), (0, 0)]))
+    return finder
+
+
+def test_find_prefers_idle_gpus_without_co_tenants():
+    placements = make_finder().find(2, 20)
+    assert [(p.server_name, p.cuda_visible_devices) for p in placements] == [
+        ("C", "0,1"), ("B", "1,2"), ("A", "0,1")]
+    assert placements[1].co_tenants == 0
+    assert placements[1].min_free_mib == 24576 - 1000
+
+
+def test_find_filters_by_spec_count_and_memory():
+    finder = make_finder()
+    assert [p.server_name for p in finder.find(2, spec="A5000")] == ["B", "A"]
+    assert finder.find(4) == []
+    # A 의 GPU 2 (여유 4.5GB) 와 B 의 GPU 1 (여유 23GB) 때문에 23.5GB 씩 3개는 고를 수 없다
+    assert finder.find(3, 23.5) == []
+    # 3개를 모두 쓰면 B 는 프로세스가 있는 GPU 0 을 포함하므로 A 가 먼저
+    assert [p.server_name for p in finder.find(3, 4)] == ["A", "B"]
+
+
+def test_removed_servers_drop_out():
+    finder = make_finder()
+    finder.set_servers(SERVERS[:1])
+    assert [p.server_name for p in finder.find(1)] == ["A"]
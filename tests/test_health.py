@@ -0,0 +1,67 @@
+import socket
+
+import pytest
+
+from dashssh.health import HostHealth
+
+
+@pytest.fixture
+def health():
+    return HostHealth(min_timeout=3.0, max_timeout=60.0)
+
+
+def test_unknown_host_uses_the_default(health):
+    assert health.timeout_for("A", 10.0) == 10.0
+    assert health.wait_for("A", 10.0) == 10.0
+
+
+def test_fast_host_is_clamped_to_min_timeout(health):
+    health.record_success("A", 0.2)  # srtt 0.2 + 4 * rttvar 0.1 = 0.6
+
+    assert health.timeout_for("A", 10.0) == 3.0
+    assert health.wait_for("A", 10.0) == 10.0  # 엔진은 기본 제한 시간보다 짧게 기다리지 않는다
+    assert health.wait_for("A", 1.0) == 3.0
+
+
+def test_slow_host_gets_a_longer_wait(health):
+    health.record_success("A", 8.0)  # 8 + 4 * 4 = 24
+
+    assert health.timeout_for("A", 10.0) == pytest.approx(24.0)
+    assert health.wait_for("A", 10.0) == pytest.approx(24.0)
+
+
+def test_connect_timeout_is_added_when_a_new_connection_is_needed(health):
+    health.record_success("A", 8.0)
+
+    assert health.wait_for("A", 10.0, connect_timeout=10.0) == pytest.approx(34.0)
+    assert health.wait_for("B", 10.0, connect_timeout=10.0) == 20.0
+
+
+def test_timeout_doubles_after_a_timeout_and_resets_on_success(health):
+    health.record_success("A", 8.0)
+    health.record_failure("A", socket.timeout("timed out"))
+
+    assert health.timeout_for("A", 10.0) == pytest.approx(48.0)
+
+    health.record_success("A", 8.0)
+    assert health.timeout_for("A", 10.0) < 48.0
+
+
+def test_timeout_is_capped_at_max_timeout(health):
+    health.record_success("A", 40.0)
+
+    assert health.timeout_for("A", 10.0) == 60.0
+
+
+def test_other_failures_do_not_double_the_timeout(health):
+    health.record_success("A", 8.0)
+    health.record_failure("A", ConnectionRefusedError("refused"))
+
+    assert health.timeout_for("A", 10.0) == pytest.approx(24.0)
+
+
+def test_adaptive_timeout_can_be_turned_off():
+    health = HostHealth(adaptive_timeout=False)
+    health.record_success("A", 8.0)
+
+    assert health.timeout_for("A", 10.0) == 10.0
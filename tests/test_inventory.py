@@ -0,0 +1,53 @@
+from dashssh.cache import ServerSnapshot
+from dashssh.inventory import ServerIndex, parse_query
+from dashssh.nvsmi import GpuRecord, GpuSnapshot, ProcessRecord
+
+SERVERS = [
+    {"name": "Server1", "ip": "10.201.0.1", "gpu_spec": "NVIDIA RTX A5000", "gpu_count": 4},
+    {"name": "Server2", "ip": "10.201.0.2", "gpu_spec": "NVIDIA RTX A6000", "gpu_count": 8},
+    {"name": "Server3", "ip": "10.202.0.3", "gpu_spec": "NVIDIA RTX A5000", "gpu_count": 2},
+]
+
+
+def snapshot(name, used, busy=()):
+    gpus = [GpuRecord(index, f"{name}-{index}", "gpu", memory, 24576, 0, 30) for index, memory in enumerate(used)]
+    procs = [ProcessRecord(100 + index, f"{name}-{index}", 100, "python", gpu_index=index) for index in busy]
+    return ServerSnapshot(name, {}, GpuSnapshot(gpus, procs))
+
+
+def test_parse_query_terms():
+    assert parse_query("A5000 gpu:4 free:2") == (("a5000",), 4, 2)
+    assert parse_query("빈 gpu:2 gpu:8") == ((), 8, 1)
+    # 숫자가 아닌 값은 일반 검색어로 취급
+    assert parse_query("gpu:many free:x") == (("gpu:many", "free:x"), 0, 0)
+    assert parse_query("  ").empty
+
+
+def test_search_by_gpu_count_and_words():
+    index = ServerIndex(SERVERS)
+    assert index.search(parse_query("")) == ["Server1", "Server2", "Server3"]
+    assert index.search(parse_query("gpu:4")) == ["Server1", "Server2"]
+    assert index.search(parse_query("a5000 gpu:4")) == ["Server1"]
+    assert index.search(parse_query("10.201")) == ["Server1", "Server2"]
+
+
+def test_search_by_free_gpus_follows_snapshots():
+    index = ServerIndex(SERVERS)
+    query = parse_query("free:2")
+    assert query.uses_live_state
+    assert index.search(query) == []  # 아직 스냅샷이 없으면 빈 GPU 0개로 본다
+
+    assert index.update(snapshot("Server1", [0, 0, 0, 20000]))
+    assert index.update(snapshot("Server2", [0, 0, 0, 0], busy=(0, 1, 2)))
+    assert index.search(query) == ["Server1"]
+    assert index.search(parse_query("free")) == ["Server1", "Server2"]
+    assert not index.update(snapshot("Server1", [0, 0, 0, 20000]))  # 빈 GPU 수가 같으면 변화 없음
+
+
+def test_set_servers_reports_changes_and_keeps_free_counts():
+    index = ServerIndex(SERVERS)
+    index.update(snapshot("Server1", [0, 0, 0, 0]))
+    changed = dict(SERVERS[2], description="new")
+    added, removed, updated = index.set_servers([SERVERS[0], changed, {"name": "Server4", "gpu_count": 1}])
+    assert (added, removed, updated) == ({"Server4"}, {"Server2"}, {"Server3"})
+    assert index.search(parse_query("free:4")) == ["Server1"]
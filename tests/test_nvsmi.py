@@ -0,0 +1,40 @@
+from conftest import load_fixture
+from dashssh.nvsmi import APPS_SENTINEL, parse_query_output
+
+
+def query_output() -> str:
+    return (load_fixture("nvidia-smi-query-gpu.csv") + APPS_SENTINEL + "\n"
+            + load_fixture("nvidia-smi-query-apps.csv"))
+
+
+def test_query_output_links_processes_to_gpu_index():
+    snapshot = parse_query_output(query_output())
+    assert [gpu.index for gpu in snapshot.gpus] == list(range(len(snapshot.gpus)))
+    first = snapshot.gpus[0]
+    assert (first.memory_used, first.memory_total, first.name) == (18211, 24564, "NVIDIA RTX A5000")
+    assert first.memory_free == 24564 - 18211
+    assert snapshot.processes[0].pid == 211847
+    assert snapshot.processes[0].gpu_index == 0
+    assert snapshot.processes[1].gpu_index == 1
+
+
+def test_query_output_tolerates_unknown_values_and_gpu():
+    output = (
+        "0, GPU-a, [N/A], 24564, [Not Supported], 30, NVIDIA A100, 80GB\n"
+        f"{APPS_SENTINEL}\n"
+        "42, GPU-missing, 100, python train.py, --lr 0.1\n"
+        "broken line\n"
+    )
+    snapshot = parse_query_output(output)
+    gpu = snapshot.gpus[0]
+    assert gpu.memory_used == -1 and gpu.utilization == -1 and gpu.memory_free == -1
+    assert gpu.name == "NVIDIA A100, 80GB"
+    assert len(snapshot.processes) == 1
+    assert snapshot.processes[0].gpu_index == -1
+    assert snapshot.processes[0].name == "python train.py, --lr 0.1"
+
+
+def test_snapshot_round_trips_through_dict():
+    snapshot = parse_query_output(query_output())
+    restored = type(snapshot).from_dict(snapshot.to_dict())
+    assert restored.to_dict() == snapshot.to_dict()
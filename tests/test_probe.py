@@ -0,0 +1,63 @@
+import asyncio
+import threading
+import time
+
+from dashssh.cancel import Cancelled
+from dashssh.probe import (PROBE_SECTIONS, SECTION_PREFIX, SECTION_SUFFIX, ProbeEngine, build_probe_script,
+                           parse_probe_output)
+
+
+def test_probe_output_sections():
+    output = "\n".join([
+        "motd before the first section",
+        f"{SECTION_PREFIX}users{SECTION_SUFFIX}",
+        "kim pts/0",
+        f"{SECTION_PREFIX}gpu{SECTION_SUFFIX}",
+        "line 1",
+        "line 2",
+        f"{SECTION_PREFIX}procs{SECTION_SUFFIX}",
+        f"{SECTION_PREFIX}loadavg{SECTION_SUFFIX}",
+        "0.10 0.20 0.30 1/100 42",
+    ])
+    sections = parse_probe_output(output)
+    assert sections == {"users": "kim pts/0", "gpu": "line 1\nline 2", "procs": "",
+                        "loadavg": "0.10 0.20 0.30 1/100 42"}
+
+
+def test_probe_script_marks_every_section_in_order():
+    script = build_probe_script("nvidia-smi")
+    positions = [script.index(f"echo '{SECTION_PREFIX}{name}{SECTION_SUFFIX}'") for name, _ in PROBE_SECTIONS]
+    assert positions == sorted(positions)
+    assert "nvidia-smi; } 2>&1" in script
+
+
+def sweep(engine, servers, probe):
+    async def collect():
+        return [result async for result in engine.sweep(servers, probe)]
+    try:
+        return asyncio.run(collect())
+    finally:
+        engine.shutdown()
+
+
+def test_hung_hosts_release_their_threads():
+    """응답 없는 서버를 포기하면 채널을 닫게 하여 작업 스레드가 다음 서버를 위해 풀려난다"""
+    cancelled = []
+
+    def probe(server, timeout, cancel):
+        if server["name"].startswith("hung"):
+            closed = threading.Event()
+            cancel.on_cancel(closed.set)
+            closed.wait(5)
+            cancelled.append(server["name"])
+            raise Cancelled()
+        time.sleep(0.05)
+        return server["name"]
+
+    # 작업 스레드는 2개뿐이므로 포기한 조회가 스레드를 잡고 있으면 뒤의 서버는 대기열에서 시간 초과된다
+    engine = ProbeEngine(max_concurrency=1, host_timeout=0.3, sweep_timeout=10)
+    servers = [{"name": name} for name in ("hung1", "hung2", "ok1", "ok2")]
+    results = {result.server["name"]: result for result in sweep(engine, servers, probe)}
+    assert not results["hung1"].ok and "응답 시간 초과" in results["hung1"].error
+    assert results["ok1"].ok and results["ok2"].output == "ok2"
+    assert sorted(cancelled) == ["hung1", "hung2"]
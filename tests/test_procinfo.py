@@ -0,0 +1,63 @@
+import subprocess
+import sys
+
+import pytest
+
+from conftest import load_fixture
+from dashssh.nvsmi import APPS_SENTINEL
+from dashssh.probe import build_probe_script, parse_probe_output
+from dashssh.procinfo import PS_COMMAND, ProcessInfoCache, parse_ps_output, parse_start_times
+
+
+def test_probe_script_passes_known_processes():
+    script = build_probe_script("nvidia-smi", "12:345 13:346")
+    assert script.startswith("DASHSSH_KNOWN='12:345 13:346'; ")
+    assert PS_COMMAND in script
+    assert "user:32=" in PS_COMMAND
+
+
+def test_ps_output_and_start_times():
+    output = "@ 211847 1234\n" + load_fixture("ps.txt") + "error: process ID list syntax error\n"
+    rows = parse_ps_output(output)
+    assert rows[0] == (211847, "kimjh", 183742, "Tue Oct 13 09:12:05 2026",
+                       "/opt/conda/envs/llm/bin/python -u /opt/conda/envs/llm/bin/torchrun "
+                       "--nproc_per_node=2 train.py --config configs/llama-7b.yaml")
+    assert all(row[0] != 1234 for row in rows)
+    assert parse_start_times(output) == {211847: "1234"}
+
+
+def test_process_cache_reuses_known_and_detects_reused_pid():
+    cache = ProcessInfoCache()
+    row = (42, "kim", 100, "Tue Oct 13 09:12:05 2026", "python train.py")
+    first = cache.resolve("s", [row], {42: "500"}, now=1000.0)[42]
+    assert cache.known("s") == "42:500"
+    # ps 없이 시작 시각만 같으면 기존 정보를 그대로 쓴다
+    assert cache.resolve("s", [], {42: "500"}, now=2000.0)[42] is first
+    # 같은 PID 라도 시작 시각이 다르면 새 프로세스
+    reused = (42, "lee", 5, "Wed Oct 14 10:00:00 2026", "python eval.py")
+    assert cache.resolve("s", [reused], {42: "900"}, now=3000.0)[42].user == "lee"
+    # 시작 시각을 읽지 못한 프로세스는 known 에 실리지 않는다 (매번 ps 로 조회)
+    cache.resolve("s", [row], {}, now=4000.0)
+    assert cache.known("s") == ""
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="/proc 이 필요")
+def test_procs_section_runs_ps_only_for_unknown_processes():
+    child = subprocess.Popen(["sleep", "30"])
+    try:
+        gpu = (f"echo '0, GPU-a, 100, 24564, 0, 30, A'; echo '{APPS_SENTINEL}'; "
+               f"echo '{child.pid}, GPU-a, 100, sleep'")
+        cache = ProcessInfoCache()
+        outputs = []
+        for _ in range(2):
+            script = build_probe_script(gpu, cache.known("local"))
+            procs = parse_probe_output(subprocess.run(["sh", "-c", script], capture_output=True,
+                                                      text=True, timeout=10).stdout)["procs"]
+            outputs.append(procs)
+            infos = cache.resolve("local", parse_ps_output(procs), parse_start_times(procs))
+            assert infos[child.pid].command == "sleep 30"
+        assert parse_ps_output(outputs[0]) and not parse_ps_output(outputs[1])
+        assert parse_start_times(outputs[1]).keys() == {child.pid}
+    finally:
+        child.kill()
+        child.wait()
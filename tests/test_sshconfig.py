@@ -0,0 +1,50 @@
+import pytest
+
+from dashssh import sshconfig
+
+SERVER = {"name": "Server1", "ip": "10.0.0.1", "port": 2222}
+
+
+def test_host_block_quotes_values_with_spaces():
+    block = sshconfig.host_block(SERVER, "kim", {"method": "key", "key": "C:/Users/Kim Lab/.ssh/id_ed25519"})
+
+    assert "    HostName 10.0.0.1\n" in block
+    assert '    IdentityFile "C:/Users/Kim Lab/.ssh/id_ed25519"\n' in block
+
+
+@pytest.mark.parametrize("server", [
+    {"name": "A", "ip": "10.0.0.1\n    ProxyCommand touch /tmp/pwned"},
+    {"name": "A", "ip": '10.0.0.1" ProxyCommand "x'},
+    {"name": "A", "ip": "10.0.0.1", "jump_host": "gw\nHost *"},
+])
+def test_values_that_would_inject_directives_are_rejected(server):
+    with pytest.raises(ValueError):
+        sshconfig.host_block(server, "kim")
+    with pytest.raises(ValueError):
+        sshconfig.remote_target(server, "kim")
+    assert "ProxyCommand" not in sshconfig.render_config([server, SERVER], "kim")
+
+
+def test_names_with_spaces_get_a_single_token_alias():
+    first = sshconfig.host_alias({"name": "GPU 1\nHost *"})
+    second = sshconfig.host_alias({"name": "GPU 1 Host *"})
+
+    assert first.startswith("dashssh-GPU_1_Host__-")
+    assert first != second
+    assert sshconfig.host_alias(SERVER) == "dashssh-Server1"
+
+
+def test_first_include_backs_up_the_existing_config(tmp_path):
+    config = tmp_path / "config"
+    config.write_text("Host work\n    User kim\n", encoding="utf-8")
+
+    assert sshconfig.ensure_include(str(tmp_path))
+    assert (tmp_path / sshconfig.BACKUP_NAME).read_text(encoding="utf-8") == "Host work\n    User kim\n"
+    assert config.read_text(encoding="utf-8").startswith(sshconfig.INCLUDE_LINE + "\n")
+
+    assert not sshconfig.ensure_include(str(tmp_path))
+
+
+def test_no_backup_when_there_was_no_config(tmp_path):
+    assert sshconfig.ensure_include(str(tmp_path))
+    assert not (tmp_path / sshconfig.BACKUP_NAME).exists()
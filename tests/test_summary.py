@@ -0,0 +1,52 @@
+from dashssh.cache import ServerSnapshot
+from dashssh.nvsmi import GpuRecord, GpuSnapshot, ProcessRecord
+from dashssh.summary import ClusterSummary
+
+SERVERS = [
+    {"name": "A", "gpu_spec": "A5000"},
+    {"name": "B", "gpu_spec": "A5000"},
+    {"name": "C", "gpu_spec": "A6000"},
+]
+
+
+def snapshot(name, used, processes=()):
+    gpus = [GpuRecord(index, f"{name}-{index}", "gpu", memory, 24576, 50, 40) for index, memory in enumerate(used)]
+    procs = [ProcessRecord(pid, "", memory, "python", gpu_index=gpu, user=user)
+             for pid, gpu, user, memory in processes]
+    return ServerSnapshot(name, {}, GpuSnapshot(gpus, procs))
+
+
+def pools_by_spec(summary):
+    return {pool.spec: pool for pool in summary.summarize()}
+
+
+def test_pools_count_free_gpus_and_top_users():
+    summary = ClusterSummary(SERVERS)
+    summary.update(snapshot("A", [10000, 0, 10000], [(1, 0, "kim", 8000), (2, 0, "kim", 2000), (3, 2, "lee", 9000)]))
+    summary.update(snapshot("B", [0, 20000], [(4, 1, "kim", 20000)]))
+    pools = pools_by_spec(summary)
+
+    a5000 = pools["A5000"]
+    assert (a5000.servers, a5000.servers_total, a5000.gpus, a5000.free_gpus) == (2, 2, 5, 2)
+    # kim 은 A 의 GPU 0 에 프로세스 둘, B 의 GPU 1 에 하나 -> GPU 2개
+    assert a5000.top_users[0] == ("kim", 2, 30000.0)
+    assert a5000.top_users[1] == ("lee", 1, 9000.0)
+    assert (pools["A6000"].servers, pools["A6000"].gpus) == (0, 0)
+
+
+def test_process_with_unknown_gpu_counts_memory_but_not_gpus():
+    summary = ClusterSummary(SERVERS)
+    summary.update(snapshot("A", [10000, 5000], [(1, 0, "kim", 10000), (2, -1, "kim", 5000), (3, -1, "lee", 500)]))
+    users = {user: (gpus, memory) for user, gpus, memory in pools_by_spec(summary)["A5000"].top_users}
+    assert users["kim"] == (1, 15000.0)
+    assert "lee" not in users  # GPU 를 모르는 프로세스만 있으면 사용 중인 GPU 가 없다
+
+
+def test_update_replaces_server_rows():
+    summary = ClusterSummary(SERVERS)
+    summary.update(snapshot("A", [20000, 20000], [(1, 0, "kim", 20000)]))
+    summary.update(snapshot("A", [0, 0]))
+    pool = pools_by_spec(summary)["A5000"]
+    assert (pool.gpus, pool.free_gpus, pool.top_users) == (2, 2, [])
+    summary.remove("A")
+    assert pools_by_spec(summary)["A5000"].gpus == 0
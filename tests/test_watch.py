@@ -0,0 +1,155 @@
+import pytest
+
+from dashssh import watch
+from dashssh.cache import ServerSnapshot, SnapshotCache
+from dashssh.nvsmi import GpuRecord, GpuSnapshot, ProcessRecord
+from dashssh.watch import GpuFreeRule, ProcessExitRule, WatchManager, rule_from_dict
+
+SERVERS = [
+    {"name": "A", "ip": "10.0.0.1", "gpu_spec": "A5000"},
+    {"name": "B", "ip": "10.0.0.2", "gpu_spec": "A6000"},
+]
+SERVER = {server["name"]: server for server in SERVERS}
+TOTAL = 24576
+FREE = 0             # 사용량 0 -> 여유 24GB
+FULL = TOTAL - 1024  # 여유 1GB
+
+
+class FakeClock:
+    """watch 모듈의 time 대신 쓰는 시계 (debounce 를 기다리지 않고 시험)"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(watch, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def manager(clock):
+    manager = WatchManager(SERVERS, debounce=60)
+    manager.events = []
+    manager.subscribe(manager.events.append)
+    return manager
+
+
+def update(manager, clock, name, used, processes=(), error=None):
+    """taken_at 이 매번 늘어나는 스냅샷 전달. processes: (pid, GPU 인덱스, 사용자)"""
+    clock.now += 1
+    gpus = [GpuRecord(index, f"{name}-{index}", "gpu", memory, TOTAL, 0, 30) for index, memory in enumerate(used)]
+    procs = [ProcessRecord(pid, "", 100, "python", gpu_index=gpu, user=user) for pid, gpu, user in processes]
+    manager.update(SERVER[name], ServerSnapshot(name, {}, GpuSnapshot(gpus, procs), taken_at=clock.now), error)
+    return [event.message for event in manager.events]
+
+
+def test_gpu_free_rule_fires_once_until_rearmed(manager, clock):
+    manager.add(GpuFreeRule(2, 20, spec="A5000"))
+    assert update(manager, clock, "A", [FREE, FULL, FULL]) == []
+    assert update(manager, clock, "A", [FREE, FREE, FULL]) == ["A: 여유 20GB 이상 빈 GPU 2개 (GPU 0,1)"]
+    assert manager.events[0].gpu_indexes == [0, 1]
+    assert manager.events[0].env()["CUDA_VISIBLE_DEVICES"] == "0,1"
+    # 계속 만족하는 동안은 다시 알리지 않는다
+    assert len(update(manager, clock, "A", [FREE, FREE, FREE])) == 1
+    # 조건이 풀렸다가 debounce 가 지난 뒤 다시 만족하면 다시 알린다
+    update(manager, clock, "A", [FULL, FULL, FULL])
+    clock.now += 60
+    assert len(update(manager, clock, "A", [FREE, FREE, FULL])) == 2
+
+
+def test_debounced_firing_is_delivered_later(manager, clock):
+    manager.add(GpuFreeRule(1, 20))
+    update(manager, clock, "A", [FREE])
+    update(manager, clock, "A", [FULL])
+    # debounce 안에 다시 만족 -> 미뤄 둔다
+    assert len(update(manager, clock, "A", [FREE])) == 1
+    assert len(update(manager, clock, "A", [FREE])) == 1
+    clock.now += 60
+    # 바뀐 것이 없어도 미뤄 둔 알림은 debounce 가 지나면 전달
+    assert len(update(manager, clock, "A", [FREE])) == 2
+    assert len(update(manager, clock, "A", [FREE])) == 2
+
+
+def test_pending_firing_dropped_when_condition_clears(manager, clock):
+    manager.add(GpuFreeRule(1, 20))
+    update(manager, clock, "A", [FREE])
+    update(manager, clock, "A", [FULL])
+    update(manager, clock, "A", [FREE])
+    update(manager, clock, "A", [FULL])
+    clock.now += 60
+    assert len(update(manager, clock, "A", [FULL])) == 1
+
+
+def test_gpu_with_processes_is_not_free(manager, clock):
+    manager.add(GpuFreeRule(1, 20))
+    # 메모리는 비어 있어도 프로세스가 있는 GPU 는 빈 GPU 가 아니다 (free_gpu_count 와 같은 기준)
+    assert update(manager, clock, "A", [FREE], [(7, 0, "kim")]) == []
+    assert update(manager, clock, "A", [FREE], [(7, 0, "kim"), (8, -1, "lee")]) == []
+    assert update(manager, clock, "A", [FREE]) == ["A: 여유 20GB 이상 빈 GPU 1개 (GPU 0)"]
+
+
+def test_rule_scope_by_spec_and_server(manager, clock):
+    manager.add(GpuFreeRule(1, 0, spec="A6000"))
+    manager.add(GpuFreeRule(1, 0, server="A"))
+    assert manager.watched_servers() == {"A", "B"}
+    assert update(manager, clock, "A", [FREE]) == ["A: 여유 0GB 이상 빈 GPU 1개 (GPU 0)"]
+    assert len(update(manager, clock, "B", [FREE])) == 2
+
+
+def test_process_exit_rule_fires_once_and_is_removed(manager, clock):
+    rule = ProcessExitRule("A", pid=42)
+    manager.add(rule)
+    update(manager, clock, "A", [FULL], [(42, 0, "kim")])
+    assert rule.seen and manager.events == []
+    assert update(manager, clock, "A", [FULL]) == ["A: PID 42 종료"]
+    assert manager.rules() == []
+
+
+def test_user_exit_rule_waits_for_all_processes(manager, clock):
+    manager.add(ProcessExitRule("A", user="kim"))
+    update(manager, clock, "A", [FULL, FULL], [(1, 0, "kim"), (2, 1, "kim")])
+    assert update(manager, clock, "A", [FULL, FULL], [(2, 1, "kim")]) == []
+    assert update(manager, clock, "A", [FULL, FULL], [(3, 1, "lee")]) == ["A: kim 의 GPU 프로세스 종료"]
+
+
+def test_add_evaluates_known_state_immediately(manager, clock):
+    update(manager, clock, "A", [FULL])
+    events = manager.add(ProcessExitRule("A", pid=99))
+    assert [event.message for event in events] == ["A: PID 99 실행 중이 아님"]
+
+
+def test_errors_and_stale_snapshots_are_ignored(manager, clock):
+    manager.add(GpuFreeRule(1, 20))
+    assert update(manager, clock, "A", [FREE], error="timeout") == []
+    update(manager, clock, "A", [FULL])
+    stale = ServerSnapshot("A", {}, GpuSnapshot([GpuRecord(0, "A-0", "gpu", FREE, TOTAL, 0, 30)], []),
+                           taken_at=clock.now - 10)
+    manager.update(SERVER["A"], stale, None)
+    assert manager.events == []
+
+
+def test_rules_round_trip_through_dict():
+    for rule in (GpuFreeRule(2, 20, spec="A5000", debounce=10, command="echo hi"),
+                 ProcessExitRule("A", user="kim", seen=True)):
+        restored = rule_from_dict(rule.to_dict())
+        assert type(restored) is type(rule)
+        assert restored.to_dict() == rule.to_dict()
+
+
+def test_watched_servers_refresh_more_often():
+    cache = SnapshotCache(lambda server, token: None, refresh_interval=120)
+    cache.set_watched(["A"], 30)
+    assert cache.interval_for(SERVER["A"]) == 30
+    assert cache.interval_for(SERVER["B"]) == 120
+    assert cache.interval_for({"name": "A", "refresh_interval": 0}) == 30
+    cache.set_watched(["A"], 0)
+    assert cache.interval_for(SERVER["A"]) == 120